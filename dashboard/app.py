@@ -32,6 +32,8 @@ if os.getenv("FLASK_DEBUG") or os.getenv("GEVENT_SUPPORT"):
 
 MCP_LOG = os.getenv("CCMEMORY_MCP_LOG", "instance/mcp.jsonl")
 NEO4J_LOG = os.getenv("CCMEMORY_NEO4J_LOG", "instance/neo4j.log")
+# Must match the MCP server's setting; with it off, :ProjectStats goes stale
+PROJECT_STATS = os.getenv("CCMEMORY_PROJECT_STATS", "false").lower() == "true"
 
 _driver = None
 
@@ -46,10 +48,22 @@ def getDriver():
     return _driver
 
 
+def projectsLinked(session) -> bool:
+    """Whether nodes from before the :Project registry have been linked.
+
+    The MCP server links them at startup; until then project-wide routes
+    match the n.project property instead.
+    """
+    record = session.run(
+        "MATCH (m:Migration {name: 'project_links'}) RETURN count(m) > 0 as done"
+    ).single()
+    return bool(record and record["done"])
+
+
 def serialize_node(node: dict) -> dict:
     result = {}
     for k, v in node.items():
-        if k == "embedding":
+        if k in ("embedding", "embedding_q"):
             continue
         if hasattr(v, "isoformat"):
             result[k] = v.isoformat()
@@ -101,34 +115,58 @@ for page_type in _DETAIL_PAGE_CONFIG.keys():
     app.add_url_rule(route, f"{page_type}_view", _detail_page(page_type))
 
 
+def _statsMetrics(session, project):
+    """Read the counters the MCP server keeps when CCMEMORY_PROJECT_STATS is on."""
+    result = session.run(
+        """
+        MATCH (s:ProjectStats {project: $project})
+        RETURN s.decisions as total_decisions, s.curated as curated,
+               s.corrections as total_corrections, s.insights as total_insights,
+               s.failed_approaches as total_failed_approaches,
+               s.project_facts as total_project_facts,
+               s.exceptions as total_exceptions,
+               s.supersessions as supersession_count
+        """,
+        project=project,
+    )
+    return result.single()
+
+
+def _countMetrics(session, project):
+    """Count metrics from the graph when ProjectStats is off or missing."""
+    result = session.run(
+        """
+        OPTIONAL MATCH (d:Decision {project: $project})
+        WITH count(d) as total_decisions,
+             sum(CASE WHEN d.status = 'curated' THEN 1 ELSE 0 END) as curated
+        OPTIONAL MATCH (c:Correction {project: $project})
+        WITH total_decisions, curated, count(c) as total_corrections
+        OPTIONAL MATCH (i:Insight {project: $project})
+        WITH total_decisions, curated, total_corrections, count(i) as total_insights
+        OPTIONAL MATCH (f:FailedApproach {project: $project})
+        WITH total_decisions, curated, total_corrections, total_insights, count(f) as total_failed_approaches
+        OPTIONAL MATCH (pf:ProjectFact {project: $project})
+        WITH total_decisions, curated, total_corrections, total_insights, total_failed_approaches, count(pf) as total_project_facts
+        OPTIONAL MATCH (e:Exception {project: $project})
+        WITH total_decisions, curated, total_corrections, total_insights, total_failed_approaches, total_project_facts, count(e) as total_exceptions
+        OPTIONAL MATCH (:Decision {project: $project})-[sup:SUPERSEDES]->(:Decision)
+        RETURN total_decisions, curated, total_corrections, total_insights,
+               total_failed_approaches, total_project_facts, total_exceptions, count(sup) as supersession_count
+        """,
+        project=project,
+    )
+    return result.single()
+
+
 @app.route("/api/metrics")
 def metrics():
     project = request.args.get("project", "")
     driver = getDriver()
 
     with driver.session() as session:
-        result = session.run(
-            """
-            OPTIONAL MATCH (d:Decision {project: $project})
-            WITH count(d) as total_decisions,
-                 sum(CASE WHEN d.status = 'curated' THEN 1 ELSE 0 END) as curated
-            OPTIONAL MATCH (c:Correction {project: $project})
-            WITH total_decisions, curated, count(c) as total_corrections
-            OPTIONAL MATCH (i:Insight {project: $project})
-            WITH total_decisions, curated, total_corrections, count(i) as total_insights
-            OPTIONAL MATCH (f:FailedApproach {project: $project})
-            WITH total_decisions, curated, total_corrections, total_insights, count(f) as total_failed_approaches
-            OPTIONAL MATCH (pf:ProjectFact {project: $project})
-            WITH total_decisions, curated, total_corrections, total_insights, total_failed_approaches, count(pf) as total_project_facts
-            OPTIONAL MATCH (e:Exception {project: $project})
-            WITH total_decisions, curated, total_corrections, total_insights, total_failed_approaches, total_project_facts, count(e) as total_exceptions
-            OPTIONAL MATCH (:Decision {project: $project})-[sup:SUPERSEDES]->(:Decision)
-            RETURN total_decisions, curated, total_corrections, total_insights,
-                   total_failed_approaches, total_project_facts, total_exceptions, count(sup) as supersession_count
-            """,
-            project=project,
-        )
-        record = result.single()
+        record = _statsMetrics(session, project) if PROJECT_STATS else None
+        if record is None:
+            record = _countMetrics(session, project)
 
         total_decisions = record["total_decisions"]
         total_corrections = record["total_corrections"]
@@ -216,10 +254,14 @@ def graph():
 
     with driver.session() as session:
         label_filter = " OR ".join(f"n:{t}" for t in node_types)
+        if projectsLinked(session):
+            match = "MATCH (:Project {name: $project})<-[:IN_PROJECT]-(n)"
+        else:
+            match = "MATCH (n {project: $project})"
 
         result = session.run(
             f"""
-            MATCH (n {{project: $project}})
+            {match}
             WHERE {label_filter}
             WITH n ORDER BY n.timestamp DESC LIMIT $limit
             WITH collect(n) as nodes
@@ -637,171 +679,52 @@ def retrievals():
 
 @app.route("/api/session-context")
 def session_context():
+    """SessionStart context, from the MCP server's per-project snapshot cache."""
+    import requests
+
     project = request.args.get("project", "")
     if not project:
         return jsonify({"error": "Project required"}), 400
 
-    driver = getDriver()
-    parts = []
-    ids = []
-
-    with driver.session() as session:
-        # Project Facts
-        facts_result = session.run(
-            """
-            MATCH (pf:ProjectFact {project: $project})
-            RETURN pf ORDER BY pf.timestamp DESC LIMIT 15
-            """,
-            project=project,
+    mcp_url = os.getenv("CCMEMORY_MCP_URL", "http://mcp:8766")
+    try:
+        resp = requests.get(
+            f"{mcp_url}/api/session-context", params={"project": project}, timeout=10
         )
-        facts = [dict(r["pf"]) for r in facts_result]
+    except requests.RequestException as e:
+        return jsonify({"error": f"MCP connection failed: {e}"}), 500
+    if not resp.ok:
+        return jsonify({"error": f"MCP server error: {resp.status_code}"}), 500
+    return jsonify(resp.json())
 
-        if facts:
-            parts.append(
-                "## Project Rules (from context graph — treat as custom instructions)"
-            )
-            parts.append("")
-
-            by_category = {}
-            for f in facts:
-                if f.get("id"):
-                    ids.append(f["id"])
-                cat = f.get("category", "general")
-                if cat not in by_category:
-                    by_category[cat] = []
-                by_category[cat].append(f.get("fact", ""))
-
-            for cat, items in by_category.items():
-                parts.append(f"### {cat.title()}")
-                for item in items[:5]:
-                    parts.append(f"- {item[:120]}")
-                parts.append("")
-
-        # Recent items (union query)
-        recent_result = session.run(
-            """
-            CALL {
-                MATCH (n:Decision {project: $project})
-                RETURN n, 'Decision' as node_type, n.timestamp as ts
-                UNION ALL
-                MATCH (n:Correction {project: $project})
-                RETURN n, 'Correction' as node_type, n.timestamp as ts
-                UNION ALL
-                MATCH (n:Insight {project: $project})
-                RETURN n, 'Insight' as node_type, n.timestamp as ts
-                UNION ALL
-                MATCH (n:Exception {project: $project})
-                RETURN n, 'Exception' as node_type, n.timestamp as ts
-                UNION ALL
-                MATCH (n:FailedApproach {project: $project})
-                RETURN n, 'FailedApproach' as node_type, n.timestamp as ts
-            }
-            RETURN n, node_type ORDER BY ts DESC LIMIT 15
-            """,
-            project=project,
-        )
-        recent = [{"n": dict(r["n"]), "node_type": r["node_type"]} for r in recent_result]
-
-        if recent:
-            parts.append("## Recent Decisions")
-            for item in recent[:10]:
-                node = item.get("n", {})
-                node_type = item.get("node_type", "")
-                if not node:
-                    continue
-                if node.get("id"):
-                    ids.append(node["id"])
-
-                topics = node.get("topics", [])
-                topic_str = f"[{', '.join(topics[:2])}] " if topics else ""
-
-                if node_type == "Decision":
-                    parts.append(
-                        f"- {topic_str}{str(node.get('description', ''))[:100]}"
-                    )
-                elif node_type == "Correction":
-                    parts.append(
-                        f"- CORRECTION: {topic_str}{str(node.get('right_belief', ''))[:100]}"
-                    )
-                elif node_type == "Insight":
-                    parts.append(
-                        f"- Insight: {topic_str}{str(node.get('summary', ''))[:100]}"
-                    )
-                elif node_type == "Exception":
-                    parts.append(
-                        f"- Exception to '{node.get('rule_broken', '')[:40]}': {str(node.get('justification', ''))[:60]}"
-                    )
-            parts.append("")
-
-        # Failed approaches
-        failed_result = session.run(
-            """
-            MATCH (f:FailedApproach {project: $project})
-            RETURN f ORDER BY f.timestamp DESC LIMIT 5
-            """,
-            project=project,
-        )
-        failed = [dict(r["f"]) for r in failed_result]
-
-        if failed:
-            parts.append("## Things That Didn't Work (Don't Repeat)")
-            for f in failed[:5]:
-                if f.get("id"):
-                    ids.append(f["id"])
-                approach = str(f.get("approach", ""))[:50]
-                lesson = str(f.get("lesson", ""))[:60]
-                parts.append(f"- **{approach}**: {lesson}")
-            parts.append("")
-
-        # Stale decisions
-        stale_result = session.run(
-            """
-            MATCH (d:Decision {project: $project})
-            WHERE d.status = 'developmental'
-              AND d.timestamp < datetime() - duration({days: 30})
-            RETURN d ORDER BY d.timestamp DESC LIMIT 3
-            """,
-            project=project,
-        )
-        stale = [dict(r["d"]) for r in stale_result]
-
-        if stale:
-            parts.append("## Decisions Needing Review")
-            for d in stale[:3]:
-                if d.get("id"):
-                    ids.append(d["id"])
-                desc = str(d.get("description", ""))[:80]
-                parts.append(f"- {desc} *(developmental, may need revisit)*")
-            parts.append("")
-
-        # Empty state
-        if not facts and not recent and not stale and not failed:
-            parts.append("# Context Graph")
-            parts.append(f"Project: {project}")
-            parts.append("")
-            parts.append(
-                "No prior context. Project facts, decisions, and corrections will be captured automatically."
-            )
 
-    context_text = "\n".join(parts)
-    return jsonify({
-        "context": context_text,
-        "retrieved_count": len(ids),
-    })
+def invalidateSessionContext(project: str):
+    """Stop the MCP server serving a cached context for deleted data."""
+    import requests
+
+    mcp_url = os.getenv("CCMEMORY_MCP_URL", "http://mcp:8766")
+    try:
+        requests.delete(
+            f"{mcp_url}/api/session-context", params={"project": project}, timeout=5
+        ).raise_for_status()
+    except requests.RequestException as e:
+        app.logger.warning(f"Context invalidation failed for {project}: {e}")
 
 
 @app.route("/api/projects")
 def projects():
     driver = getDriver()
     with driver.session() as session:
-        result = session.run(
-            """
+        if projectsLinked(session):
+            query = "MATCH (p:Project) RETURN p.name as project ORDER BY project"
+        else:
+            query = """
             MATCH (n)
             WHERE n.project IS NOT NULL AND n.project <> ''
             RETURN DISTINCT n.project as project
             ORDER BY project
             """
-        )
+        result = session.run(query)
         return jsonify([r["project"] for r in result])
 
 
@@ -813,17 +736,23 @@ def clear_database():
 
     driver = getDriver()
     with driver.session() as session:
+        if projectsLinked(session):
+            match = "MATCH (:Project {name: $project})<-[:IN_PROJECT]-(n)"
+        else:
+            match = "MATCH (n {project: $project})"
+        # Batched so large projects don't build one huge transaction
         result = session.run(
-            """
-            MATCH (n)
-            WHERE n.project = $project
-            DETACH DELETE n
+            f"""
+            {match}
+            CALL {{ WITH n DETACH DELETE n }} IN TRANSACTIONS OF 10000 ROWS
             RETURN count(n) as deleted
             """,
             project=project,
         )
         record = result.single()
-        return jsonify({"deleted": record["deleted"] if record else 0})
+        session.run("MATCH (p:Project {name: $project}) DETACH DELETE p", project=project)
+    invalidateSessionContext(project)
+    return jsonify({"deleted": record["deleted"] if record else 0})
 
 
 @app.route("/api/import", methods=["POST"])
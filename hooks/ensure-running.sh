@@ -114,13 +114,41 @@ wait_for_mcp() {
     exit 1
 }
 
+# /ready returns 503 until the embedding model is loaded and Neo4j and the
+# LLM provider are reachable; /health only means the process is up
+wait_for_ready() {
+    local max_wait=45
+    local waited=0
+    activityLogDebug "hook:$HOOK_NAME" "Waiting for MCP readiness (max ${max_wait}s)..."
+    while [ $waited -lt $max_wait ]; do
+        if curl -sf http://localhost:8766/ready > /dev/null 2>&1; then
+            activityLogInfo "hook:$HOOK_NAME" "MCP ready after ${waited}s"
+            return 0
+        fi
+        sleep 1
+        waited=$((waited + 1))
+    done
+    status=$(curl -s http://localhost:8766/ready 2>/dev/null || true)
+    log "MCP not ready after ${max_wait}s: $status"
+    activityLogError "hook:$HOOK_NAME" "MCP not ready after ${max_wait}s: ${status:0:200}"
+    echo "ccmemory is running but not ready yet; memory may be degraded this session"
+}
+
 main() {
     log "Checking if MCP is already responding..."
     activityLogDebug "hook:$HOOK_NAME" "Checking MCP health..."
-    # Quick check - if MCP is already responding, we're done
+    # Quick check - if MCP is already ready, we're done
+    if curl -sf http://localhost:8766/ready > /dev/null 2>&1; then
+        log "MCP already ready, exiting"
+        activityLogInfo "hook:$HOOK_NAME" "MCP already ready"
+        hookEnd "$HOOK_NAME"
+        exit 0
+    fi
+
+    # Running but still warming up - wait instead of restarting containers
     if curl -s http://localhost:8766/health > /dev/null 2>&1; then
-        log "MCP already healthy, exiting"
-        activityLogInfo "hook:$HOOK_NAME" "MCP already healthy"
+        log "MCP healthy but warming up, waiting for readiness..."
+        wait_for_ready
         hookEnd "$HOOK_NAME"
         exit 0
     fi
@@ -172,6 +200,7 @@ main() {
 
     wait_for_mcp
     log "MCP started"
+    wait_for_ready
 
     log "=== ensure-running.sh completed ==="
     hookEnd "$HOOK_NAME"
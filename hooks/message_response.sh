@@ -17,11 +17,12 @@ input_len=${#input}
 activityLogDebug "hook:$HOOK_NAME" "stdin length: $input_len chars"
 
 activityLogInfo "hook:$HOOK_NAME" "POST ${CCMEMORY_URL}/hooks/message-response"
+# The server queues detection and answers 202 with a job id straight away
 response=$(curl -s -X POST "${CCMEMORY_URL}/hooks/message-response" \
     -H "Content-Type: application/json" \
     -d "$input" \
     --connect-timeout 5 \
-    --max-time 15 2>/dev/null) || {
+    --max-time 5 2>/dev/null) || {
     activityLogError "hook:$HOOK_NAME" "Server not responding"
     hookEnd "$HOOK_NAME"
     exit 0
@@ -29,13 +30,13 @@ response=$(curl -s -X POST "${CCMEMORY_URL}/hooks/message-response" \
 
 activityLogDebug "hook:$HOOK_NAME" "Response: ${response:0:200}..."
 
-# Output detection count if any
-detections=$(echo "$response" | grep -o '"detections":[0-9]*' | cut -d':' -f2)
-if [ -n "$detections" ] && [ "$detections" != "0" ]; then
-    activityLogInfo "hook:$HOOK_NAME" "Detections: $detections"
-    echo "{\"detections\": $detections}"
+job_id=$(echo "$response" | grep -o '"job_id":"[^"]*"' | cut -d'"' -f4)
+if [ -n "$job_id" ]; then
+    activityLogInfo "hook:$HOOK_NAME" "Detection queued: job $job_id"
+elif echo "$response" | grep -q '"error"'; then
+    activityLogError "hook:$HOOK_NAME" "Detection not queued: ${response:0:200}"
 else
-    activityLogDebug "hook:$HOOK_NAME" "No detections"
+    activityLogDebug "hook:$HOOK_NAME" "Nothing to detect"
 fi
 
 hookEnd "$HOOK_NAME"
@@ -61,23 +61,18 @@ CREATE FULLTEXT INDEX projectfact_search IF NOT EXISTS
   FOR (pf:ProjectFact) ON EACH [pf.fact, pf.context];
 CREATE FULLTEXT INDEX exception_search IF NOT EXISTS
   FOR (e:Exception) ON EACH [e.rule_broken, e.justification];
-
-// Vector indexes for semantic search (Neo4j 5.13+)
-// Using 768 dimensions for Ollama nomic-embed-text embeddings
-CREATE VECTOR INDEX decision_embedding IF NOT EXISTS FOR (d:Decision) ON d.embedding
-  OPTIONS {indexConfig: {`vector.dimensions`: 768, `vector.similarity_function`: 'cosine'}};
-CREATE VECTOR INDEX correction_embedding IF NOT EXISTS FOR (c:Correction) ON c.embedding
-  OPTIONS {indexConfig: {`vector.dimensions`: 768, `vector.similarity_function`: 'cosine'}};
-CREATE VECTOR INDEX insight_embedding IF NOT EXISTS FOR (i:Insight) ON i.embedding
-  OPTIONS {indexConfig: {`vector.dimensions`: 768, `vector.similarity_function`: 'cosine'}};
-CREATE VECTOR INDEX projectfact_embedding IF NOT EXISTS FOR (pf:ProjectFact) ON pf.embedding
-  OPTIONS {indexConfig: {`vector.dimensions`: 768, `vector.similarity_function`: 'cosine'}};
-CREATE VECTOR INDEX exception_embedding IF NOT EXISTS FOR (e:Exception) ON e.embedding
-  OPTIONS {indexConfig: {`vector.dimensions`: 768, `vector.similarity_function`: 'cosine'}};
-CREATE VECTOR INDEX failedapproach_embedding IF NOT EXISTS FOR (f:FailedApproach) ON f.embedding
-  OPTIONS {indexConfig: {`vector.dimensions`: 768, `vector.similarity_function`: 'cosine'}};
-CREATE VECTOR INDEX question_embedding IF NOT EXISTS FOR (q:Question) ON q.embedding
-  OPTIONS {indexConfig: {`vector.dimensions`: 768, `vector.similarity_function`: 'cosine'}};
+CREATE FULLTEXT INDEX memory_search IF NOT EXISTS
+  FOR (n:Decision|Correction|Insight|Question|FailedApproach|ProjectFact|Exception)
+  ON EACH [n.description, n.rationale, n.revisit_trigger,
+           n.wrong_belief, n.right_belief,
+           n.summary, n.detail, n.implications,
+           n.question, n.answer, n.context,
+           n.approach, n.outcome, n.lesson,
+           n.fact, n.rule_broken, n.justification];
+
+// Vector indexes for semantic search (Neo4j 5.13+) are created by
+// GraphClient.ensureVectorIndexes() with the configured embedding model's
+// dimensions (see ccmemory.graph.VECTOR_INDEXES and `ccmemory reembed`).
 
 // === DOMAIN 2: Reference Knowledge Index ===
 
@@ -86,8 +81,6 @@ CREATE INDEX chunk_source IF NOT EXISTS FOR (ch:Chunk) ON (ch.source_file);
 CREATE INDEX chunk_project IF NOT EXISTS FOR (ch:Chunk) ON (ch.project);
 CREATE FULLTEXT INDEX chunk_search IF NOT EXISTS
   FOR (ch:Chunk) ON EACH [ch.content, ch.section];
-CREATE VECTOR INDEX chunk_embedding IF NOT EXISTS FOR (ch:Chunk) ON ch.embedding
-  OPTIONS {indexConfig: {`vector.dimensions`: 768, `vector.similarity_function`: 'cosine'}};
 
 // === DOMAIN 2: Concepts and Hypotheses (Roadmap) ===
 
@@ -115,6 +108,14 @@ CREATE CONSTRAINT retrieval_id IF NOT EXISTS FOR (r:Retrieval) REQUIRE r.id IS U
 CREATE INDEX retrieval_project IF NOT EXISTS FOR (r:Retrieval) ON (r.project);
 CREATE INDEX retrieval_time IF NOT EXISTS FOR (r:Retrieval) ON (r.timestamp);
 
+// === PROJECT REGISTRY (every project-scoped node links here via IN_PROJECT) ===
+
+CREATE CONSTRAINT project_name IF NOT EXISTS FOR (p:Project) REQUIRE p.name IS UNIQUE;
+
+// === PROJECT STATS (metrics counters, CCMEMORY_PROJECT_STATS) ===
+
+CREATE CONSTRAINT projectstats_project IF NOT EXISTS FOR (s:ProjectStats) REQUIRE s.project IS UNIQUE;
+
 // === DEPRECATED: Session (kept for backward compat reads only) ===
 // New code should NOT create Session nodes — organize by timestamp + project directly
 
@@ -10,9 +10,9 @@ from enum import StrEnum
 from pathlib import Path
 
 from .detection.detector import detectAll
-from .embeddings import getEmbedding
-from .graph import getClient
-from .hooks import _storeDetection
+from .embeddings import embeddingText, getEmbeddingsAsync
+from .graph import getAsyncClient, nodeRow
+from .hooks import storeDetections
 from .tools.reference import _indexFile
 
 
@@ -175,7 +175,7 @@ async def backfillConversations(
     limit: int | None = None,
     progress_callback=None,
 ) -> dict:
-    client = None if dry_run else getClient()
+    client = None if dry_run else getAsyncClient()
     conversation_files = getFilteredConversationFiles(project, limit)
 
     stats = {
@@ -207,13 +207,12 @@ async def backfillConversations(
                 logging.debug("Failed to detect in %s: %s", conv_file.name, e)
                 continue
 
-            for detection in detections:
-                try:
-                    if _storeDetection(client, detection, project):
-                        stats["detections_stored"] += 1
-                except Exception as e:
-                    logging.debug("Failed to store detection: %s", e)
-                    continue
+            try:
+                stored = await storeDetections(client, detections, project)
+                stats["detections_stored"] += len(stored)
+            except Exception as e:
+                logging.debug("Failed to store detections: %s", e)
+                continue
 
         stats["files_processed"] += 1
 
@@ -246,7 +245,7 @@ async def backfillConversationContent(
     dry_run: bool = False,
 ) -> dict:
     """Backfill a single conversation from JSONL content passed by Claude Code."""
-    client = None if dry_run else getClient()
+    client = None if dry_run else getAsyncClient()
 
     stats = {
         "session_id": session_id,
@@ -285,36 +284,36 @@ async def backfillConversationContent(
             )
             continue
 
-        for detection in detections:
-            try:
-                if _storeDetection(client, detection, project):
-                    stats["detections_stored"] += 1
-                    data = detection.data
-                    preview = ""
-                    if hasattr(data, "description"):
-                        preview = f": {data.description[:60]}"
-                    elif hasattr(data, "summary"):
-                        preview = f": {data.summary[:60]}"
-                    elif hasattr(data, "rightBelief"):
-                        preview = f": {data.rightBelief[:60]}"
-                    logger.info(
-                        f"Stored {detection.type.value}{preview}",
-                        extra={
-                            "cat": "tool",
-                            "event": "backfill-store",
-                            "project": project,
-                        },
-                    )
-            except Exception as e:
-                logger.warning(
-                    f"Store failed: {e}",
-                    extra={
-                        "cat": "tool",
-                        "event": "backfill-store",
-                        "project": project,
-                    },
-                )
-                continue
+        try:
+            stored = await storeDetections(client, detections, project)
+        except Exception as e:
+            logger.warning(
+                f"Store failed: {e}",
+                extra={
+                    "cat": "tool",
+                    "event": "backfill-store",
+                    "project": project,
+                },
+            )
+            continue
+        stats["detections_stored"] += len(stored)
+        for detection in stored:
+            data = detection.data
+            preview = ""
+            if hasattr(data, "description"):
+                preview = f": {data.description[:60]}"
+            elif hasattr(data, "summary"):
+                preview = f": {data.summary[:60]}"
+            elif hasattr(data, "rightBelief"):
+                preview = f": {data.rightBelief[:60]}"
+            logger.info(
+                f"Stored {detection.type.value}{preview}",
+                extra={
+                    "cat": "tool",
+                    "event": "backfill-store",
+                    "project": project,
+                },
+            )
 
     return stats
 
@@ -326,7 +325,7 @@ async def backfillMarkdownContent(
     dry_run: bool = False,
 ) -> dict:
     """Backfill a single markdown file from content passed by Claude Code."""
-    client = None if dry_run else getClient()
+    client = None if dry_run else getAsyncClient()
 
     # Use deterministic ID based on file path and content hash
     content_hash = hashlib.sha256(content.encode()).hexdigest()[:16]
@@ -343,35 +342,27 @@ async def backfillMarkdownContent(
         stats["is_decision_log"] = True
         entries = parseDecisionLog(content, file_path)
 
-        for entry in entries:
-            decision_id = _deterministicId(
-                "decision", project, file_path, entry["description"]
-            )
+        if dry_run:
+            stats["decisions_imported"] = len(entries)
+            return stats
 
-            if not dry_run and client.decisionExists(project, entry["description"]):
+        new_entries = []
+        for entry in entries:
+            if await client.decisionExists(project, entry["description"]):
                 stats["already_imported"] = True
-                continue
+            else:
+                new_entries.append(entry)
 
-            if dry_run:
-                stats["decisions_imported"] += 1
-                continue
-
-            embedding = getEmbedding(f"{entry['description']} {entry['rationale']}")
-
-            client.createDecision(
-                decision_id=decision_id,
-                project=project,
-                description=entry["description"],
-                embedding=embedding,
-                rationale=entry["rationale"],
-                revisit_trigger=entry["revisit_trigger"],
-                detection_confidence=1.0,
-                detection_method="backfill_import",
-            )
-            stats["decisions_imported"] += 1
+        ids = [
+            _deterministicId("decision", project, file_path, e["description"])
+            for e in new_entries
+        ]
+        rows = await _decisionLogRows(new_entries, ids)
+        await client.storeBatch(project, {"Decision": rows})
+        stats["decisions_imported"] += len(rows)
     else:
         # Check if already indexed
-        if not dry_run and client.referenceFileExists(project, file_path):
+        if not dry_run and await client.referenceFileExists(project, file_path):
             stats["already_imported"] = True
             return stats
 
@@ -393,6 +384,26 @@ DECISION_LOG_PATTERN = re.compile(r"^## (\d{4}-\d{2}-\d{2}):\s*(.+)$", re.MULTIL
 CODE_BLOCK_PATTERN = re.compile(r"```[\s\S]*?```", re.MULTILINE)
 
 
+async def _decisionLogRows(entries: list[dict], ids: list[str]) -> list[dict]:
+    """AsyncGraphClient.storeBatch Decision rows for parsed decision-log entries."""
+    embeddings = await getEmbeddingsAsync(
+        [embeddingText(e["description"], e["rationale"]) for e in entries]
+    )
+    return [
+        nodeRow(
+            decision_id,
+            embedding,
+            description=entry["description"],
+            topics=[],
+            rationale=entry["rationale"],
+            revisit_trigger=entry["revisit_trigger"],
+            detection_confidence=1.0,
+            detection_method="backfill_import",
+        )
+        for decision_id, entry, embedding in zip(ids, entries, embeddings)
+    ]
+
+
 def isDecisionLog(content: str) -> bool:
     content_no_code = CODE_BLOCK_PATTERN.sub("", content)
     return bool(DECISION_LOG_PATTERN.search(content_no_code))
@@ -469,7 +480,7 @@ def getMarkdownFiles(project_root: Path) -> list[Path]:
 async def backfillMarkdown(
     project_root: Path, dry_run: bool = False, progress_callback=None
 ) -> dict:
-    client = getClient() if not dry_run else None
+    client = getAsyncClient() if not dry_run else None
     project = project_root.name
     md_files = getMarkdownFiles(project_root)
 
@@ -502,23 +513,12 @@ async def backfillMarkdown(
                 stats["decisions_imported"] += len(entries)
                 continue
 
-            for entry in entries:
-                decision_id = f"backfill-decision-{uuid.uuid4().hex[:8]}"
-
-                embedding = getEmbedding(f"{entry['description']} {entry['rationale']}")
-
-                result = client.createDecision(
-                    decision_id=decision_id,
-                    project=project,
-                    description=entry["description"],
-                    embedding=embedding,
-                    rationale=entry["rationale"],
-                    revisit_trigger=entry["revisit_trigger"],
-                    detection_confidence=1.0,
-                    detection_method="backfill_import",
-                )
-                if result.get("action") != "skipped":
-                    stats["decisions_imported"] += 1
+            ids = [f"backfill-decision-{uuid.uuid4().hex[:8]}" for _ in entries]
+            rows = await _decisionLogRows(entries, ids)
+            results = await client.storeBatch(project, {"Decision": rows})
+            stats["decisions_imported"] += sum(
+                1 for r in results.values() if r["action"] == "created"
+            )
         else:
             if dry_run:
                 stats["reference_files_indexed"] += 1
@@ -526,10 +526,10 @@ async def backfillMarkdown(
                 stats["chunks_created"] += len([s for s in sections if s.strip()])
                 continue
 
-            if client.referenceFileExists(project, relative_path):
+            if await client.referenceFileExists(project, relative_path):
                 continue
 
-            chunks = _indexFile(md_file, str(project_root), client)
+            chunks = await _indexFile(md_file, str(project_root), client)
             stats["reference_files_indexed"] += 1
             stats["chunks_created"] += chunks
 
@@ -1,5 +1,6 @@
 """CLI commands for ccmemory."""
 
+import asyncio
 import os
 import subprocess
 import sys
@@ -99,7 +100,6 @@ def status():
         click.echo(f"Cognitive Coefficient: {metrics['cognitive_coefficient']:.2f}x")
         click.echo(f"Total Decisions: {metrics['total_decisions']}")
         click.echo(f"Total Corrections: {metrics['total_corrections']}")
-        click.echo(f"Total Sessions: {metrics['total_sessions']}")
         click.echo(f"Total Insights: {metrics['total_insights']}")
         click.echo(f"Decision Reuse Rate: {metrics['decision_reuse_rate']*100:.1f}%")
         click.echo(f"Graph Density: {metrics['graph_density']:.2f}")
@@ -160,10 +160,17 @@ def cache_pdf(path):
 @main.command()
 def index():
     """Rebuild the reference knowledge index."""
+    from . import embeddings, graph
     from .tools.reference import _indexAll
 
-    project_root = os.getcwd()
-    count = _indexAll(project_root)
+    async def indexAll():
+        try:
+            return await _indexAll(os.getcwd())
+        finally:
+            await embeddings.closeAsyncClient()
+            await graph.closeAsyncClient()
+
+    count = asyncio.run(indexAll())
     click.echo(f"Indexed {count} chunks")
 
 
@@ -235,14 +242,15 @@ def promote(branch):
 
 @main.command()
 @click.option("--format", "fmt", type=click.Choice(["text", "json"]), default="text")
-def stats(fmt):
+@click.option("--refresh", is_flag=True, help="Recount instead of reading ProjectStats")
+def stats(fmt, refresh):
     """Show context graph statistics."""
-    from .graph import getClient
+    from .graph import getClient, projectMetrics
     import json as json_module
 
     project = os.path.basename(os.getcwd())
     client = getClient()
-    metrics = client.getAllMetrics(project)
+    metrics = projectMetrics(client.projectStats(project, refresh=refresh))
 
     if fmt == "json":
         click.echo(json_module.dumps(metrics, indent=2))
@@ -250,13 +258,12 @@ def stats(fmt):
         click.echo(f"Project: {project}")
         click.echo(f"\nCognitive Coefficient: {metrics['cognitive_coefficient']:.2f}x")
         click.echo(f"\nGraph Contents:")
-        click.echo(f"  Sessions: {metrics['total_sessions']}")
         click.echo(f"  Decisions: {metrics['total_decisions']}")
         click.echo(f"  Corrections: {metrics['total_corrections']}")
         click.echo(f"  Insights: {metrics['total_insights']}")
         click.echo(f"  Failed Approaches: {metrics['total_failed_approaches']}")
+        click.echo(f"  Project Facts: {metrics['total_project_facts']}")
         click.echo(f"\nQuality Metrics:")
-        click.echo(f"  Re-explanation Rate: {metrics['reexplanation_rate']*100:.1f}%")
         click.echo(f"  Decision Reuse Rate: {metrics['decision_reuse_rate']*100:.1f}%")
         click.echo(f"  Graph Density: {metrics['graph_density']:.2f}")
     client.close()
@@ -417,6 +424,154 @@ def migrate_edges(project, dry_run, infer_continues, days):
         for r in final_counts:
             click.echo(f"  {r['rel_type']}: {r['cnt']}")
 
+    # Writes increment ProjectStats; deletes need a recount
+    client.projectStats(project, refresh=True)
+    if not dry_run:
+        client.invalidateContext(project)
+    client.close()
+
+
+@main.command()
+@click.option("--batch-size", default=32, help="Nodes re-embedded per batch")
+@click.option("--delay", default=0.5, help="Seconds to sleep between batches")
+@click.option("--dry-run", is_flag=True, help="Only report how many nodes are stale")
+def reembed(batch_size, delay, dry_run):
+    """Re-embed nodes created with a different embedding model.
+
+    Nodes are tagged with embedding_model/embedding_dims when written, so this
+    only touches stale nodes and is safe to interrupt and re-run. Vector
+    indexes whose dimensions don't match the current model are recreated first.
+    """
+    import time
+
+    from .embeddings import (
+        EMBEDDING_DIMS,
+        EMBEDDING_MODEL,
+        getEmbeddings,
+        nodeEmbeddingText,
+    )
+    from .graph import getClient
+
+    client = getClient()
+    stale = client.countStaleEmbeddings(EMBEDDING_MODEL, EMBEDDING_DIMS)
+    total = sum(stale.values())
+    click.echo(f"Model: {EMBEDDING_MODEL} ({EMBEDDING_DIMS} dims)")
+    for label, count in stale.items():
+        if count:
+            click.echo(f"  {label}: {count} stale")
+    if dry_run or not total:
+        click.echo(f"\n{total} nodes need re-embedding")
+        client.close()
+        return
+
+    # Nodes are tagged with the vector's actual size, so a mismatch would
+    # leave them stale (and re-queried) forever
+    dims = len(getEmbeddings(["dimension check"])[0])
+    if dims != EMBEDDING_DIMS:
+        click.echo(
+            f"{EMBEDDING_MODEL} returns {dims}-dim vectors, not {EMBEDDING_DIMS}; "
+            f"set CCMEMORY_EMBEDDING_DIMS={dims} and re-run",
+            err=True,
+        )
+        client.close()
+        sys.exit(1)
+
+    recreated = client.ensureVectorIndexes(EMBEDDING_DIMS, recreate=True)
+    if recreated:
+        click.echo(f"Created vector indexes: {', '.join(recreated)}")
+
+    done = 0
+    for label in [label for label, count in stale.items() if count]:
+        skipped = []
+        while True:
+            nodes = client.queryStaleEmbeddings(
+                label, EMBEDDING_MODEL, EMBEDDING_DIMS, batch_size, skipped
+            )
+            if not nodes:
+                break
+            texts = [nodeEmbeddingText(label, n) for n in nodes]
+            skipped.extend(n["id"] for n, text in zip(nodes, texts) if not text)
+            rows = [(n["id"], text) for n, text in zip(nodes, texts) if text]
+            if rows:
+                embeddings = getEmbeddings([text for _, text in rows])
+                client.setEmbeddings(
+                    label,
+                    [{"id": i, "embedding": e} for (i, _), e in zip(rows, embeddings)],
+                )
+            done += len(rows)
+            click.echo(f"  {label}: {done}/{total}")
+            time.sleep(delay)
+        if skipped:
+            click.echo(f"  {label}: skipped {len(skipped)} nodes with no text")
+
+    click.echo(f"\nRe-embedded {done} nodes with {EMBEDDING_MODEL}")
+    client.close()
+
+
+def _formatBytes(n) -> str:
+    if n is None:
+        return "n/a"
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def _echoStorage(storage: dict):
+    for label, stats in storage["labels"].items():
+        if stats["nodes"]:
+            click.echo(
+                f"  {label}: {stats['nodes']} nodes, {stats['compact']} compact, "
+                f"{_formatBytes(stats['bytes'])}"
+            )
+    click.echo(f"  Embedding payload: {_formatBytes(storage['embedding_bytes'])}")
+    click.echo(f"  Store size: {_formatBytes(storage['store_bytes'])}")
+
+
+@main.command("compact-embeddings")
+@click.option("--batch-size", default=500, help="Nodes converted per transaction")
+@click.option("--dry-run", is_flag=True, help="Only report current storage")
+def compact_embeddings(batch_size, dry_run):
+    """Convert stored embeddings to compact float32 + 8-bit storage.
+
+    Set CCMEMORY_EMBED_STORAGE=compact so new nodes are written the same way.
+    Safe to interrupt and re-run; converted nodes are skipped.
+    """
+    from .graph import VECTOR_INDEXES, getClient
+
+    client = getClient()
+    click.echo("Before:")
+    _echoStorage(client.embeddingStorageStats())
+    if dry_run:
+        client.close()
+        return
+
+    total = 0
+    for _, label in VECTOR_INDEXES:
+        while converted := client.compactEmbeddings(label, batch_size):
+            total += converted
+            click.echo(f"  {label}: {total} converted")
+
+    click.echo(f"\nConverted {total} nodes. After:")
+    _echoStorage(client.embeddingStorageStats())
+    client.close()
+
+
+@main.command("migrate-projects")
+@click.option("--batch-size", default=1000, help="Nodes linked per transaction")
+def migrate_projects(batch_size):
+    """Link nodes written before the :Project registry to their project.
+
+    The MCP server does this once at startup; the dashboard falls back to
+    the project property until it has. Safe to re-run.
+    """
+    from .graph import PROJECT_LABELS, getClient
+
+    client = getClient()
+    total = 0
+    for label in PROJECT_LABELS:
+        linked = client.linkProjects(label, batch_size)
+        total += linked
+        click.echo(f"  {label}: {linked} linked")
+    client.markProjectsLinked()
+    click.echo(f"Linked {total} nodes to their project")
     client.close()
 
 
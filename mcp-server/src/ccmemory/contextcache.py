@@ -0,0 +1,179 @@
+"""Per-project snapshots of the rendered SessionStart context.
+
+A snapshot is keyed by the project's version counter, which graph writes
+bump (storeBatch, promoteDecisions), so a hit is always as fresh as the last
+write; CONTEXT_CACHE_TTL bounds age-based drift such as decisions turning
+stale. Snapshots live in process memory. With CCMEMORY_CONTEXT_CACHE set,
+versions and snapshots are also kept in SQLite, shared between processes
+(MCP server, CLI) and across restarts. Without it, other processes that
+write (CLI, dashboard) call invalidateServer() so the MCP server's
+in-memory version moves too.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import httpx
+
+logger = logging.getLogger("ccmemory.contextcache")
+
+CONTEXT_CACHE_PATH = os.getenv("CCMEMORY_CONTEXT_CACHE", "")
+CONTEXT_CACHE_TTL = float(os.getenv("CCMEMORY_CONTEXT_CACHE_TTL", "300"))
+MCP_URL = os.getenv("CCMEMORY_MCP_URL", "http://localhost:8766")
+
+
+class ContextCache:
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._versions: dict[str, int] = {}
+        self._snapshots: dict[str, tuple[int, float, dict]] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if not path:
+            return
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS versions (
+                project TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+            """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                project TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                created REAL NOT NULL,
+                snapshot TEXT NOT NULL
+            )
+            """)
+        self._conn.commit()
+
+    def version(self, project: str) -> int:
+        """Current version of a project's graph content."""
+        with self._lock:
+            if self._conn is None:
+                return self._versions.get(project, 0)
+            try:
+                row = self._conn.execute(
+                    "SELECT version FROM versions WHERE project = ?", (project,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.debug(f"Context cache read failed: {e}")
+                return -1  # Matches no snapshot
+            return row[0] if row else 0
+
+    def bump(self, project: str):
+        """Invalidate a project's snapshot after a write."""
+        with self._lock:
+            self._versions[project] = self._versions.get(project, 0) + 1
+            self._snapshots.pop(project, None)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    """
+                    INSERT INTO versions (project, version) VALUES (?, 1)
+                    ON CONFLICT (project) DO UPDATE SET version = version + 1
+                    """,
+                    (project,),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Context cache invalidation failed: {e}")
+
+    def get(self, project: str, version: int) -> dict | None:
+        """Snapshot rendered at version, if still within CONTEXT_CACHE_TTL."""
+        now = time.time()
+        with self._lock:
+            entry = self._snapshots.get(project)
+            if (entry is None or entry[0] != version) and self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT version, created, snapshot FROM snapshots WHERE project = ?",
+                        (project,),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.debug(f"Context cache read failed: {e}")
+                    row = None
+                if row:
+                    entry = (row[0], row[1], json.loads(row[2]))
+                    self._snapshots[project] = entry
+            if entry and entry[0] == version and now - entry[1] < CONTEXT_CACHE_TTL:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return None
+
+    def put(self, project: str, version: int, snapshot: dict):
+        """Store a snapshot rendered from reads started at version."""
+        now = time.time()
+        with self._lock:
+            self._snapshots[project] = (version, now, snapshot)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO snapshots (project, version, created, snapshot)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (project, version, now, json.dumps(snapshot)),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Context cache write failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "projects": len(self._snapshots),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def invalidateServer(project: str) -> bool:
+    """Bump the MCP server's version of project after a write made elsewhere."""
+    try:
+        response = httpx.delete(
+            f"{MCP_URL}/api/session-context", params={"project": project}, timeout=2.0
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.debug(f"Context invalidation not sent to {MCP_URL}: {e}")
+        return False
+    return True
+
+
+# Singleton
+_cache = None
+
+
+def getContextCache() -> ContextCache:
+    """Shared cache; memory-only if the disk tier is disabled or unavailable."""
+    global _cache
+    if _cache is None:
+        try:
+            _cache = ContextCache(CONTEXT_CACHE_PATH)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Context disk cache disabled ({CONTEXT_CACHE_PATH}): {e}")
+            _cache = ContextCache()
+    return _cache
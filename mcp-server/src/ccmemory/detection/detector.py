@@ -5,6 +5,7 @@ import re
 import time
 
 from ccmemory.llmprovider import getLlmClient
+from .prefilter import passesPrefilter
 from .prompts import DETECTION_PROMPT
 from .schemas import (
     Detection,
@@ -28,6 +29,8 @@ async def detectAll(
     if len(user_message.strip()) < 10:
         logger.debug("Skipping detection: user_message too short")
         return []
+    if not passesPrefilter(user_message, claude_response):
+        return referenceDetections(user_message)
 
     logger.info(f"Starting detection on {len(user_message)} char message")
     logger.debug(f"user_message: {user_message[:200]}")
@@ -103,11 +106,17 @@ async def detectAll(
         else:
             logger.debug(f"- projectFact (conf={item.confidence:.2f}): FILTERED")
 
-    refs = [Reference(type=ReferenceType.Url, uri=u) for u in URL_PATTERN.findall(user_message)]
-    refs += [Reference(type=ReferenceType.FilePath, uri=p) for p in PATH_PATTERN.findall(user_message)]
-    if refs:
-        logger.debug(f"- references: {len(refs)} found")
-        detections.append(Detection(type=DetectionType.Reference, confidence=0.9, data=ReferenceData(references=refs)))
+    detections += referenceDetections(user_message)
 
     logger.info(f"Raw: {raw_count} items, after filtering: {len(detections)} detections")
     return detections
+
+
+def referenceDetections(user_message: str) -> list[Detection]:
+    """URLs and file paths in the message, found without the LLM."""
+    refs = [Reference(type=ReferenceType.Url, uri=u) for u in URL_PATTERN.findall(user_message)]
+    refs += [Reference(type=ReferenceType.FilePath, uri=p) for p in PATH_PATTERN.findall(user_message)]
+    if not refs:
+        return []
+    logger.debug(f"- references: {len(refs)} found")
+    return [Detection(type=DetectionType.Reference, confidence=0.9, data=ReferenceData(references=refs))]
@@ -0,0 +1,245 @@
+"""Local pre-filter scoring exchanges before LLM detection.
+
+Most exchanges ("ok", "run the tests", a pasted stack trace) yield nothing,
+yet each detection is a structured-output LLM call. The user message is
+reduced to a few keyword/regex and shape features, and a linear model
+(hand-set WEIGHTS, or weights trained with trainPrefilter() and loaded from
+CCMEMORY_PREFILTER_MODEL) turns them into a score in [0, 1]. Exchanges
+scoring below PREFILTER_THRESHOLD skip the LLM. evaluatePrefilter() measures
+recall and the share of LLM calls kept over labeled samples (see
+scripts/eval_prefilter.py).
+
+The gate is off unless CCMEMORY_PREFILTER_THRESHOLD is set: the bundled
+samples are the ones the weights were tuned on, so they overstate recall.
+Measure it on held-out labeled transcripts before choosing a threshold.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+
+import numpy as np
+
+logger = logging.getLogger("ccmemory.prefilter")
+
+PREFILTER_THRESHOLD = float(os.getenv("CCMEMORY_PREFILTER_THRESHOLD", "0"))
+PREFILTER_MODEL = os.getenv("CCMEMORY_PREFILTER_MODEL", "")
+
+PATTERNS = {
+    "decision": re.compile(
+        r"\b(let'?s|go with|i'?ll use|we'?ll use|switch(ing)? to|instead of|"
+        r"rather than|prefer|decided?|choose|pick|opt for)\b"
+    ),
+    "correction": re.compile(
+        r"^(no|nope|wrong)\b|\bactually\b|\bthat'?s (not|wrong|incorrect)\b|"
+        r"\b(isn'?t|aren'?t|don'?t have|doesn'?t exist|not \w+ but)\b|, not \w+"
+    ),
+    "exception": re.compile(
+        r"\b(skip|just this once|for now|this time|exception|temporarily|"
+        r"don'?t bother)\b"
+    ),
+    "failure": re.compile(
+        r"\b(didn'?t|doesn'?t|won'?t|does not|did not) (work|help|fix)|"
+        r"\b(times? out|try something else|another approach|turns out|"
+        r"went wrong|made it worse|broke)\b"
+    ),
+    "rule": re.compile(
+        r"\b(we|our|this project|the project|this repo|the repo|here we)"
+        r" (use|uses|always|never|prefer|require|run|keep|put|deploy)|"
+        r"\b(always|never|must|convention|policy|required?|standard)\b|"
+        r"\b(are|is|live|lives) (in|under|located in)\b"
+    ),
+    "insight": re.compile(
+        r"\b(interesting|realiz\w*|correlat\w*|the reason|root cause|"
+        r"which means|that explains|so it'?s|because)\b"
+    ),
+    "first_person": re.compile(r"\b(we|our|us|i|my)\b"),
+}
+ACK_PATTERN = re.compile(
+    r"((ok(ay)?|yes|yep|yeah|sure|thanks?( you)?|ty|sounds good|looks good|"
+    r"lgtm|great|perfect|nice|cool|good|done|continue|go ahead|go on|"
+    r"proceed|do it|please|right|got it|k)[\s,.!]*)+"
+)
+COMMAND_PATTERN = re.compile(
+    r"(please )?(run|build|commit|push|show|open|read|fix|check|try|test|"
+    r"deploy|install|format|lint|revert|undo|retry|rerun|continue|keep going|"
+    r"look at|explain|add|remove|update)\b"
+)
+NOISE_LINE = re.compile(
+    r'^\s*(at |File "|Traceback|\w+(Error|Exception)\b|[#$>] |'
+    r"\d{4}-\d\d-\d\d|[{}\[\]();,]+$|\s{4}|\t|E\s|@@|[+-](?!\s))"
+)
+FEATURES = [
+    "decision",
+    "correction",
+    "exception",
+    "failure",
+    "rule",
+    "insight",
+    "first_person",
+    "answer",
+    "length",
+    "ack",
+    "command",
+    "noise",
+]
+
+SUGGESTED_THRESHOLD = 0.25  # In-sample only, see scripts/eval_prefilter.py
+# Hand-set starting point; scripts/eval_prefilter.py --train fits new ones
+BIAS = -2.5
+WEIGHTS = {
+    "decision": 2.5,
+    "correction": 2.5,
+    "exception": 2.0,
+    "failure": 2.5,
+    "rule": 2.5,
+    "insight": 1.5,
+    "first_person": 0.8,
+    "answer": 1.5,
+    "length": 1.5,
+    "ack": -4.0,
+    "command": -1.5,
+    "noise": -4.0,
+}
+
+
+def prefilterFeatures(user_message: str, claude_response: str = "") -> list[float]:
+    """Feature vector of an exchange, in FEATURES order."""
+    text = user_message.strip().lower()
+    lines = [line for line in user_message.splitlines() if line.strip()]
+    words = len(text.split())
+    noise = 0.0
+    if len(lines) >= 3:
+        noise = sum(bool(NOISE_LINE.match(line)) for line in lines) / len(lines)
+    # Keyword hits inside a pasted log say nothing about the user's intent
+    prose = "\n".join(line for line in lines if not NOISE_LINE.match(line)).lower()
+    values = {name: float(bool(p.search(prose))) for name, p in PATTERNS.items()}
+    values["answer"] = float(claude_response.rstrip().endswith("?") and words >= 5)
+    values["length"] = min(math.log1p(words) / math.log(50), 1.0)
+    values["ack"] = float(bool(ACK_PATTERN.fullmatch(text)))
+    values["command"] = float(words <= 8 and bool(COMMAND_PATTERN.match(text)))
+    values["noise"] = noise
+    return [values[name] for name in FEATURES]
+
+
+def prefilterScore(
+    user_message: str, claude_response: str = "", model: dict | None = None
+) -> float:
+    """Likelihood in [0, 1] that the exchange holds something to detect."""
+    model = model or getPrefilterModel()
+    features = prefilterFeatures(user_message, claude_response)
+    z = model["bias"] + sum(
+        model["weights"].get(name, 0.0) * value
+        for name, value in zip(FEATURES, features)
+    )
+    return 1 / (1 + math.exp(-z))
+
+
+def passesPrefilter(user_message: str, claude_response: str = "") -> bool:
+    """Whether the exchange should go to LLM detection (counted for stats)."""
+    if PREFILTER_THRESHOLD <= 0:
+        return True
+    score = prefilterScore(user_message, claude_response)
+    passed = score >= PREFILTER_THRESHOLD
+    _counts["passed" if passed else "skipped"] += 1
+    if not passed:
+        logger.debug(f"Pre-filter skipped detection (score={score:.2f})")
+    return passed
+
+
+def prefilterStats() -> dict:
+    total = _counts["passed"] + _counts["skipped"]
+    return {
+        "threshold": PREFILTER_THRESHOLD,
+        **_counts,
+        "skip_rate": round(_counts["skipped"] / total, 3) if total else 0.0,
+    }
+
+
+def trainPrefilter(
+    samples: list[dict], epochs: int = 2000, rate: float = 0.5, l2: float = 0.01
+) -> dict:
+    """Fit the linear model by logistic regression over labeled samples.
+
+    Each sample has user_message, claude_response (optional) and memorable.
+    Memorable samples are weighted up to the class balance, since missing
+    one costs more than an extra LLM call.
+    """
+    x = np.array(
+        [
+            prefilterFeatures(s["user_message"], s.get("claude_response", ""))
+            for s in samples
+        ]
+    )
+    y = np.array([float(s["memorable"]) for s in samples])
+    if not 0 < y.sum() < len(y):
+        raise ValueError("Training needs both memorable and trivial samples")
+    sample_weight = np.where(y == 1, (len(y) - y.sum()) / y.sum(), 1.0)
+    weights = np.zeros(len(FEATURES))
+    bias = 0.0
+    for _ in range(epochs):
+        p = 1 / (1 + np.exp(-(x @ weights + bias)))
+        error = (p - y) * sample_weight / sample_weight.sum()
+        weights -= rate * (x.T @ error + l2 * weights)
+        bias -= rate * error.sum()
+    return {
+        "bias": round(float(bias), 4),
+        "weights": {name: round(float(w), 4) for name, w in zip(FEATURES, weights)},
+    }
+
+
+def evaluatePrefilter(
+    samples: list[dict], thresholds: list[float], model: dict | None = None
+) -> list[dict]:
+    """Recall, precision and LLM calls kept at each threshold.
+
+    trivial_passed is the share of trivial samples still sent to the LLM,
+    which with the real share of memorable turns gives the calls saved.
+    """
+    scores = [
+        (
+            prefilterScore(s["user_message"], s.get("claude_response", ""), model),
+            s["memorable"],
+        )
+        for s in samples
+    ]
+    memorable = sum(label for _, label in scores)
+    trivial = len(scores) - memorable
+    rows = []
+    for threshold in thresholds:
+        passed = [label for score, label in scores if score >= threshold]
+        hits = sum(passed)
+        rows.append(
+            {
+                "threshold": threshold,
+                "recall": hits / memorable if memorable else 1.0,
+                "precision": hits / len(passed) if passed else 1.0,
+                "trivial_passed": (len(passed) - hits) / trivial if trivial else 0.0,
+                "llm_calls": len(passed) / len(scores) if scores else 0.0,
+                "missed": memorable - hits,
+            }
+        )
+    return rows
+
+
+# Singletons
+_model = None
+_counts = {"passed": 0, "skipped": 0}
+
+
+def getPrefilterModel() -> dict:
+    """Weights from CCMEMORY_PREFILTER_MODEL, else the hand-set WEIGHTS."""
+    global _model
+    if _model is None:
+        _model = {"bias": BIAS, "weights": WEIGHTS}
+        if PREFILTER_MODEL:
+            try:
+                with open(PREFILTER_MODEL) as f:
+                    _model = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(
+                    f"Using default pre-filter weights ({PREFILTER_MODEL}): {e}"
+                )
+    return _model
@@ -0,0 +1,273 @@
+"""Embedding caches: a bounded in-process LRU and a persistent SQLite tier.
+
+Disk vectors are stored as packed float32 keyed by sha256(model, text), so the
+cache survives container restarts and is shared between the MCP server and
+the CLI. SQLite WAL mode plus a busy timeout make concurrent use from
+several processes safe. Least-recently-used entries are evicted once the
+stored vectors exceed the size cap; a hit only rewrites last_used when it is
+older than LRU_TOUCH_INTERVAL, so the read path rarely writes.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger("ccmemory.embed")
+
+
+def _defaultCachePath() -> str:
+    """Per-user cache file, so the CLI finds it from any working directory."""
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "ccmemory", "embeddings.db")
+
+
+CACHE_PATH = os.getenv("CCMEMORY_EMBED_CACHE", _defaultCachePath())
+CACHE_MAX_MB = int(os.getenv("CCMEMORY_EMBED_CACHE_MAX_MB", "256"))
+MEMORY_CACHE_MAX_MB = int(os.getenv("CCMEMORY_EMBED_MEMORY_MB", "64"))
+EVICT_CHECK_INTERVAL = 100  # Check size cap every N inserts
+EVICT_TARGET = 0.9  # Evict down to this fraction of the cap
+LRU_TOUCH_INTERVAL = 3600.0  # Seconds; granularity of disk LRU order
+SQL_BATCH = 500  # Keys per IN (...) query, under SQLite's variable limit
+
+
+def cacheKey(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+
+def packVector(vector) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def unpackVector(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+class MemoryCache:
+    """LRU of float32 vectors bounded by a byte budget. O(1) get/put."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old.nbytes
+            self._entries[key] = vector
+            self.bytes += vector.nbytes
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.nbytes
+                self.evictions += 1
+        return vector
+
+    def clear(self) -> int:
+        """Drop all entries. Returns bytes freed."""
+        with self._lock:
+            freed = self.bytes
+            self._entries.clear()
+            self.bytes = 0
+            return freed
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class EmbeddingCache:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._inserts = 0
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dims INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> np.ndarray | None:
+        return self.getMany([key]).get(key)
+
+    def getMany(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """Vectors for the cached keys, read (and LRU-touched) in one transaction."""
+        if not keys:
+            return {}
+        rows = []
+        with self._lock:
+            try:
+                for i in range(0, len(keys), SQL_BATCH):
+                    chunk = keys[i : i + SQL_BATCH]
+                    rows += self._conn.execute(
+                        "SELECT key, vector, last_used FROM embeddings "
+                        f"WHERE key IN ({', '.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                now = time.time()
+                stale = [
+                    (now, k) for k, _, used in rows if now - used > LRU_TOUCH_INTERVAL
+                ]
+                if stale:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE key = ?", stale
+                    )
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                logger.debug(f"Embedding cache read failed: {e}")
+                self.misses += len(keys)
+                return {}
+            self.hits += len(rows)
+            self.misses += len(keys) - len(rows)
+        return {k: unpackVector(blob) for k, blob, _ in rows}
+
+    def put(self, key: str, model: str, vector):
+        self.putMany(model, [(key, vector)])
+
+    def putMany(self, model: str, items):
+        """Store (key, vector) pairs in one transaction."""
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            blob = packVector(vector)
+            rows.append((key, model, len(blob) // 4, blob, now))
+        if not rows:
+            return
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO embeddings (key, model, dims, vector, last_used)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+                self._conn.commit()
+                # Check the cap whenever the batch covers insert 1, N+1, 2N+1...
+                first = self._inserts
+                self._inserts += len(rows)
+                interval = EVICT_CHECK_INTERVAL
+                if (first - 1) // interval != (self._inserts - 1) // interval:
+                    self._evict()
+            except sqlite3.Error as e:
+                logger.debug(f"Embedding cache write failed: {e}")
+
+    def _evict(self):
+        """Drop least-recently-used entries until under EVICT_TARGET of the cap."""
+        total, count = self._conn.execute(
+            "SELECT total(length(vector)), count(*) FROM embeddings"
+        ).fetchone()
+        if total <= self.max_bytes or not count:
+            return
+        avg = total / count
+        excess = int((total - self.max_bytes * EVICT_TARGET) / avg) + 1
+        self._conn.execute(
+            """
+            DELETE FROM embeddings WHERE key IN (
+                SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?
+            )
+            """,
+            (excess,),
+        )
+        self._conn.commit()
+        self.evictions += excess
+        logger.info(f"Evicted {excess} embeddings from disk cache")
+
+    def clear(self) -> int:
+        with self._lock:
+            count = self._conn.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            return count
+
+    def stats(self) -> dict:
+        with self._lock:
+            total, count = self._conn.execute(
+                "SELECT total(length(vector)), count(*) FROM embeddings"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "entries": count,
+            "bytes": int(total),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton
+_cache = None
+_cache_failed = False
+
+
+def getCache() -> EmbeddingCache | None:
+    """Get the shared disk cache, or None if disabled or unavailable."""
+    global _cache, _cache_failed
+    if _cache is None and not _cache_failed and CACHE_PATH:
+        try:
+            _cache = EmbeddingCache(CACHE_PATH, CACHE_MAX_MB * 1024 * 1024)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Embedding disk cache disabled ({CACHE_PATH}): {e}")
+            _cache_failed = True
+    return _cache
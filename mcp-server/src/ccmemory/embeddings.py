@@ -1,40 +1,255 @@
-"""Embedding generation for semantic search via Ollama."""
+"""Embedding generation for semantic search.
 
+Vectors come from a pluggable backend selected by CCMEMORY_EMBED_BACKEND:
+"ollama" (default) calls an Ollama server, "hash" computes deterministic
+hashed n-gram vectors in-process for offline tests and benchmarks.
+"""
+
+import asyncio
 import logging
 import os
+import re
 import time
 
 import httpx
+import numpy as np
+
+from .embedcache import MEMORY_CACHE_MAX_MB, MemoryCache, cacheKey, getCache
+from .hashembed import HashBackend
 
 logger = logging.getLogger("ccmemory.embed")
 
-EMBEDDING_MODEL = os.getenv("CCMEMORY_OLLAMA_MODEL", "nomic-embed-text")
-EMBEDDING_DIMS = 768
+EMBEDDING_BACKEND = os.getenv("CCMEMORY_EMBED_BACKEND", "ollama").lower()
+HASH_MODEL = "hash-ngram"
+EMBEDDING_MODEL = (
+    HASH_MODEL
+    if EMBEDDING_BACKEND == "hash"
+    else os.getenv("CCMEMORY_OLLAMA_MODEL", "all-minilm")
+)
+# Output dimensions of common Ollama embedding models (keyed without :tag)
+MODEL_DIMS = {
+    HASH_MODEL: 384,
+    "all-minilm": 384,
+    "nomic-embed-text": 768,
+    "mxbai-embed-large": 1024,
+    "snowflake-arctic-embed": 1024,
+    "bge-m3": 1024,
+}
+EMBEDDING_DIMS = int(
+    os.getenv("CCMEMORY_EMBEDDING_DIMS")
+    or MODEL_DIMS.get(EMBEDDING_MODEL.split(":")[0], 768)
+)
 OLLAMA_URL = os.getenv("CCMEMORY_OLLAMA_URL", "http://localhost:11434")
-MAX_TEXT_LENGTH = 8000  # Truncate long texts to avoid model limits
+# Input context of common Ollama embedding models, in tokens
+MODEL_CONTEXT = {
+    HASH_MODEL: 8192,
+    "all-minilm": 256,
+    "nomic-embed-text": 2048,  # Ollama's default num_ctx
+    "mxbai-embed-large": 512,
+    "snowflake-arctic-embed": 512,
+    "bge-m3": 8192,
+}
+MAX_TOKENS = int(
+    os.getenv("CCMEMORY_EMBED_MAX_TOKENS")
+    or MODEL_CONTEXT.get(EMBEDDING_MODEL.split(":")[0], 512)
+)
+# Conservative stand-in for a subword tokenizer: long words count as several
+# tokens and each punctuation mark as one, so estimates err on the high side
+TOKEN_PATTERN = re.compile(r"\w{1,5}|[^\w\s]")
+# "full" stores float64 lists; "compact" stores float32 vectors for the index
+# plus an 8-bit copy (embedding_q) for application-side scoring
+EMBED_STORAGE = os.getenv("CCMEMORY_EMBED_STORAGE", "full").lower()
+BATCH_SIZE = int(os.getenv("CCMEMORY_EMBED_BATCH_SIZE", "32"))
+BATCH_MAX_CHARS = int(os.getenv("CCMEMORY_EMBED_BATCH_MAX_CHARS", "64000"))
+MAX_CONCURRENCY = int(os.getenv("CCMEMORY_EMBED_CONCURRENCY", "4"))
+REQUEST_TIMEOUT = float(os.getenv("CCMEMORY_EMBED_TIMEOUT", "30"))
 
-_embedding_cache = {}
+_embedding_cache = MemoryCache(MEMORY_CACHE_MAX_MB * 1024 * 1024)
+_backend = None
+_batch_supported: bool | None = None  # None until first /api/embed call
 
+# Shared async client, bound to the event loop that created it
+_async_client: httpx.AsyncClient | None = None
+_async_semaphore: asyncio.Semaphore | None = None
+_async_loop: asyncio.AbstractEventLoop | None = None
 
-def getEmbedding(text: str) -> list:
-    """Generate embedding for text using Ollama."""
-    if not text:
-        raise ValueError("Cannot generate embedding for empty text")
+# Single-flight: cache key -> future for embeddings currently being fetched
+_inflight: dict[str, asyncio.Future] = {}
+_coalesced = 0
+
+
+class _OwnerCancelled(Exception):
+    """The call fetching a coalesced text was cancelled; waiters refetch it."""
+
+
+# Node properties that carry each label's semantic text, in embedding order
+EMBEDDING_FIELDS = {
+    "Decision": ["description", "rationale"],
+    "Correction": ["wrong_belief", "right_belief"],
+    "Exception": ["rule_broken", "justification"],
+    "Insight": ["summary", "detail", "implications"],
+    "Question": ["question", "answer", "context"],
+    "FailedApproach": ["approach", "outcome", "lesson"],
+    "ProjectFact": ["fact", "context"],
+    "Chunk": ["section", "content"],
+}
+
+
+def embeddingMeta(embedding: list | None) -> dict:
+    """Model tag (and compact copy) stored on a graph node with its embedding."""
+    if not embedding:
+        return {}
+    meta = {"embedding_model": EMBEDDING_MODEL, "embedding_dims": len(embedding)}
+    if EMBED_STORAGE == "compact":
+        meta["embedding_q"] = quantizeEmbedding(embedding)
+    return meta
+
+
+def quantizeEmbedding(embedding) -> list[int]:
+    """Quantize to 8-bit codes of the unit vector, for the embedding_q copy.
+
+    Codes are offset by 128 into 1..255 so Neo4j bit-packs the list at one
+    byte per value (vs eight for a float list). Only direction matters for
+    cosine similarity, so no scale is stored.
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector = vector / norm
+    return (np.round(vector * 127).astype(np.int16) + 128).tolist()
+
+
+def dequantizeEmbedding(codes) -> np.ndarray:
+    """Unit float32 vector from quantizeEmbedding codes."""
+    vector = np.asarray(codes, dtype=np.float32) - 128
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def similarity(a, b) -> float:
+    """Cosine similarity of two embeddings (use dequantizeEmbedding for codes)."""
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    norms = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(np.dot(a, b) / norms) if norms else 0.0
+
+
+def distinctMask(codes: list, min_cosine: float) -> list[bool]:
+    """Which items to keep, dropping near duplicates of an earlier kept item.
+
+    codes are quantizeEmbedding codes per item (None to always keep it),
+    scored pairwise with one product of their dequantized unit vectors.
+    """
+    present = [i for i, c in enumerate(codes) if c]
+    keep = [True] * len(codes)
+    if len(present) < 2:
+        return keep
+    vectors = np.stack([dequantizeEmbedding(codes[i]) for i in present])
+    scores = vectors @ vectors.T
+    kept = []
+    for n, i in enumerate(present):
+        if kept and scores[n, kept].max() >= min_cosine:
+            keep[i] = False
+        else:
+            kept.append(n)
+    return keep
+
+
+def embeddingText(*parts: str | None) -> str:
+    """Join the semantic fields of a record into the text to embed.
+
+    Empty fields are dropped so the same record always yields the same text,
+    whether it came from detection, an explicit tool call or a re-embed.
+    """
+    return " ".join(str(p).strip() for p in parts if p and str(p).strip())
+
+
+def nodeEmbeddingText(label: str, props: dict) -> str:
+    """Rebuild the text to embed for a stored node (used when re-embedding)."""
+    if label == "Chunk":
+        return f"{props.get('section', '')}: {str(props.get('content', ''))[:500]}"
+    return embeddingText(*(props.get(f) for f in EMBEDDING_FIELDS.get(label, [])))
 
-    # Truncate long texts
-    if len(text) > MAX_TEXT_LENGTH:
-        logger.debug(f"Truncating text from {len(text)} to {MAX_TEXT_LENGTH} chars")
-        text = text[:MAX_TEXT_LENGTH]
 
-    cache_key = hash(text)
-    if cache_key in _embedding_cache:
-        logger.debug(f"Cache hit for {len(text)} char text")
-        return _embedding_cache[cache_key]
+def estimateTokens(text: str) -> int:
+    return len(TOKEN_PATTERN.findall(text))
 
-    logger.debug(f"getEmbedding({len(text)} chars)")
-    start = time.time()
-    logger.debug(f"Ollama POST /api/embeddings (model={EMBEDDING_MODEL})")
 
+def chunkText(text: str, max_tokens: int | None = None) -> list[str]:
+    """Split text into pieces that fit the model context (MAX_TOKENS).
+
+    Splits fall between tokens, so no piece cuts a word in half.
+    """
+    max_tokens = max_tokens or MAX_TOKENS
+    starts = [m.start() for m in TOKEN_PATTERN.finditer(text)]
+    if len(starts) <= max_tokens:
+        return [text]
+    bounds = starts[::max_tokens][1:] + [len(text)]
+    chunks = []
+    start = 0
+    for end in bounds:
+        chunks.append(text[start:end].strip())
+        start = end
+    return chunks
+
+
+def _meanPool(vectors: list[list]) -> list:
+    """Average chunk embeddings into one unit-length vector."""
+    mean = np.mean(np.asarray(vectors, dtype=np.float32), axis=0)
+    norm = np.linalg.norm(mean)
+    if norm:
+        mean /= norm
+    return mean.tolist()
+
+
+def _chunked(texts: list[str]) -> tuple[list[str], list[int]]:
+    """Flatten texts into model-sized chunks, returning chunk counts per text."""
+    chunks = []
+    counts = []
+    for text in texts:
+        pieces = chunkText(text)
+        if len(pieces) > 1:
+            logger.debug(f"Chunked {len(text)} char text into {len(pieces)} pieces")
+        chunks.extend(pieces)
+        counts.append(len(pieces))
+    return chunks, counts
+
+
+def _pooled(embeddings: list[list], counts: list[int]) -> list[list]:
+    """Mean-pool chunk embeddings back into one embedding per input text."""
+    if len(embeddings) == len(counts):
+        return embeddings
+    result = []
+    i = 0
+    for count in counts:
+        group = embeddings[i : i + count]
+        result.append(group[0] if count == 1 else _meanPool(group))
+        i += count
+    return result
+
+
+def _loadFromDisk(found: dict, missing: dict):
+    """Move keys in missing that the shared disk cache holds into found.
+
+    One batched read; blocking, so the async path runs it in a thread.
+    """
+    disk = getCache()
+    if disk is None or not missing:
+        return
+    for key, vector in disk.getMany(list(missing)).items():
+        found[key] = _embedding_cache.put(key, vector).tolist()
+        del missing[key]
+
+
+def _saveToDisk(embeddings: dict):
+    """Write freshly fetched embeddings to the disk cache in one transaction."""
+    disk = getCache()
+    if disk is not None and embeddings:
+        disk.putMany(EMBEDDING_MODEL, embeddings.items())
+
+
+def _postEmbedding(text: str) -> list:
+    """Embed a single text via the legacy /api/embeddings endpoint."""
     try:
         response = httpx.post(
             f"{OLLAMA_URL}/api/embeddings",
@@ -42,32 +257,335 @@ def getEmbedding(text: str) -> list:
             timeout=30.0,
         )
         response.raise_for_status()
-        embedding = response.json()["embedding"]
+        return response.json()["embedding"]
     except httpx.HTTPStatusError as e:
         raise RuntimeError(f"Ollama embedding failed: {e.response.status_code}") from e
 
-    duration = int((time.time() - start) * 1000)
-    logger.debug(f"Embedding: {len(embedding)} dims, {duration}ms")
 
-    _embedding_cache[cache_key] = embedding
-    return embedding
+def _parseBatch(response: httpx.Response, texts: list[str]) -> list[list] | None:
+    """Parse an /api/embed response.
+
+    Returns None if the server predates the multi-input endpoint.
+    """
+    global _batch_supported
+    try:
+        if (
+            response.status_code == 404
+            and _batch_supported is None
+            and "model" not in response.text
+        ):
+            logger.info("Ollama /api/embed not available, using per-item requests")
+            _batch_supported = False
+            return None
+        response.raise_for_status()
+        embeddings = response.json()["embeddings"]
+    except httpx.HTTPStatusError as e:
+        raise RuntimeError(f"Ollama embedding failed: {e.response.status_code}") from e
+
+    if len(embeddings) != len(texts):
+        raise RuntimeError(
+            f"Ollama returned {len(embeddings)} embeddings for {len(texts)} texts"
+        )
+    _batch_supported = True
+    return embeddings
+
+
+def _postBatch(texts: list[str]) -> list[list] | None:
+    """Embed texts in one request via /api/embed."""
+    response = httpx.post(
+        f"{OLLAMA_URL}/api/embed",
+        json={"model": EMBEDDING_MODEL, "input": texts},
+        timeout=60.0,
+    )
+    return _parseBatch(response, texts)
+
+
+def _getAsyncClient() -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    """Get the pooled keep-alive client and in-flight request limiter."""
+    global _async_client, _async_semaphore, _async_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            base_url=OLLAMA_URL,
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENCY,
+                max_keepalive_connections=MAX_CONCURRENCY,
+            ),
+        )
+        _async_semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        _async_loop = loop
+    return _async_client, _async_semaphore
+
+
+async def _postEmbeddingAsync(text: str) -> list:
+    client, semaphore = _getAsyncClient()
+    async with semaphore:
+        try:
+            response = await client.post(
+                "/api/embeddings", json={"model": EMBEDDING_MODEL, "prompt": text}
+            )
+            response.raise_for_status()
+            return response.json()["embedding"]
+        except httpx.HTTPStatusError as e:
+            raise RuntimeError(
+                f"Ollama embedding failed: {e.response.status_code}"
+            ) from e
+        except httpx.TimeoutException as e:
+            raise RuntimeError(
+                f"Ollama embedding timed out after {REQUEST_TIMEOUT}s"
+            ) from e
+
+
+async def _postBatchAsync(texts: list[str]) -> list[list] | None:
+    client, semaphore = _getAsyncClient()
+    async with semaphore:
+        try:
+            response = await client.post(
+                "/api/embed",
+                json={"model": EMBEDDING_MODEL, "input": texts},
+                timeout=REQUEST_TIMEOUT * 2,
+            )
+        except httpx.TimeoutException as e:
+            raise RuntimeError(
+                f"Ollama batch embedding timed out after {REQUEST_TIMEOUT * 2}s"
+            ) from e
+    return _parseBatch(response, texts)
+
+
+async def closeAsyncClient():
+    """Close the pooled async client (call on server shutdown)."""
+    global _async_client, _async_semaphore, _async_loop
+    if _async_client is not None:
+        await _async_client.aclose()
+    _async_client = None
+    _async_semaphore = None
+    _async_loop = None
+
+
+class OllamaBackend:
+    """Embedding backend that calls an Ollama server over HTTP."""
+
+    name = "ollama"
+    cacheable = True
+
+    def embed(self, texts: list[str]) -> list[list]:
+        embeddings = None
+        if _batch_supported is not False:
+            embeddings = _postBatch(texts)
+        if embeddings is None:
+            embeddings = [_postEmbedding(t) for t in texts]
+        return embeddings
+
+    async def embedAsync(self, texts: list[str]) -> list[list]:
+        embeddings = None
+        if _batch_supported is not False:
+            embeddings = await _postBatchAsync(texts)
+        if embeddings is None:
+            embeddings = await asyncio.gather(*(_postEmbeddingAsync(t) for t in texts))
+        return embeddings
+
+
+def getBackend():
+    """Get the configured embedding backend (CCMEMORY_EMBED_BACKEND)."""
+    global _backend
+    if _backend is None:
+        if EMBEDDING_BACKEND == "ollama":
+            _backend = OllamaBackend()
+        elif EMBEDDING_BACKEND == "hash":
+            _backend = HashBackend(EMBEDDING_DIMS)
+        else:
+            raise RuntimeError(f"Unknown embedding backend: {EMBEDDING_BACKEND}")
+    return _backend
+
+
+def _microBatches(texts: list[str]) -> list[list[str]]:
+    """Split texts into batches bounded by BATCH_SIZE and BATCH_MAX_CHARS."""
+    batches = []
+    current = []
+    current_chars = 0
+    for text in texts:
+        if current and (
+            len(current) >= BATCH_SIZE or current_chars + len(text) > BATCH_MAX_CHARS
+        ):
+            batches.append(current)
+            current = []
+            current_chars = 0
+        current.append(text)
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def getEmbedding(text: str) -> list:
+    """Generate embedding for text.
+
+    Text longer than the model context is embedded in chunks and mean-pooled.
+    """
+    if not text:
+        raise ValueError("Cannot generate embedding for empty text")
+    return getEmbeddings([text])[0]
+
+
+def _partition(texts: list[str]) -> tuple[list[str], dict, dict]:
+    """Split texts into cache keys, in-process cached embeddings and misses.
+
+    Misses still need a disk cache check (_loadFromDisk) before fetching.
+    """
+    if not all(texts):
+        raise ValueError("Cannot generate embedding for empty text")
+    keys = [cacheKey(EMBEDDING_MODEL, t) for t in texts]
+    found = {}
+    missing = {}
+    for text, key in zip(texts, keys):
+        if key in found or key in missing:
+            continue
+        cached = _embedding_cache.get(key)
+        if cached is not None:
+            found[key] = cached.tolist()
+        else:
+            missing[key] = text
+    return keys, found, missing
 
 
 def getEmbeddings(texts: list[str]) -> list[list]:
-    """Generate embeddings for multiple texts."""
+    """Generate embeddings for multiple texts, batching requests to Ollama.
+
+    Output order matches input order. Cached and repeated texts are only
+    sent once. Long texts are chunked and mean-pooled.
+    """
     if not texts:
         return []
 
     logger.debug(f"getEmbeddings({len(texts)} texts)")
-    results = []
-    for text in texts:
-        results.append(getEmbedding(text))
+    if not all(texts):
+        raise ValueError("Cannot generate embedding for empty text")
+    texts, counts = _chunked(texts)
+    backend = getBackend()
+    if not backend.cacheable:
+        return _pooled(backend.embed(texts), counts)
+    keys, found, missing = _partition(texts)
+    _loadFromDisk(found, missing)
+
+    if missing:
+        start = time.time()
+        batches = _microBatches(list(missing.values()))
+        missing_keys = iter(missing)
+        for batch in batches:
+            embeddings = backend.embed(batch)
+            for embedding in embeddings:
+                key = next(missing_keys)
+                found[key] = embedding
+                _embedding_cache.put(key, embedding)
+        _saveToDisk({key: found[key] for key in missing})
+        duration = int((time.time() - start) * 1000)
+        logger.debug(
+            f"Embedded {len(missing)} texts in {len(batches)} batch(es), {duration}ms"
+        )
+
+    return _pooled([found[key] for key in keys], counts)
+
+
+async def getEmbeddingAsync(text: str) -> list:
+    """Async getEmbedding using the pooled client; doesn't block the event loop."""
+    if not text:
+        raise ValueError("Cannot generate embedding for empty text")
+    return (await getEmbeddingsAsync([text]))[0]
+
+
+async def getEmbeddingsAsync(texts: list[str]) -> list[list]:
+    """Async getEmbeddings; micro-batches run concurrently up to MAX_CONCURRENCY.
+
+    Texts already being fetched by another caller are not requested again;
+    this call waits on the in-flight future and shares its result.
+    """
+    global _coalesced
+    if not texts:
+        return []
+
+    logger.debug(f"getEmbeddingsAsync({len(texts)} texts)")
+    if not all(texts):
+        raise ValueError("Cannot generate embedding for empty text")
+    texts, counts = _chunked(texts)
+    backend = getBackend()
+    if not backend.cacheable:
+        return _pooled(await backend.embedAsync(texts), counts)
+    keys, found, missing = _partition(texts)
+    if missing:
+        # SQLite reads block; keep them off the event loop
+        await asyncio.to_thread(_loadFromDisk, found, missing)
+
+    waiting = {k: (t, _inflight[k]) for k, t in missing.items() if k in _inflight}
+    for key in waiting:
+        del missing[key]
+    _coalesced += len(waiting)
+
+    loop = asyncio.get_running_loop()
+    owned = {}
+    for key in missing:
+        future = loop.create_future()
+        # Failures are re-raised to the owner; don't warn if no one else waited
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        owned[key] = _inflight[key] = future
+
+    if missing:
+        start = time.time()
+        try:
+            batches = _microBatches(list(missing.values()))
+            results = await asyncio.gather(*(backend.embedAsync(b) for b in batches))
+            for key, embedding in zip(missing, (e for r in results for e in r)):
+                found[key] = embedding
+                _embedding_cache.put(key, embedding)
+                owned[key].set_result(embedding)
+        except BaseException as e:
+            # Waiters didn't ask to be cancelled, so they refetch instead
+            error = _OwnerCancelled() if isinstance(e, asyncio.CancelledError) else e
+            for future in owned.values():
+                if not future.done():
+                    future.set_exception(error)
+            raise
+        finally:
+            for key in owned:
+                _inflight.pop(key, None)
+        duration = int((time.time() - start) * 1000)
+        logger.debug(
+            f"Embedded {len(missing)} texts in {len(batches)} batch(es), {duration}ms"
+        )
+        # Waiters already have their results; persist without blocking the loop
+        await asyncio.to_thread(_saveToDisk, {key: found[key] for key in missing})
+
+    for key, (text, future) in waiting.items():
+        try:
+            found[key] = await asyncio.shield(future)
+        except _OwnerCancelled:
+            found[key] = await getEmbeddingAsync(text)
+
+    return _pooled([found[key] for key in keys], counts)
+
+
+def clearCache(disk: bool = False) -> int:
+    """Clear the in-process embedding cache, and optionally the disk cache.
 
-    return results
+    Returns bytes freed from the in-process cache.
+    """
+    entries = len(_embedding_cache)
+    freed = _embedding_cache.clear()
+    logger.debug(f"Cleared cache ({entries} entries, {freed} bytes)")
+    if disk and getCache() is not None:
+        cleared = getCache().clear()
+        logger.debug(f"Cleared {cleared} entries from disk cache")
+    return freed
 
 
-def clearCache():
-    """Clear the embedding cache."""
-    global _embedding_cache
-    logger.debug(f"Clearing cache ({len(_embedding_cache)} entries)")
-    _embedding_cache = {}
+def getCacheStats() -> dict:
+    """Hit/miss counters and size for the embedding caches."""
+    disk = getCache()
+    return {
+        "backend": EMBEDDING_BACKEND,
+        "model": EMBEDDING_MODEL,
+        "memory": _embedding_cache.stats(),
+        "disk": disk.stats() if disk is not None else None,
+        "inflight": len(_inflight),
+        "coalesced": _coalesced,
+    }
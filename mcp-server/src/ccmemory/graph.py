@@ -7,120 +7,495 @@ Per doc/clarifications/1-DAG-with-CROSS-REFS.md:
 """
 
 import os
+import math
 import uuid
 import json
 import logging
 import time
+import functools
 from pathlib import Path
-from typing import Optional
-from neo4j import GraphDatabase
+from typing import Callable, Generator, NamedTuple, Optional
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from neo4j.exceptions import ClientError
+
+from .contextcache import getContextCache, invalidateServer
+from .embeddings import (
+    EMBED_STORAGE,
+    EMBEDDING_DIMS,
+    EMBEDDING_MODEL,
+    distinctMask,
+    embeddingMeta,
+    quantizeEmbedding,
+)
 
 logger = logging.getLogger("ccmemory.graph")
 
 # Suppress Neo4j notifications about missing relationship types
 logging.getLogger("neo4j.notifications").setLevel(logging.ERROR)
 
+# Vector indexes on n.embedding, created with the embedding model's dimensions
+VECTOR_INDEXES = [
+    ("decision_embedding", "Decision"),
+    ("correction_embedding", "Correction"),
+    ("insight_embedding", "Insight"),
+    ("projectfact_embedding", "ProjectFact"),
+    ("exception_embedding", "Exception"),
+    ("failedapproach_embedding", "FailedApproach"),
+    ("question_embedding", "Question"),
+    ("chunk_embedding", "Chunk"),
+]
+VECTOR_LABELS = dict(VECTOR_INDEXES)
+VECTOR_PROPERTIES = ("embedding", "embedding_q")  # Left out of read results
+
+# Search result categories. Full-text search uses the multi-label
+# memory_search index (init.cypher); vector indexes are single-label, so
+# semantic search queries each one within a single UNION statement
+PRECEDENT_CATEGORIES = {
+    "Decision": "decisions",
+    "Correction": "corrections",
+    "Insight": "insights",
+    "Question": "questions",
+    "FailedApproach": "failed_approaches",
+    "ProjectFact": "project_facts",
+    "Exception": "exceptions",
+}
+SEMANTIC_CATEGORIES = {
+    "decision_embedding": "decisions",
+    "correction_embedding": "corrections",
+    "insight_embedding": "insights",
+    "projectfact_embedding": "project_facts",
+    "exception_embedding": "exceptions",
+    "failedapproach_embedding": "failed_approaches",
+}
+
+# The vector indexes are shared by all projects, so a query for k neighbours
+# of one project fetches k scaled by the project's share of the label (times
+# an over-fetch margin), widening when that still returns too few
+VECTOR_OVERFETCH = float(os.getenv("CCMEMORY_VECTOR_OVERFETCH", "2.0"))
+VECTOR_MAX_FETCH = int(os.getenv("CCMEMORY_VECTOR_MAX_FETCH", "2000"))
+VECTOR_COUNTS_TTL = 60  # Seconds to cache per-project label counts
+
+# Dedup for batched writes: label -> (vector index, min score)
+DEDUP_INDEXES = {
+    "Correction": ("correction_embedding", 0.9),
+    "Exception": ("exception_embedding", 0.9),
+    "Insight": ("insight_embedding", 0.9),
+    "Question": ("question_embedding", 0.9),
+    "FailedApproach": ("failedapproach_embedding", 0.9),
+}
+DECISION_DUPLICATE_SCORE = 0.95
+# searchSemantic(distinct=True) drops hits this close to a better one
+DISTINCT_SCORE = 0.95
+DECISION_CANDIDATES = 5  # Prior decisions considered for dedup/CONTINUES/CITES
+
+# Explicit (LLM-detected) relationship types between decisions
+DECISION_RELATIONSHIPS = {
+    "SUPERSEDES",
+    "DEPENDS_ON",
+    "CONSTRAINS",
+    "CONFLICTS_WITH",
+    "IMPACTS",
+}
+
+# Creates Decision rows with one ANN lookup each, reused for dedup, CONTINUES
+# and CITES. Rows: {id, embedding, continues, props}
+DECISION_WRITE = """
+UNWIND $rows as row
+CALL {
+    WITH row
+    WITH row WHERE row.embedding IS NOT NULL
+    CALL db.index.vector.queryNodes('decision_embedding', $fetch, row.embedding)
+    YIELD node, score
+    WHERE node.project = $project
+    WITH node, score
+    ORDER BY score DESC
+    RETURN collect({node: node, score: score})[..$candidates] as candidates
+}
+WITH row, candidates,
+     head([c IN candidates WHERE c.score > $duplicate_score]) as dup
+// A replayed row whose node is already stored duplicates itself
+OPTIONAL MATCH (prior:Decision {id: row.id})
+WITH row, candidates,
+     CASE WHEN prior IS NULL THEN dup ELSE {node: prior, score: 1.0} END as dup
+CALL {
+    WITH row, candidates, dup
+    WITH row, candidates, dup WHERE dup IS NULL
+    CREATE (d:Decision {id: row.id})
+    SET d.timestamp = datetime(),
+        d.project = $project,
+        d.user_id = $user_id,
+        d.status = 'developmental',
+        d.embedding = row.embedding
+    SET d += row.props
+    MERGE (p:Project {name: $project})
+    ON CREATE SET p.created_at = datetime()
+    CREATE (d)-[:IN_PROJECT]->(p)
+    // CONTINUES the closest prior decision, inheriting its trace_id
+    WITH d, candidates, CASE WHEN row.continues
+        THEN head([c IN candidates WHERE c.score > 0.7])
+    END as cont
+    FOREACH (c IN CASE WHEN cont IS NULL THEN [] ELSE [cont] END |
+        CREATE (d)-[:CONTINUES {similarity: c.score, auto: false}]->(c.node)
+        SET d.trace_id = coalesce(d.trace_id, c.node.trace_id)
+    )
+    // CITES similar OLDER decisions (DAG: newer->older). SUPERSEDES is only
+    // created via explicit LLM detection, not similarity
+    WITH d, cont, [c IN candidates
+        WHERE c.node.timestamp < d.timestamp AND c.score > 0.85] as cites
+    FOREACH (c IN cites |
+        CREATE (d)-[:CITES {similarity: c.score, auto: true}]->(c.node)
+    )
+    RETURN cont.node.id as continued_id, [c IN cites | c.node.id] as cited_ids
+    UNION
+    WITH dup
+    WITH dup WHERE dup IS NOT NULL
+    RETURN null as continued_id, [] as cited_ids
+}
+RETURN row.id as id, dup.node.id as existing_id, dup.score as similarity,
+       continued_id, cited_ids
+"""
 
-class GraphClient:
-    def __init__(self, init_schema: bool = False):
-        uri = os.getenv("CCMEMORY_NEO4J_URI", "bolt://localhost:7687")
-        user = os.getenv("CCMEMORY_NEO4J_USER", "neo4j")
-        password = os.getenv("CCMEMORY_NEO4J_PASSWORD", "ccmemory")
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
-        self.user_id = os.getenv("CCMEMORY_USER_ID")
-        if init_schema:
-            self.initSchema()
 
-    def initSchema(self):
-        """Initialize Neo4j schema from init.cypher."""
-        cypher_paths = [
-            Path("/app/init.cypher"),
-            Path(__file__).parent.parent.parent / "init.cypher",
-        ]
-        for path in cypher_paths:
-            if path.exists():
-                cypher = path.read_text()
-                for stmt in cypher.split(";"):
-                    stmt = stmt.strip()
-                    if stmt and not stmt.startswith("//"):
-                        with self.driver.session() as session:
-                            session.run(stmt)
-                logging.info("Schema initialized from %s", path)
-                return
-        logging.warning("init.cypher not found")
+# Connection pool shared by each driver's sessions. Requests waiting longer
+# than the acquire timeout for a free connection fail instead of queueing
+NEO4J_POOL_SIZE = int(os.getenv("CCMEMORY_NEO4J_POOL_SIZE", "50"))
+NEO4J_ACQUIRE_TIMEOUT = float(os.getenv("CCMEMORY_NEO4J_ACQUIRE_TIMEOUT", "10"))
+
+# Per-project counters behind getAllMetrics: nodes per label (label -> key)
+# plus edge tallies. Also the properties of the optional :ProjectStats node,
+# which writes increment so metrics reads are a single node lookup
+STAT_LABELS = {
+    "Decision": "decisions",
+    "Correction": "corrections",
+    "Insight": "insights",
+    "Exception": "exceptions",
+    "FailedApproach": "failed_approaches",
+    "ProjectFact": "project_facts",
+    "Question": "questions",
+    "Reference": "references",
+}
+STATS_KEYS = (
+    *STAT_LABELS.values(),
+    "curated",
+    "precedent_links",  # CITES/SUPERSEDES from decisions (reuse rate)
+    "supersessions",
+    "edges",  # Between project nodes (density)
+)
+PROJECT_STATS = os.getenv("CCMEMORY_PROJECT_STATS", "false").lower() == "true"
+
+# Read queries shared by GraphClient and AsyncGraphClient. {projection} is
+# filled by nodeProjection("n", include_vectors), {visibility} by _visibility()
+RECENT_QUERY = """
+CALL {{
+    MATCH (n:Decision {{project: $project}}) WHERE {visibility}
+    RETURN n, 'Decision' as node_type
+    UNION ALL
+    MATCH (n:Correction {{project: $project}}) WHERE {visibility}
+    RETURN n, 'Correction' as node_type
+    UNION ALL
+    MATCH (n:Insight {{project: $project}}) WHERE {visibility}
+    RETURN n, 'Insight' as node_type
+    UNION ALL
+    MATCH (n:Exception {{project: $project}}) WHERE {visibility}
+    RETURN n, 'Exception' as node_type
+    UNION ALL
+    MATCH (n:FailedApproach {{project: $project}}) WHERE {visibility}
+    RETURN n, 'FailedApproach' as node_type
+}}
+WITH n, node_type
+ORDER BY n.timestamp DESC
+LIMIT $limit
+RETURN {projection} as n, node_type
+"""
 
-    def close(self):
-        self.driver.close()
+PRECEDENT_QUERY = """
+CALL db.index.fulltext.queryNodes("memory_search", $search_query)
+YIELD node, score
+WHERE node.project = $project AND {visibility}
+WITH node as n, score,
+     [l IN labels(node) WHERE l IN $labels][0] as label
+ORDER BY score DESC
+WITH label, collect({{node: {projection}, score: score}})[..$limit] as hits
+RETURN label, hits
+"""
 
-    # === Existence Checks ===
+TOPIC_QUERY = """
+MATCH (n:Decision {{project: $project}})
+WHERE $topic IN n.topics
+WITH n
+ORDER BY n.timestamp DESC
+LIMIT $limit
+RETURN {projection} as n
+"""
 
-    def decisionExists(self, project: str, description: str) -> bool:
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (d:Decision {project: $project, description: $description})
-                RETURN count(d) > 0 as exists
-                """,
-                project=project,
-                description=description,
-            )
-            return result.single()["exists"]
+STALE_DECISIONS_QUERY = """
+MATCH (n:Decision {{project: $project}})
+WHERE n.status = 'developmental'
+  AND n.timestamp < datetime() - duration({{days: $days}})
+WITH n
+ORDER BY n.timestamp DESC
+RETURN {projection} as n
+"""
 
-    def referenceFileExists(self, project: str, source_file: str) -> bool:
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (c:ReferenceChunk {project: $project, source_file: $source_file})
-                RETURN count(c) > 0 as exists
-                """,
-                project=project,
-                source_file=source_file,
-            )
-            return result.single()["exists"]
+FAILED_APPROACHES_QUERY = """
+MATCH (n:FailedApproach {{project: $project}})
+WITH n
+ORDER BY n.timestamp DESC
+LIMIT $limit
+RETURN {projection} as n
+"""
 
-    def projectFactExists(
-        self, project: str, embedding: list, threshold: float = 0.9
-    ) -> bool:
-        """Check if a semantically similar fact already exists."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                CALL db.index.vector.queryNodes('projectfact_embedding', 50, $embedding)
-                YIELD node, score
-                WHERE node.project = $project AND score >= $threshold
-                RETURN node, score
-                LIMIT 1
-                """,
-                embedding=embedding,
-                project=project,
-                threshold=threshold,
-            )
-            return result.single() is not None
+PROJECT_FACTS_QUERY = """
+MATCH (n:ProjectFact {{project: $project}})
+WITH n
+ORDER BY n.timestamp DESC
+LIMIT $limit
+RETURN {projection} as n
+"""
 
-    def _isDuplicate(
-        self, index_name: str, project: str, embedding: list, threshold: float = 0.9
-    ) -> dict | None:
-        """Check if semantically similar node exists. Returns match info or None."""
-        if not embedding:
-            return None
-        with self.driver.session() as session:
-            result = session.run(
-                f"""
-                CALL db.index.vector.queryNodes('{index_name}', 3, $embedding)
-                YIELD node, score
-                WHERE node.project = $project AND score >= $threshold
-                RETURN node.id as id, score
-                ORDER BY score DESC
-                LIMIT 1
-                """,
-                embedding=embedding,
-                project=project,
-                threshold=threshold,
-            )
-            record = result.single()
-            if record:
-                return {"id": record["id"], "score": record["score"]}
-            return None
+OPEN_QUESTIONS_QUERY = """
+MATCH (n:Question {{project: $project}})
+WHERE n.answer IS NULL OR n.answer = ''
+WITH n
+ORDER BY n.timestamp DESC
+LIMIT $limit
+RETURN {projection} as n
+"""
+
+DECISION_EXISTS_QUERY = """
+MATCH (d:Decision {project: $project, description: $description})
+RETURN count(d) > 0 as exists
+"""
+
+REFERENCE_FILE_EXISTS_QUERY = """
+MATCH (c:ReferenceChunk {project: $project, source_file: $source_file})
+RETURN count(c) > 0 as exists
+"""
+
+EXCEPTION_CLUSTERS_QUERY = """
+MATCH (e:Exception {project: $project})
+WITH e.rule_broken as rule, count(e) as count, collect(e.justification) as justifications
+WHERE count >= 2
+RETURN rule, count, justifications
+ORDER BY count DESC
+"""
+
+SUPERSESSION_CHAINS_QUERY = """
+MATCH path = (newest:Decision {project: $project})-[:SUPERSEDES*2..]->(oldest:Decision)
+WHERE NOT EXISTS { (x:Decision)-[:SUPERSEDES]->(newest) }
+WITH newest, oldest, length(path) as chain_length,
+     [n IN nodes(path) | n.description] as descriptions
+RETURN newest.id as newest_id, newest.description as newest_desc,
+       oldest.description as oldest_desc, chain_length, descriptions
+ORDER BY chain_length DESC
+LIMIT 10
+"""
+
+CORRECTION_HOTSPOTS_QUERY = """
+MATCH (c:Correction {project: $project})
+WHERE c.topics IS NOT NULL AND size(c.topics) > 0
+UNWIND c.topics as topic
+WITH topic, count(c) as count, collect(c.right_belief)[0..3] as samples
+WHERE count >= 2
+RETURN topic, count, samples
+ORDER BY count DESC
+"""
+
+CHUNK_MERGE = """
+MERGE (ch:Chunk {id: $chunk_id})
+SET ch.project = $project,
+    ch.source_file = $source_file,
+    ch.section = $section,
+    ch.content = $content,
+    ch.embedding = $embedding,
+    ch.last_indexed = datetime()
+SET ch += $meta
+MERGE (p:Project {name: $project})
+ON CREATE SET p.created_at = datetime()
+MERGE (ch)-[:IN_PROJECT]->(p)
+"""
+
+TELEMETRY_CREATE = """
+CREATE (t:TelemetryEvent {
+    id: $id,
+    event_type: $event_type,
+    project: $project,
+    user_id: $user_id,
+    timestamp: datetime(),
+    data_json: $data_json,
+    count: $count,
+    duration_ms: $duration_ms
+})
+MERGE (p:Project {name: $project})
+ON CREATE SET p.created_at = datetime()
+CREATE (t)-[:IN_PROJECT]->(p)
+"""
+
+RETRIEVAL_CREATE = """
+CREATE (r:Retrieval {
+    id: $id,
+    project: $project,
+    user_id: $user_id,
+    timestamp: datetime(),
+    retrieved_ids: $retrieved_ids,
+    retrieved_count: $count,
+    context_summary: $context_summary
+})
+MERGE (p:Project {name: $project})
+ON CREATE SET p.created_at = datetime()
+CREATE (r)-[:IN_PROJECT]->(p)
+"""
+
+# Links a batch of nodes written before the :Project registry to theirs
+# Labels written with a project property, each with a project index
+PROJECT_LABELS = [
+    "Decision",
+    "Correction",
+    "Exception",
+    "Insight",
+    "Question",
+    "FailedApproach",
+    "Reference",
+    "ProjectFact",
+    "Chunk",
+    "TelemetryEvent",
+    "Retrieval",
+    "Session",
+]
+
+# Marks a graph whose pre-registry nodes are all linked; until then the
+# dashboard also matches projects by the n.project property
+PROJECT_LINKS_CHECK = """
+MATCH (m:Migration {name: 'project_links'}) RETURN count(m) > 0 as done
+"""
+PROJECT_LINKS_DONE = """
+MERGE (m:Migration {name: 'project_links'})
+ON CREATE SET m.completed_at = datetime()
+"""
+
+RETRIEVALS_QUERY = """
+MATCH (r:Retrieval {project: $project})
+RETURN r ORDER BY r.timestamp DESC LIMIT $limit
+"""
+
+# All STATS_KEYS counters in one statement, each anchored on a label index
+STATS_QUERY = """
+CALL {
+    MATCH (d:Decision {project: $project})
+    RETURN count(d) as decisions,
+           count(CASE WHEN d.status = 'curated' THEN 1 END) as curated
+}
+CALL { MATCH (n:Correction {project: $project}) RETURN count(n) as corrections }
+CALL { MATCH (n:Insight {project: $project}) RETURN count(n) as insights }
+CALL { MATCH (n:Exception {project: $project}) RETURN count(n) as exceptions }
+CALL { MATCH (n:FailedApproach {project: $project}) RETURN count(n) as failed_approaches }
+CALL { MATCH (n:ProjectFact {project: $project}) RETURN count(n) as project_facts }
+CALL { MATCH (n:Question {project: $project}) RETURN count(n) as questions }
+CALL { MATCH (n:Reference {project: $project}) RETURN count(n) as references }
+CALL {
+    MATCH (:Decision {project: $project})-[r:CITES|SUPERSEDES]->(:Decision)
+    RETURN count(r) as precedent_links,
+           count(CASE WHEN type(r) = 'SUPERSEDES' THEN 1 END) as supersessions
+}
+CALL {
+    CALL {
+        MATCH (n:Decision {project: $project})-[r]->(m) WHERE m.project = $project
+        RETURN count(r) as edges
+        UNION ALL
+        MATCH (n:Correction {project: $project})-[r]->(m) WHERE m.project = $project
+        RETURN count(r) as edges
+        UNION ALL
+        MATCH (n:Insight {project: $project})-[r]->(m) WHERE m.project = $project
+        RETURN count(r) as edges
+        UNION ALL
+        MATCH (n:Exception {project: $project})-[r]->(m) WHERE m.project = $project
+        RETURN count(r) as edges
+        UNION ALL
+        MATCH (n:FailedApproach {project: $project})-[r]->(m) WHERE m.project = $project
+        RETURN count(r) as edges
+        UNION ALL
+        MATCH (n:ProjectFact {project: $project})-[r]->(m) WHERE m.project = $project
+        RETURN count(r) as edges
+        UNION ALL
+        MATCH (n:Question {project: $project})-[r]->(m) WHERE m.project = $project
+        RETURN count(r) as edges
+        UNION ALL
+        MATCH (n:Reference {project: $project})-[r]->(m) WHERE m.project = $project
+        RETURN count(r) as edges
+    }
+    RETURN sum(edges) as edges
+}
+RETURN decisions, corrections, insights, exceptions, failed_approaches, project_facts, questions, references, curated, precedent_links, supersessions, edges
+"""
+
+STATS_READ = """
+MATCH (s:ProjectStats {project: $project})
+RETURN s {.*} as stats
+"""
+
+STATS_WRITE = """
+MERGE (s:ProjectStats {project: $project})
+SET s += $stats, s.refreshed = datetime()
+MERGE (p:Project {name: $project})
+ON CREATE SET p.created_at = datetime()
+MERGE (s)-[:IN_PROJECT]->(p)
+"""
+
+# Applied only once a full count has created the node (see projectStats)
+STATS_INCREMENT = "MATCH (s:ProjectStats {project: $project}) SET " + ", ".join(
+    f"s.{key} = s.{key} + $deltas.{key}" for key in STATS_KEYS
+)
+
+
+class _Query(NamedTuple):
+    """A Cypher statement yielded by a _GraphBase step generator."""
+
+    text: str
+    params: dict
+    counters: bool = False  # Reply with (records, summary counters)
+
+
+class _Write(NamedTuple):
+    """Steps to run in one (retried) write transaction.
+
+    steps makes a fresh step generator, since the driver may retry it.
+    """
+
+    steps: Callable[[], Generator]
+
+
+def _query(text: str, counters: bool = False, **params) -> _Query:
+    return _Query(text, params, counters)
+
+
+def _driven(steps):
+    """Make a _GraphBase step generator a client method.
+
+    The generator yields _Query and _Write steps and is sent back their
+    records (or result); what it returns is the method's result. The client's
+    _drive runs the steps, so the method blocks on GraphClient and returns a
+    coroutine on AsyncGraphClient.
+    """
+
+    @functools.wraps(steps)
+    def method(self, *args, **kwargs):
+        return self._drive(steps(self, *args, **kwargs))
+
+    return method
+
+
+class _GraphBase:
+    """Queries and row handling shared by GraphClient and AsyncGraphClient.
+
+    Each operation is written once, as a step generator yielding the queries
+    it runs (see _driven). The clients only implement _drive, on the sync or
+    async Neo4j driver.
+    """
+
+    def __init__(self):
+        self.user_id = os.getenv("CCMEMORY_USER_ID")
+        self._vector_counts: dict[tuple[str, str], tuple[float, int, int]] = {}
+        self._outdated: set[str] = set()  # Projects whose context this wrote
 
     # === Domain 1: Record Functions ===
     # All methods take project directly (no session dependency)
@@ -145,135 +520,16 @@ class GraphClient:
         Returns dict with 'action': 'created' or 'skipped'
         """
         logger.debug(f"createDecision(id={decision_id[:12]}..., project={project})")
-        start = time.time()
-
-        with self.driver.session() as session:
-            # Check for semantic duplicates
-            if embedding:
-                dup_result = session.run(
-                    """
-                    CALL db.index.vector.queryNodes('decision_embedding', 3, $embedding)
-                    YIELD node, score
-                    WHERE node.project = $project
-                    RETURN node.id as id, node.description as description, score
-                    ORDER BY score DESC
-                    LIMIT 1
-                    """,
-                    embedding=embedding,
-                    project=project,
-                )
-                dup_record = dup_result.single()
-
-                if dup_record and dup_record["score"] > 0.95:
-                    duration = int((time.time() - start) * 1000)
-                    logger.info(
-                        f"Skipped duplicate Decision (score={dup_record['score']:.3f}) ({duration}ms)",
-                        extra={"cat": "tool"},
-                    )
-                    return {
-                        "action": "skipped",
-                        "existing_id": dup_record["id"],
-                        "similarity": dup_record["score"],
-                    }
-
-            # Create the decision node directly (no session)
-            session.run(
-                """
-                CREATE (d:Decision {id: $decision_id})
-                SET d.description = $description,
-                    d.timestamp = datetime(),
-                    d.project = $project,
-                    d.user_id = $user_id,
-                    d.status = 'developmental',
-                    d.embedding = $embedding,
-                    d.topics = $topics,
-                    d.trace_id = $trace_id
-                SET d += $props
-                """,
-                decision_id=decision_id,
-                description=description,
-                project=project,
-                user_id=self.user_id,
-                embedding=embedding,
-                topics=topics or [],
-                trace_id=trace_id,
-                props=kwargs,
-            )
-
-            # If this continues a prior decision, create CONTINUES edge and inherit trace_id
-            continued_id = None
-            if continues_decision and embedding:
-                cont_result = session.run(
-                    """
-                    MATCH (d:Decision {id: $decision_id})
-                    CALL db.index.vector.queryNodes('decision_embedding', 3, $embedding)
-                    YIELD node, score
-                    WHERE node.project = $project
-                      AND node.id <> $decision_id
-                      AND score > 0.7
-                    WITH d, node, score
-                    ORDER BY score DESC
-                    LIMIT 1
-                    CREATE (d)-[:CONTINUES {similarity: score, auto: false}]->(node)
-                    WITH d, node
-                    WHERE node.trace_id IS NOT NULL AND d.trace_id IS NULL
-                    SET d.trace_id = node.trace_id
-                    RETURN node.id as continued_id, node.trace_id as inherited_trace
-                    """,
-                    decision_id=decision_id,
-                    embedding=embedding,
-                    project=project,
-                )
-                cont_record = cont_result.single()
-                if cont_record:
-                    continued_id = cont_record["continued_id"]
-
-            # Link to similar OLDER decisions via CITES (DAG structure: newer→older)
-            # SUPERSEDES should only be created via explicit LLM detection, not similarity
-            cited_ids = []
-            if embedding:
-                link_result = session.run(
-                    """
-                    MATCH (d:Decision {id: $decision_id})
-                    CALL db.index.vector.queryNodes('decision_embedding', 5, $embedding)
-                    YIELD node, score
-                    WHERE node.project = $project
-                      AND node.id <> $decision_id
-                      AND node.timestamp < d.timestamp
-                      AND score > 0.85
-                    CREATE (d)-[:CITES {similarity: score, auto: true}]->(node)
-                    RETURN node.id as linked_id, score
-                    """,
-                    decision_id=decision_id,
-                    embedding=embedding,
-                    project=project,
-                )
-                cited_ids = [record["linked_id"] for record in link_result]
-
-        duration = int((time.time() - start) * 1000)
-        result = {"action": "created"}
-        if continued_id:
-            result["continues_id"] = continued_id
-        if cited_ids:
-            result["cited_ids"] = cited_ids
-
-        links = []
-        if continued_id:
-            links.append(f"continues 1")
-        if cited_ids:
-            links.append(f"cites {len(cited_ids)}")
-        link_str = f" ({', '.join(links)})" if links else ""
-
-        logger.info(
-            f"Created Decision id={decision_id[:12]}...{link_str} ({duration}ms)",
-            extra={
-                "cat": "tool",
-                "event": "node_created",
-                "node_type": "Decision",
-                "project": project,
-            },
+        row = nodeRow(
+            decision_id,
+            embedding,
+            description=description,
+            topics=topics or [],
+            trace_id=trace_id,
+            **kwargs,
         )
-        return result
+        row["continues"] = bool(continues_decision)
+        return self._storeOne(project, "Decision", row)
 
     def createCorrection(
         self,
@@ -286,54 +542,15 @@ class GraphClient:
         **kwargs,
     ) -> dict:
         logger.debug(f"createCorrection(id={correction_id[:12]}..., project={project})")
-        start = time.time()
-
-        dup = self._isDuplicate("correction_embedding", project, embedding, 0.9)
-        if dup:
-            duration = int((time.time() - start) * 1000)
-            logger.info(
-                f"Skipped duplicate Correction (score={dup['score']:.3f}) ({duration}ms)",
-                extra={"cat": "tool"},
-            )
-            return {
-                "action": "skipped",
-                "existing_id": dup["id"],
-                "similarity": dup["score"],
-            }
-
-        with self.driver.session() as session:
-            session.run(
-                """
-                CREATE (c:Correction {id: $correction_id})
-                SET c.wrong_belief = $wrong_belief,
-                    c.right_belief = $right_belief,
-                    c.timestamp = datetime(),
-                    c.project = $project,
-                    c.user_id = $user_id,
-                    c.embedding = $embedding,
-                    c.topics = $topics
-                SET c += $props
-                """,
-                correction_id=correction_id,
-                wrong_belief=wrong_belief,
-                right_belief=right_belief,
-                project=project,
-                user_id=self.user_id,
-                embedding=embedding,
-                topics=topics or [],
-                props=kwargs,
-            )
-        duration = int((time.time() - start) * 1000)
-        logger.info(
-            f"Created Correction id={correction_id[:12]}... ({duration}ms)",
-            extra={
-                "cat": "tool",
-                "event": "node_created",
-                "node_type": "Correction",
-                "project": project,
-            },
+        row = nodeRow(
+            correction_id,
+            embedding,
+            wrong_belief=wrong_belief,
+            right_belief=right_belief,
+            topics=topics or [],
+            **kwargs,
         )
-        return {"action": "created"}
+        return self._storeOne(project, "Correction", row)
 
     def createException(
         self,
@@ -346,54 +563,15 @@ class GraphClient:
         **kwargs,
     ) -> dict:
         logger.debug(f"createException(id={exception_id[:12]}..., project={project})")
-        start = time.time()
-
-        dup = self._isDuplicate("exception_embedding", project, embedding, 0.9)
-        if dup:
-            duration = int((time.time() - start) * 1000)
-            logger.info(
-                f"Skipped duplicate Exception (score={dup['score']:.3f}) ({duration}ms)",
-                extra={"cat": "tool"},
-            )
-            return {
-                "action": "skipped",
-                "existing_id": dup["id"],
-                "similarity": dup["score"],
-            }
-
-        with self.driver.session() as session:
-            session.run(
-                """
-                CREATE (e:Exception {id: $exception_id})
-                SET e.rule_broken = $rule_broken,
-                    e.justification = $justification,
-                    e.timestamp = datetime(),
-                    e.project = $project,
-                    e.user_id = $user_id,
-                    e.embedding = $embedding,
-                    e.topics = $topics
-                SET e += $props
-                """,
-                exception_id=exception_id,
-                rule_broken=rule_broken,
-                justification=justification,
-                project=project,
-                user_id=self.user_id,
-                embedding=embedding,
-                topics=topics or [],
-                props=kwargs,
-            )
-        duration = int((time.time() - start) * 1000)
-        logger.info(
-            f"Created Exception id={exception_id[:12]}... ({duration}ms)",
-            extra={
-                "cat": "tool",
-                "event": "node_created",
-                "node_type": "Exception",
-                "project": project,
-            },
+        row = nodeRow(
+            exception_id,
+            embedding,
+            rule_broken=rule_broken,
+            justification=justification,
+            topics=topics or [],
+            **kwargs,
         )
-        return {"action": "created"}
+        return self._storeOne(project, "Exception", row)
 
     def createInsight(
         self,
@@ -406,54 +584,15 @@ class GraphClient:
         **kwargs,
     ) -> dict:
         logger.debug(f"createInsight(id={insight_id[:12]}..., project={project})")
-        start = time.time()
-
-        dup = self._isDuplicate("insight_embedding", project, embedding, 0.9)
-        if dup:
-            duration = int((time.time() - start) * 1000)
-            logger.info(
-                f"Skipped duplicate Insight (score={dup['score']:.3f}) ({duration}ms)",
-                extra={"cat": "tool"},
-            )
-            return {
-                "action": "skipped",
-                "existing_id": dup["id"],
-                "similarity": dup["score"],
-            }
-
-        with self.driver.session() as session:
-            session.run(
-                """
-                CREATE (i:Insight {id: $insight_id})
-                SET i.category = $category,
-                    i.summary = $summary,
-                    i.timestamp = datetime(),
-                    i.project = $project,
-                    i.user_id = $user_id,
-                    i.embedding = $embedding,
-                    i.topics = $topics
-                SET i += $props
-                """,
-                insight_id=insight_id,
-                category=category,
-                summary=summary,
-                project=project,
-                user_id=self.user_id,
-                embedding=embedding,
-                topics=topics or [],
-                props=kwargs,
-            )
-        duration = int((time.time() - start) * 1000)
-        logger.info(
-            f"Created Insight id={insight_id[:12]}... ({duration}ms)",
-            extra={
-                "cat": "tool",
-                "event": "node_created",
-                "node_type": "Insight",
-                "project": project,
-            },
+        row = nodeRow(
+            insight_id,
+            embedding,
+            category=category,
+            summary=summary,
+            topics=topics or [],
+            **kwargs,
         )
-        return {"action": "created"}
+        return self._storeOne(project, "Insight", row)
 
     def createQuestion(
         self,
@@ -466,55 +605,15 @@ class GraphClient:
         **kwargs,
     ) -> dict:
         logger.debug(f"createQuestion(id={question_id[:12]}..., project={project})")
-        start = time.time()
-
-        if embedding:
-            dup = self._isDuplicate("question_embedding", project, embedding, 0.9)
-            if dup:
-                duration = int((time.time() - start) * 1000)
-                logger.info(
-                    f"Skipped duplicate Question (score={dup['score']:.3f}) ({duration}ms)",
-                    extra={"cat": "tool"},
-                )
-                return {
-                    "action": "skipped",
-                    "existing_id": dup["id"],
-                    "similarity": dup["score"],
-                }
-
-        with self.driver.session() as session:
-            session.run(
-                """
-                CREATE (q:Question {id: $question_id})
-                SET q.question = $question,
-                    q.answer = $answer,
-                    q.timestamp = datetime(),
-                    q.project = $project,
-                    q.user_id = $user_id,
-                    q.embedding = $embedding,
-                    q.topics = $topics
-                SET q += $props
-                """,
-                question_id=question_id,
-                question=question,
-                answer=answer,
-                project=project,
-                user_id=self.user_id,
-                embedding=embedding,
-                topics=topics or [],
-                props=kwargs,
-            )
-        duration = int((time.time() - start) * 1000)
-        logger.info(
-            f"Created Question id={question_id[:12]}... ({duration}ms)",
-            extra={
-                "cat": "tool",
-                "event": "node_created",
-                "node_type": "Question",
-                "project": project,
-            },
+        row = nodeRow(
+            question_id,
+            embedding,
+            question=question,
+            answer=answer,
+            topics=topics or [],
+            **kwargs,
         )
-        return {"action": "created"}
+        return self._storeOne(project, "Question", row)
 
     def createFailedApproach(
         self,
@@ -528,57 +627,16 @@ class GraphClient:
         **kwargs,
     ) -> dict:
         logger.debug(f"createFailedApproach(id={fa_id[:12]}..., project={project})")
-        start = time.time()
-
-        if embedding:
-            dup = self._isDuplicate("failedapproach_embedding", project, embedding, 0.9)
-            if dup:
-                duration = int((time.time() - start) * 1000)
-                logger.info(
-                    f"Skipped duplicate FailedApproach (score={dup['score']:.3f}) ({duration}ms)",
-                    extra={"cat": "tool"},
-                )
-                return {
-                    "action": "skipped",
-                    "existing_id": dup["id"],
-                    "similarity": dup["score"],
-                }
-
-        with self.driver.session() as session:
-            session.run(
-                """
-                CREATE (f:FailedApproach {id: $fa_id})
-                SET f.approach = $approach,
-                    f.outcome = $outcome,
-                    f.lesson = $lesson,
-                    f.timestamp = datetime(),
-                    f.project = $project,
-                    f.user_id = $user_id,
-                    f.embedding = $embedding,
-                    f.topics = $topics
-                SET f += $props
-                """,
-                fa_id=fa_id,
-                approach=approach,
-                outcome=outcome,
-                lesson=lesson,
-                project=project,
-                user_id=self.user_id,
-                embedding=embedding,
-                topics=topics or [],
-                props=kwargs,
-            )
-        duration = int((time.time() - start) * 1000)
-        logger.info(
-            f"Created FailedApproach id={fa_id[:12]}... ({duration}ms)",
-            extra={
-                "cat": "tool",
-                "event": "node_created",
-                "node_type": "FailedApproach",
-                "project": project,
-            },
+        row = nodeRow(
+            fa_id,
+            embedding,
+            approach=approach,
+            outcome=outcome,
+            lesson=lesson,
+            topics=topics or [],
+            **kwargs,
         )
-        return {"action": "created"}
+        return self._storeOne(project, "FailedApproach", row)
 
     def createReference(
         self,
@@ -589,410 +647,456 @@ class GraphClient:
         **kwargs,
     ):
         logger.debug(f"createReference(id={ref_id[:12]}..., type={ref_type})")
-        start = time.time()
-        with self.driver.session() as session:
-            session.run(
-                """
-                CREATE (r:Reference {id: $ref_id})
-                SET r.type = $ref_type,
-                    r.uri = $uri,
-                    r.timestamp = datetime(),
-                    r.project = $project,
-                    r.user_id = $user_id
-                SET r += $props
-                """,
-                ref_id=ref_id,
-                ref_type=ref_type,
-                uri=uri,
-                project=project,
-                user_id=self.user_id,
-                props=kwargs,
-            )
-        duration = int((time.time() - start) * 1000)
-        logger.info(
-            f"Created Reference id={ref_id[:12]}... ({duration}ms)",
-            extra={
-                "cat": "tool",
-                "event": "node_created",
-                "node_type": "Reference",
-                "project": project,
-            },
-        )
+        row = nodeRow(ref_id, None, type=ref_type, uri=uri, **kwargs)
+        return self._storeOne(project, "Reference", row)
 
-    def createDecisionRelationship(
+    def createProjectFact(
         self,
-        decision_id: str,
+        fact_id: str,
         project: str,
-        target_description: str,
-        relationship_type: str,
-        reason: str,
+        category: str,
+        fact: str,
         embedding: list,
-    ) -> bool:
-        """Create explicit relationship from decision to a matching prior decision.
+        **kwargs,
+    ):
+        logger.debug(f"createProjectFact(id={fact_id[:12]}..., project={project})")
+        row = nodeRow(fact_id, embedding, category=category, fact=fact, **kwargs)
+        return self._storeOne(project, "ProjectFact", row)
 
-        Finds the best matching prior decision by description similarity
-        and creates the specified relationship.
+    # === Existence Checks ===
 
-        Returns True if relationship was created, False if no match found.
-        """
-        logger.debug(
-            f"createDecisionRelationship(from={decision_id[:12]}..., type={relationship_type})"
+    @_driven
+    def decisionExists(self, project: str, description: str) -> bool:
+        [record] = yield _query(
+            DECISION_EXISTS_QUERY, project=project, description=description
         )
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                CALL db.index.vector.queryNodes('decision_embedding', 5, $embedding)
-                YIELD node, score
-                WHERE node.project = $project
-                  AND node.id <> $decision_id
-                  AND score > 0.7
-                RETURN node.id as target_id, node.description as description, score
-                ORDER BY score DESC
-                LIMIT 1
-                """,
-                embedding=embedding,
-                project=project,
-                decision_id=decision_id,
-            )
-            record = result.single()
+        return record["exists"]
 
-            if not record:
-                logger.debug(
-                    f"No matching decision found for relationship to: {target_description[:50]}..."
-                )
-                return False
-
-            rel_type = relationship_type.upper().replace(" ", "_")
-            valid_types = {
-                "SUPERSEDES",
-                "DEPENDS_ON",
-                "CONSTRAINS",
-                "CONFLICTS_WITH",
-                "IMPACTS",
-            }
-            if rel_type not in valid_types:
-                logger.warning(f"Unknown relationship type: {rel_type}, using IMPACTS")
-                rel_type = "IMPACTS"
+    @_driven
+    def referenceFileExists(self, project: str, source_file: str) -> bool:
+        [record] = yield _query(
+            REFERENCE_FILE_EXISTS_QUERY, project=project, source_file=source_file
+        )
+        return record["exists"]
 
-            session.run(
-                f"""
-                MATCH (d:Decision {{id: $decision_id}})
-                MATCH (target:Decision {{id: $target_id}})
-                CREATE (d)-[:{rel_type} {{reason: $reason, auto: false, similarity: $score}}]->(target)
-                """,
-                decision_id=decision_id,
-                target_id=record["target_id"],
-                reason=reason,
-                score=record["score"],
-            )
-            logger.info(
-                f"Created {rel_type} relationship from {decision_id[:12]} to {record['target_id'][:12]}",
-                extra={"cat": "tool"},
+    @_driven
+    def projectFactExists(
+        self, project: str, embedding: list, threshold: float = 0.9
+    ) -> bool:
+        """Check if a semantically similar fact already exists."""
+        hits = yield from self._search(
+            "projectfact_embedding", embedding, project, 1, min_score=threshold
+        )
+        return bool(hits)
+
+    @_driven
+    def _isDuplicate(
+        self, index_name: str, project: str, embedding: list, threshold: float = 0.9
+    ) -> dict | None:
+        """Check if semantically similar node exists. Returns match info or None."""
+        if not embedding:
+            return None
+        hits = yield from self._search(
+            index_name, embedding, project, 1, min_score=threshold
+        )
+        if hits:
+            node, score = hits[0]
+            return {"id": node["id"], "score": score}
+        return None
+
+    # === Project-Scoped Vector Search ===
+
+    def _labelCounts(self, labels: list[str], project: str) -> dict[str, tuple]:
+        """(nodes of the project, all nodes) per label, cached briefly."""
+        counts = self._cachedCounts(labels, project)
+        missing = [label for label in labels if label not in counts]
+        if missing:
+            records = yield _query(_labelCountsQuery(missing), project=project)
+            counts.update(self._cacheCounts(project, records))
+        return counts
+
+    @_driven
+    def vectorFetchSize(self, label: str, project: str, k: int) -> int:
+        """Neighbours to request from a label's index for k project hits."""
+        counts = yield from self._labelCounts([label], project)
+        return fetchSize(k, *counts[label])
+
+    def _search(
+        self, index: str, embedding: list, project: str, k: int, **kwargs
+    ) -> list[tuple]:
+        """Top-k nodes of a project from one vector index (see _searchMany)."""
+        hits = yield from self._searchMany([index], embedding, project, k, **kwargs)
+        return hits[index]
+
+    def _searchMany(
+        self,
+        indexes: list[str],
+        embedding: list,
+        project: str,
+        k: int,
+        where: str = "true",
+        min_score: float = 0.0,
+        include_vectors: bool = False,
+        include_codes: bool = False,
+        **params,
+    ) -> dict[str, list[tuple]]:
+        """Top-k nodes of a project from each of several global vector indexes.
+
+        All indexes are queried in one UNION statement. Each starts at
+        vectorFetchSize() and is widened, in a further round, until k hits
+        pass the filter, the index has no more nodes, or fetched scores drop
+        below min_score (so widening can't find a better match). `where` may
+        reference `node`, `score` and extra query params.
+
+        Returns {index: [(properties, score), ...]}, best first. Vector
+        properties are left out unless include_vectors is set, or just the
+        embedding_q codes kept with include_codes.
+        """
+        labels = [VECTOR_LABELS[i] for i in indexes]
+        counts = yield from self._labelCounts(labels, project)
+        fetch = {i: fetchSize(k, *counts[VECTOR_LABELS[i]]) for i in indexes}
+        results = {}
+        pending = list(indexes)
+        while pending:
+            records = yield _query(
+                _vectorSearchQuery(pending, where, include_vectors, include_codes),
+                fetch=[fetch[index] for index in pending],
+                embedding=embedding,
+                project=project,
+                min_score=min_score,
+                k=k,
+                **params,
             )
-            return True
+            pending = _collectHits(records, pending, fetch, k, min_score, results)
+        return results
 
-    def createProjectFact(
+    _vectorSearch = _driven(_search)
+    _vectorSearchMany = _driven(_searchMany)
+
+    # === Batched Writes ===
+
+    @_driven
+    def _storeOne(self, project: str, label: str, row: dict) -> dict:
+        results = yield from self._storeBatch(project, {label: [row]})
+        return results[row["id"]]
+
+    def _storeBatch(
         self,
-        fact_id: str,
         project: str,
-        category: str,
-        fact: str,
-        embedding: list,
-        **kwargs,
-    ):
-        logger.debug(f"createProjectFact(id={fact_id[:12]}..., project={project})")
+        nodes: dict[str, list[dict]],
+        relationships: list[dict] | None = None,
+    ) -> dict[str, dict]:
+        """Write many nodes and their edges in one transaction.
+
+        Args:
+            nodes: Label -> rows of {id, embedding, props}. Decision rows may
+                also set `continues` to link the closest prior decision.
+            relationships: Explicit decision edges as {decision_id, type,
+                reason, embedding}; each links to the best matching prior
+                decision, as in createDecisionRelationship.
+
+        Each label is written with one UNWIND. Rows that duplicate a stored
+        node, or an earlier row of the batch, are skipped.
+
+        Returns {id: result} with the same dicts as the create* methods.
+        """
         start = time.time()
-        with self.driver.session() as session:
-            session.run(
-                """
-                CREATE (pf:ProjectFact {id: $fact_id})
-                SET pf.category = $category,
-                    pf.fact = $fact,
-                    pf.timestamp = datetime(),
-                    pf.project = $project,
-                    pf.user_id = $user_id,
-                    pf.embedding = $embedding
-                SET pf += $props
-                """,
-                fact_id=fact_id,
-                category=category,
-                fact=fact,
+        nodes = {
+            label: _dedupRows(label, rows) for label, rows in nodes.items() if rows
+        }
+        relationships = relationships or []
+        labels = self._fetchLabels(nodes, relationships)
+        counts = yield from self._labelCounts(labels, project)
+        fetch = self._fetchSizes(counts)
+        results = yield _Write(
+            lambda: self._writeBatch(project, nodes, relationships, fetch)
+        )
+        self._afterWrite(project, nodes, results)
+        _logBatch(project, nodes, results, int((time.time() - start) * 1000))
+        return results
+
+    storeBatch = _driven(_storeBatch)
+
+    def _writeBatch(
+        self,
+        project: str,
+        nodes: dict[str, list[dict]],
+        relationships: list[dict],
+        fetch: dict[str, int],
+    ) -> dict[str, dict]:
+        results = {}
+        edges = 0
+        for label, rows in nodes.items():
+            records, counters = yield _query(
+                DECISION_WRITE if label == "Decision" else _nodeWriteQuery(label),
+                counters=True,
+                rows=rows,
                 project=project,
                 user_id=self.user_id,
-                embedding=embedding,
-                props=kwargs,
+                duplicate_score=DECISION_DUPLICATE_SCORE,
+                candidates=DECISION_CANDIDATES,
+                fetch=fetch.get(label, DECISION_CANDIDATES),
             )
-        duration = int((time.time() - start) * 1000)
+            results.update((r["id"], _batchResult(r)) for r in records)
+            created = [r for r in rows if results[r["id"]]["action"] == "created"]
+            # Less each created node's IN_PROJECT link
+            edges += counters.relationships_created - len(created)
+            yield from self._storeVectors(label, created)
+
+        supersessions = 0
+        for rel_type, rows in _relationshipRows(relationships, results).items():
+            _, counters = yield _query(
+                _relationshipWriteQuery(rel_type),
+                counters=True,
+                rows=rows,
+                project=project,
+                fetch=fetch["Decision"],
+            )
+            edges += counters.relationships_created
+            if rel_type == "SUPERSEDES":
+                supersessions += counters.relationships_created
+        yield from self._incrementStats(
+            project, _statsDeltas(nodes, results, edges, supersessions)
+        )
+        return results
+
+    def _storeVectors(self, label: str, rows: list[dict]):
+        """Re-store new nodes' vectors as float32 in compact storage mode."""
+        rows = _vectorRows(rows)
+        if rows:
+            yield _query(_storeVectorsQuery(label), rows=rows)
+
+    @_driven
+    def createDecisionRelationship(
+        self,
+        decision_id: str,
+        project: str,
+        target_description: str,
+        relationship_type: str,
+        reason: str,
+        embedding: list,
+    ) -> bool:
+        """Create explicit relationship from decision to a matching prior decision.
+
+        Finds the best matching prior decision by description similarity
+        and creates the specified relationship.
+
+        Returns True if relationship was created, False if no match found.
+        """
+        logger.debug(
+            f"createDecisionRelationship(from={decision_id[:12]}..., type={relationship_type})"
+        )
+        hits = yield from self._search(
+            "decision_embedding",
+            embedding,
+            project,
+            1,
+            where="node.id <> $decision_id AND score > 0.7",
+            min_score=0.7,
+            decision_id=decision_id,
+        )
+        if not hits:
+            logger.debug(
+                f"No matching decision found for relationship to: {target_description[:50]}..."
+            )
+            return False
+
+        target, score = hits[0]
+        rel_type = _relationshipType(relationship_type)
+        yield _query(
+            _relationshipCreateQuery(rel_type),
+            decision_id=decision_id,
+            target_id=target["id"],
+            reason=reason,
+            score=score,
+        )
+        yield from self._incrementStats(
+            project, _statsDeltas({}, {}, 1, int(rel_type == "SUPERSEDES"))
+        )
         logger.info(
-            f"Created ProjectFact id={fact_id[:12]}... ({duration}ms)",
-            extra={
-                "cat": "tool",
-                "event": "node_created",
-                "node_type": "ProjectFact",
-                "project": project,
-            },
+            f"Created {rel_type} relationship from {decision_id[:12]} to {target['id'][:12]}",
+            extra={"cat": "tool"},
         )
+        return True
 
     # === Domain 1: Query Functions ===
 
-    def queryRecent(self, project: str, limit: int = 20, include_team: bool = True):
+    @_driven
+    def queryRecent(
+        self,
+        project: str,
+        limit: int = 20,
+        include_team: bool = True,
+        include_vectors: bool = False,
+    ):
         """Get recent context for a project (all node types by timestamp)."""
         logger.debug(f"queryRecent(project={project}, limit={limit})")
         start = time.time()
-        with self.driver.session() as session:
-            if include_team and self.user_id:
-                visibility = "(n.status = 'curated' OR n.user_id = $user_id)"
-            else:
-                visibility = "n.user_id = $user_id" if self.user_id else "true"
-
-            # Query all Domain 1 node types directly by project + timestamp
-            result = session.run(
-                f"""
-                CALL {{
-                    MATCH (n:Decision {{project: $project}}) WHERE {visibility}
-                    RETURN n, 'Decision' as node_type
-                    UNION ALL
-                    MATCH (n:Correction {{project: $project}}) WHERE {visibility}
-                    RETURN n, 'Correction' as node_type
-                    UNION ALL
-                    MATCH (n:Insight {{project: $project}}) WHERE {visibility}
-                    RETURN n, 'Insight' as node_type
-                    UNION ALL
-                    MATCH (n:Exception {{project: $project}}) WHERE {visibility}
-                    RETURN n, 'Exception' as node_type
-                    UNION ALL
-                    MATCH (n:FailedApproach {{project: $project}}) WHERE {visibility}
-                    RETURN n, 'FailedApproach' as node_type
-                }}
-                RETURN n, node_type
-                ORDER BY n.timestamp DESC
-                LIMIT $limit
-                """,
-                project=project,
-                user_id=self.user_id,
-                limit=limit,
-            )
-            records = [
-                {"n": dict(record["n"]), "node_type": record["node_type"]}
-                for record in result
-            ]
+        records = yield _query(
+            RECENT_QUERY.format(
+                visibility=self._visibility("n", include_team),
+                projection=nodeProjection("n", include_vectors),
+            ),
+            project=project,
+            user_id=self.user_id,
+            limit=limit,
+        )
+        records = [
+            {"n": nodeProps(record["n"]), "node_type": record["node_type"]}
+            for record in records
+        ]
         duration = int((time.time() - start) * 1000)
         logger.debug(f"queryRecent returned {len(records)} items ({duration}ms)")
         return records
 
+    @_driven
     def searchPrecedent(
-        self, query: str, project: str, limit: int = 10, include_team: bool = True
+        self,
+        query: str,
+        project: str,
+        limit: int = 10,
+        include_team: bool = True,
+        include_vectors: bool = False,
     ):
-        """Full-text search across all node types."""
-        with self.driver.session() as session:
-            results = {}
-            indexes = [
-                ("decision_search", "decisions"),
-                ("correction_search", "corrections"),
-                ("insight_search", "insights"),
-                ("question_search", "questions"),
-                ("failedapproach_search", "failed_approaches"),
-                ("projectfact_search", "project_facts"),
-                ("exception_search", "exceptions"),
-            ]
-
-            if include_team and self.user_id:
-                visibility = "(node.status = 'curated' OR node.user_id = $user_id)"
-            else:
-                visibility = "node.user_id = $user_id" if self.user_id else "true"
-
-            for index, key in indexes:
-                result = session.run(
-                    f"""
-                    CALL db.index.fulltext.queryNodes("{index}", $search_query)
-                    YIELD node, score
-                    WHERE node.project = $project AND {visibility}
-                    RETURN node, score
-                    ORDER BY score DESC
-                    LIMIT $limit
-                    """,
-                    search_query=query,
-                    project=project,
-                    user_id=self.user_id,
-                    limit=limit,
-                )
-                results[key] = [(dict(r["node"]), r["score"]) for r in result]
-            return results
+        """Full-text search across all node types.
+
+        One query against the multi-label memory_search index, so scores are
+        comparable across categories. Returns the top `limit` per category.
+        """
+        records = yield _query(
+            PRECEDENT_QUERY.format(
+                visibility=self._visibility("node", include_team),
+                projection=nodeProjection("n", include_vectors),
+            ),
+            search_query=query,
+            project=project,
+            user_id=self.user_id,
+            labels=list(PRECEDENT_CATEGORIES),
+            limit=limit,
+        )
+        return _precedentResults(records)
 
+    @_driven
     def searchSemantic(
-        self, embedding: list, project: str, limit: int = 10, include_team: bool = True
+        self,
+        embedding: list,
+        project: str,
+        limit: int = 10,
+        include_team: bool = True,
+        include_vectors: bool = False,
+        distinct: bool = False,
     ):
-        """Vector similarity search across Domain 1."""
-        with self.driver.session() as session:
-            results = {}
-            indexes = [
-                ("decision_embedding", "decisions"),
-                ("correction_embedding", "corrections"),
-                ("insight_embedding", "insights"),
-                ("projectfact_embedding", "project_facts"),
-                ("exception_embedding", "exceptions"),
-                ("failedapproach_embedding", "failed_approaches"),
-            ]
-
-            if include_team and self.user_id:
-                visibility = "(node.status = 'curated' OR node.user_id = $user_id)"
-            else:
-                visibility = "node.user_id = $user_id" if self.user_id else "true"
-
-            for index, key in indexes:
-                result = session.run(
-                    f"""
-                    CALL db.index.vector.queryNodes('{index}', $limit, $embedding)
-                    YIELD node, score
-                    WHERE node.project = $project AND {visibility}
-                    RETURN node, score
-                    """,
-                    embedding=embedding,
-                    project=project,
-                    user_id=self.user_id,
-                    limit=limit,
-                )
-                results[key] = [(dict(r["node"]), r["score"]) for r in result]
-            return results
+        """Vector similarity search across Domain 1, in one round-trip.
+
+        With distinct, hits near-duplicating a better hit of any category
+        are dropped, compared by their embedding_q codes (compact storage).
+        """
+        hits = yield from self._searchMany(
+            list(SEMANTIC_CATEGORIES),
+            embedding,
+            project,
+            limit,
+            where=self._visibility("node", include_team),
+            include_vectors=include_vectors,
+            include_codes=distinct,
+            user_id=self.user_id,
+        )
+        if distinct:
+            hits = _distinctHits(hits, len(embedding), include_vectors)
+        return {key: hits[index] for index, key in SEMANTIC_CATEGORIES.items()}
+
+    def _nodes(self, query: str, include_vectors: bool, **params) -> list[dict]:
+        """Run a query returning `n` projected by nodeProjection()."""
+        records = yield _query(
+            query.format(projection=nodeProjection("n", include_vectors)), **params
+        )
+        return [nodeProps(record["n"]) for record in records]
 
-    def queryByTopic(self, project: str, topic: str, limit: int = 20):
+    @_driven
+    def queryByTopic(
+        self,
+        project: str,
+        topic: str,
+        limit: int = 20,
+        include_vectors: bool = False,
+    ):
         """Get decisions/items by topic."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (d:Decision {project: $project})
-                WHERE $topic IN d.topics
-                RETURN d
-                ORDER BY d.timestamp DESC
-                LIMIT $limit
-                """,
-                project=project,
-                topic=topic,
-                limit=limit,
+        return (
+            yield from self._nodes(
+                TOPIC_QUERY, include_vectors, project=project, topic=topic, limit=limit
             )
-            return [dict(record["d"]) for record in result]
+        )
 
-    def queryStaleDecisions(self, project: str, days: int = 30):
+    @_driven
+    def queryStaleDecisions(
+        self, project: str, days: int = 30, include_vectors: bool = False
+    ):
         """Find developmental decisions that may need review."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (d:Decision {project: $project})
-                WHERE d.status = 'developmental'
-                  AND d.timestamp < datetime() - duration({days: $days})
-                RETURN d
-                ORDER BY d.timestamp DESC
-                """,
-                project=project,
-                days=days,
+        return (
+            yield from self._nodes(
+                STALE_DECISIONS_QUERY, include_vectors, project=project, days=days
             )
-            return [dict(record["d"]) for record in result]
+        )
 
-    def queryFailedApproaches(self, project: str, limit: int = 10):
+    @_driven
+    def queryFailedApproaches(
+        self, project: str, limit: int = 10, include_vectors: bool = False
+    ):
         """Get recent failed approaches."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (f:FailedApproach {project: $project})
-                RETURN f
-                ORDER BY f.timestamp DESC
-                LIMIT $limit
-                """,
-                project=project,
-                limit=limit,
+        return (
+            yield from self._nodes(
+                FAILED_APPROACHES_QUERY, include_vectors, project=project, limit=limit
             )
-            return [dict(record["f"]) for record in result]
+        )
 
-    def queryProjectFacts(self, project: str, limit: int = 20):
+    @_driven
+    def queryProjectFacts(
+        self, project: str, limit: int = 20, include_vectors: bool = False
+    ):
         """Get project facts (conventions, tools, patterns)."""
         logger.debug(f"queryProjectFacts(project={project}, limit={limit})")
         start = time.time()
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (pf:ProjectFact {project: $project})
-                RETURN pf
-                ORDER BY pf.timestamp DESC
-                LIMIT $limit
-                """,
-                project=project,
-                limit=limit,
-            )
-            records = [dict(record["pf"]) for record in result]
+        records = yield from self._nodes(
+            PROJECT_FACTS_QUERY, include_vectors, project=project, limit=limit
+        )
         duration = int((time.time() - start) * 1000)
         logger.debug(f"queryProjectFacts returned {len(records)} items ({duration}ms)")
         return records
 
-    def queryOpenQuestions(self, project: str, limit: int = 10):
+    @_driven
+    def queryOpenQuestions(
+        self, project: str, limit: int = 10, include_vectors: bool = False
+    ):
         """Get unanswered questions."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (q:Question {project: $project})
-                WHERE q.answer IS NULL OR q.answer = ''
-                RETURN q
-                ORDER BY q.timestamp DESC
-                LIMIT $limit
-                """,
-                project=project,
-                limit=limit,
+        return (
+            yield from self._nodes(
+                OPEN_QUESTIONS_QUERY, include_vectors, project=project, limit=limit
             )
-            return [dict(record["q"]) for record in result]
+        )
 
     # === Pattern Detection (for dashboard) ===
 
+    @_driven
     def queryExceptionClusters(self, project: str) -> list[dict]:
         """Find rules with multiple exceptions."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (e:Exception {project: $project})
-                WITH e.rule_broken as rule, count(e) as count, collect(e.justification) as justifications
-                WHERE count >= 2
-                RETURN rule, count, justifications
-                ORDER BY count DESC
-                """,
-                project=project,
-            )
-            return [dict(record) for record in result]
+        records = yield _query(EXCEPTION_CLUSTERS_QUERY, project=project)
+        return [dict(r) for r in records]
 
+    @_driven
     def querySupersessionChains(self, project: str) -> list[dict]:
         """Find decisions that evolved through multiple iterations."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH path = (newest:Decision {project: $project})-[:SUPERSEDES*2..]->(oldest:Decision)
-                WHERE NOT EXISTS { (x:Decision)-[:SUPERSEDES]->(newest) }
-                WITH newest, oldest, length(path) as chain_length,
-                     [n IN nodes(path) | n.description] as descriptions
-                RETURN newest.id as newest_id, newest.description as newest_desc,
-                       oldest.description as oldest_desc, chain_length, descriptions
-                ORDER BY chain_length DESC
-                LIMIT 10
-                """,
-                project=project,
-            )
-            return [dict(record) for record in result]
+        records = yield _query(SUPERSESSION_CHAINS_QUERY, project=project)
+        return [dict(r) for r in records]
 
+    @_driven
     def queryCorrectionHotspots(self, project: str) -> list[dict]:
         """Find topics with high correction counts."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (c:Correction {project: $project})
-                WHERE c.topics IS NOT NULL AND size(c.topics) > 0
-                UNWIND c.topics as topic
-                WITH topic, count(c) as count, collect(c.right_belief)[0..3] as samples
-                WHERE count >= 2
-                RETURN topic, count, samples
-                ORDER BY count DESC
-                """,
-                project=project,
-            )
-            return [dict(record) for record in result]
+        records = yield _query(CORRECTION_HOTSPOTS_QUERY, project=project)
+        return [dict(r) for r in records]
 
     # === Domain 2: Chunk Index ===
 
+    @_driven
     def indexChunk(
         self,
         chunk_id: str,
@@ -1003,96 +1107,101 @@ class GraphClient:
         embedding: list,
     ):
         """Index a markdown chunk for semantic search."""
-        with self.driver.session() as session:
-            session.run(
-                """
-                MERGE (ch:Chunk {id: $chunk_id})
-                SET ch.project = $project,
-                    ch.source_file = $source_file,
-                    ch.section = $section,
-                    ch.content = $content,
-                    ch.embedding = $embedding,
-                    ch.last_indexed = datetime()
-                """,
-                chunk_id=chunk_id,
-                project=project,
-                source_file=source_file,
-                section=section,
-                content=content,
-                embedding=embedding,
-            )
+        yield _query(
+            CHUNK_MERGE,
+            chunk_id=chunk_id,
+            project=project,
+            source_file=source_file,
+            section=section,
+            content=content,
+            embedding=embedding,
+            meta=embeddingMeta(embedding),
+        )
+        yield from self._storeVectors(
+            "Chunk", [{"id": chunk_id, "embedding": embedding}]
+        )
 
-    def searchReference(self, embedding: list, project: str, limit: int = 5):
+    @_driven
+    def searchReference(
+        self,
+        embedding: list,
+        project: str,
+        limit: int = 5,
+        include_vectors: bool = False,
+    ):
         """Semantic search over Domain 2 chunks."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                CALL db.index.vector.queryNodes('chunk_embedding', $limit, $embedding)
-                YIELD node, score
-                WHERE node.project = $project
-                RETURN node, score
-                """,
-                embedding=embedding,
-                project=project,
-                limit=limit,
+        return (
+            yield from self._search(
+                "chunk_embedding",
+                embedding,
+                project,
+                limit,
+                include_vectors=include_vectors,
             )
-            return [(dict(r["node"]), r["score"]) for r in result]
+        )
 
+    @_driven
     def clearChunks(self, project: str, source_file: Optional[str] = None):
         """Clear chunks for re-indexing."""
-        with self.driver.session() as session:
-            if source_file:
-                session.run(
-                    "MATCH (ch:Chunk {project: $project, source_file: $source_file}) DELETE ch",
-                    project=project,
-                    source_file=source_file,
-                )
-            else:
-                session.run(
-                    "MATCH (ch:Chunk {project: $project}) DELETE ch", project=project
-                )
+        yield _query(
+            _clearChunksQuery(source_file), project=project, source_file=source_file
+        )
+
+    # === Project Registry ===
+
+    def _linkLabel(self, label: str, batch_size: int = 1000) -> int:
+        """Link a label's nodes written before the registry to their :Project.
+
+        One pass over the label's project index, committed every batch_size
+        nodes (so it must run auto-commit, not in a _Write). Returns the
+        number of nodes linked.
+        """
+        [record] = yield _query(_projectLinkQuery(label), batch_size=batch_size)
+        return record["linked"]
+
+    linkProjects = _driven(_linkLabel)
+
+    @_driven
+    def migrateProjectLinks(self, batch_size: int = 1000) -> int:
+        """Link every unlinked node, then mark the migration done.
+
+        Returns the number of nodes linked (0 if it already ran).
+        """
+        [record] = yield _query(PROJECT_LINKS_CHECK)
+        if record["done"]:
+            return 0
+        total = 0
+        for label in PROJECT_LABELS:
+            total += yield from self._linkLabel(label, batch_size)
+        yield _query(PROJECT_LINKS_DONE)
+        return total
+
+    @_driven
+    def markProjectsLinked(self):
+        yield _query(PROJECT_LINKS_DONE)
 
     # === Promotion ===
 
+    @_driven
     def promoteDecisions(self, project: str, branch: Optional[str] = None):
         """Promote developmental decisions to curated."""
-        with self.driver.session() as session:
-            query = """
-                MATCH (d:Decision {project: $project, status: 'developmental'})
-                WHERE d.user_id = $user_id
-            """
-            if branch:
-                query += " AND d.branch = $branch"
-            query += " SET d.status = 'curated', d.promoted_at = datetime()"
-            session.run(query, project=project, user_id=self.user_id, branch=branch)
+        [record] = yield _query(
+            _promoteQuery(branch), project=project, user_id=self.user_id, branch=branch
+        )
+        deltas = {**dict.fromkeys(STATS_KEYS, 0), "curated": record["promoted"]}
+        yield from self._incrementStats(project, deltas)
+        self.invalidateContext(project)
 
     # === Telemetry ===
 
+    @_driven
     def recordTelemetry(self, event_type: str, project: str, data: dict):
         """Record a telemetry event."""
-        with self.driver.session() as session:
-            session.run(
-                """
-                CREATE (t:TelemetryEvent {
-                    id: $id,
-                    event_type: $event_type,
-                    project: $project,
-                    user_id: $user_id,
-                    timestamp: datetime(),
-                    data_json: $data_json,
-                    count: $count,
-                    duration_ms: $duration_ms
-                })
-                """,
-                id=f"telem-{uuid.uuid4().hex[:12]}",
-                event_type=event_type,
-                project=project,
-                user_id=self.user_id,
-                data_json=json.dumps(data),
-                count=data.get("count"),
-                duration_ms=data.get("duration_ms"),
-            )
+        yield _query(
+            TELEMETRY_CREATE, **self._telemetryParams(event_type, project, data)
+        )
 
+    @_driven
     def recordRetrieval(
         self,
         project: str,
@@ -1100,115 +1209,853 @@ class GraphClient:
         context_summary: str,
     ):
         """Record what context was retrieved."""
-        with self.driver.session() as session:
-            session.run(
-                """
-                CREATE (r:Retrieval {
-                    id: $id,
-                    project: $project,
-                    user_id: $user_id,
-                    timestamp: datetime(),
-                    retrieved_ids: $retrieved_ids,
-                    retrieved_count: $count,
-                    context_summary: $context_summary
-                })
-                """,
-                id=f"retrieval-{uuid.uuid4().hex[:12]}",
-                project=project,
-                user_id=self.user_id,
-                retrieved_ids=retrieved_ids,
-                count=len(retrieved_ids),
-                context_summary=context_summary[:2000],
-            )
+        yield _query(
+            RETRIEVAL_CREATE,
+            **self._retrievalParams(project, retrieved_ids, context_summary),
+        )
 
+    @_driven
     def queryRetrievals(self, project: str, limit: int = 50) -> list[dict]:
         """Get recent retrieval events."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (r:Retrieval {project: $project})
-                RETURN r ORDER BY r.timestamp DESC LIMIT $limit
-                """,
-                project=project,
-                limit=limit,
-            )
-            return [dict(record["r"]) for record in result]
+        records = yield _query(RETRIEVALS_QUERY, project=project, limit=limit)
+        return [dict(record["r"]) for record in records]
 
     # === Metrics ===
 
+    def _stats(self, project: str, refresh: bool = False) -> dict:
+        """STATS_KEYS counters for a project.
+
+        With PROJECT_STATS on, read from its :ProjectStats node, which the
+        first read (or refresh) creates from a full count.
+        """
+        if PROJECT_STATS and not refresh:
+            records = yield _query(STATS_READ, project=project)
+            if records:
+                return {key: records[0]["stats"][key] for key in STATS_KEYS}
+        [record] = yield _query(STATS_QUERY, project=project)
+        stats = dict(record)
+        if PROJECT_STATS:
+            yield _query(STATS_WRITE, project=project, stats=stats)
+        return stats
+
+    projectStats = _driven(_stats)
+
+    def _incrementStats(self, project: str, deltas: dict):
+        """Apply deltas to the :ProjectStats node."""
+        if PROJECT_STATS and any(deltas.values()):
+            yield _query(STATS_INCREMENT, project=project, deltas=deltas)
+
+    def _metrics(self, project: str) -> dict:
+        """Get all metrics for dashboard, from one query or node read."""
+        return projectMetrics((yield from self._stats(project)))
+
+    getAllMetrics = _driven(_metrics)
+
+    @_driven
     def calculateCoefficient(self, project: str) -> float:
         """Calculate cognitive coefficient from observable metrics."""
-        curated = self._countNodes("Decision", project, status="curated")
-        reuse_rate = self.calculateDecisionReuseRate(project)
-
-        coefficient = 1.0 + (curated * 0.02) + (reuse_rate * 1.0)
-        return min(4.0, coefficient)
+        return (yield from self._metrics(project))["cognitive_coefficient"]
 
+    @_driven
     def calculateDecisionReuseRate(self, project: str) -> float:
         """Calculate decision reuse rate (decisions with precedent links)."""
+        return (yield from self._metrics(project))["decision_reuse_rate"]
+
+    @_driven
+    def calculateGraphDensity(self, project: str) -> float:
+        """Calculate context graph density."""
+        return (yield from self._metrics(project))["graph_density"]
+
+    # === Shared helpers ===
+
+    def _afterWrite(self, project: str, nodes: dict, results: dict):
+        """Drop the cached counts and context snapshot a storeBatch outdated."""
+        for label in nodes:
+            self._vector_counts.pop((label, project), None)
+        if any(r["action"] == "created" for r in results.values()):
+            self.invalidateContext(project)
+
+    def invalidateContext(self, project: str):
+        """Mark project's cached session context stale here and, on close, in the server."""
+        getContextCache().bump(project)
+        self._outdated.add(project)
+
+    def _cachedCounts(self, labels: list[str], project: str) -> dict[str, tuple]:
+        """Label counts for project still within VECTOR_COUNTS_TTL."""
+        now = time.time()
+        counts = {}
+        for label in labels:
+            cached = self._vector_counts.get((label, project))
+            if cached and now - cached[0] < VECTOR_COUNTS_TTL:
+                counts[label] = cached[1:]
+        return counts
+
+    def _cacheCounts(self, project: str, records) -> dict[str, tuple]:
+        counts = {}
+        now = time.time()
+        for record in records:
+            counts[record["label"]] = (record["in_project"], record["total"])
+            self._vector_counts[(record["label"], project)] = (
+                now,
+                record["in_project"],
+                record["total"],
+            )
+        return counts
+
+    def _fetchLabels(self, nodes: dict, relationships: list) -> list[str]:
+        """Labels whose storeBatch writes run an ANN lookup."""
+        labels = [l for l in nodes if l == "Decision" or l in DEDUP_INDEXES]
+        if relationships and "Decision" not in labels:
+            labels.append("Decision")
+        return labels
+
+    def _fetchSizes(self, counts: dict[str, tuple]) -> dict[str, int]:
+        """ANN fetch sizes for storeBatch: decision candidates, else best match."""
+        return {
+            label: fetchSize(DECISION_CANDIDATES if label == "Decision" else 1, *c)
+            for label, c in counts.items()
+        }
+
+    def _telemetryParams(self, event_type: str, project: str, data: dict) -> dict:
+        return {
+            "id": f"telem-{uuid.uuid4().hex[:12]}",
+            "event_type": event_type,
+            "project": project,
+            "user_id": self.user_id,
+            "data_json": json.dumps(data),
+            "count": data.get("count"),
+            "duration_ms": data.get("duration_ms"),
+        }
+
+    def _retrievalParams(
+        self, project: str, retrieved_ids: list[str], context_summary: str
+    ) -> dict:
+        return {
+            "id": f"retrieval-{uuid.uuid4().hex[:12]}",
+            "project": project,
+            "user_id": self.user_id,
+            "retrieved_ids": retrieved_ids,
+            "count": len(retrieved_ids),
+            "context_summary": context_summary[:2000],
+        }
+
+    def _visibility(self, var: str, include_team: bool) -> str:
+        if include_team and self.user_id:
+            return f"({var}.status = 'curated' OR {var}.user_id = $user_id)"
+        return f"{var}.user_id = $user_id" if self.user_id else "true"
+
+
+class GraphClient(_GraphBase):
+    def __init__(self, init_schema: bool = False):
+        super().__init__()
+        uri, config = _driverConfig()
+        self.driver = GraphDatabase.driver(uri, **config)
+        if init_schema:
+            self.initSchema()
+
+    def initSchema(self):
+        """Initialize Neo4j schema from init.cypher."""
+        cypher_paths = [
+            Path("/app/init.cypher"),
+            Path(__file__).parent.parent.parent / "init.cypher",
+        ]
+        for path in cypher_paths:
+            if path.exists():
+                cypher = path.read_text()
+                for stmt in cypher.split(";"):
+                    stmt = stmt.strip()
+                    if stmt and not stmt.startswith("//"):
+                        with self.driver.session() as session:
+                            session.run(stmt)
+                logging.info("Schema initialized from %s", path)
+                break
+        else:
+            logging.warning("init.cypher not found")
+        self.ensureVectorIndexes(EMBEDDING_DIMS)
+
+    def vectorIndexDims(self) -> dict[str, int]:
+        """Get the configured dimensions of each existing vector index."""
+        with self.driver.session() as session:
+            result = session.run("""
+                SHOW INDEXES YIELD name, type, options
+                WHERE type = 'VECTOR'
+                RETURN name, options
+                """)
+            return {
+                r["name"]: r["options"]["indexConfig"]["vector.dimensions"]
+                for r in result
+            }
+
+    def ensureVectorIndexes(self, dims: int, recreate: bool = False) -> list[str]:
+        """Create missing vector indexes with the given dimensions.
+
+        Indexes with a different dimension are dropped and recreated only if
+        recreate is set (see `ccmemory reembed`). Returns recreated/created names.
+        """
+        existing = self.vectorIndexDims()
+        changed = []
+        with self.driver.session() as session:
+            for name, label in VECTOR_INDEXES:
+                current = existing.get(name)
+                if current is not None and current != dims:
+                    if not recreate:
+                        logger.warning(
+                            f"Vector index {name} is {current}-dim but {EMBEDDING_MODEL} "
+                            f"produces {dims}-dim vectors; run `ccmemory reembed`"
+                        )
+                        continue
+                    session.run(f"DROP INDEX {name} IF EXISTS")
+                    current = None
+                if current is None:
+                    session.run(f"""
+                        CREATE VECTOR INDEX {name} IF NOT EXISTS
+                        FOR (n:{label}) ON n.embedding
+                        OPTIONS {{indexConfig: {{
+                            `vector.dimensions`: {int(dims)},
+                            `vector.similarity_function`: 'cosine'
+                        }}}}
+                        """)
+                    changed.append(name)
+        return changed
+
+    def _drive(self, steps: Generator, runner=None):
+        """Run the queries of a step generator and return its result.
+
+        Queries run on runner, a write transaction, or else auto-commit in
+        one session.
+        """
+        if runner is None:
+            with self.driver.session() as session:
+                return self._drive(steps, session)
+        reply = None
+        while True:
+            try:
+                step = steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            if isinstance(step, _Write):
+                reply = runner.execute_write(lambda tx: self._drive(step.steps(), tx))
+                continue
+            result = runner.run(step.text, **step.params)
+            reply = list(result)
+            if step.counters:
+                reply = reply, result.consume().counters
+
+    def _run(self, query: str, **params) -> list:
+        """Run one auto-commit query and return all its records."""
+        with self.driver.session() as session:
+            return list(session.run(query, **params))
+
+    def close(self):
+        # The MCP server caches context in its own memory (CLI writes)
+        for project in self._outdated:
+            invalidateServer(project)
+        self._outdated.clear()
+        self.driver.close()
+
+    # === Embedding Migration ===
+
+    def countStaleEmbeddings(self, model: str, dims: int) -> dict[str, int]:
+        """Count nodes per label whose embedding wasn't made by model/dims."""
+        counts = {}
+        with self.driver.session() as session:
+            for _, label in VECTOR_INDEXES:
+                result = session.run(
+                    f"""
+                    MATCH (n:{label})
+                    WHERE n.embedding IS NOT NULL
+                      AND (n.embedding_model IS NULL
+                           OR n.embedding_model <> $model
+                           OR n.embedding_dims <> $dims)
+                    RETURN count(n) as count
+                    """,
+                    model=model,
+                    dims=dims,
+                )
+                counts[label] = result.single()["count"]
+        return counts
+
+    def queryStaleEmbeddings(
+        self,
+        label: str,
+        model: str,
+        dims: int,
+        limit: int,
+        exclude_ids: list[str] | None = None,
+    ) -> list[dict]:
+        """Get a batch of nodes needing re-embedding (without their vectors)."""
         with self.driver.session() as session:
             result = session.run(
-                """
-                MATCH (d:Decision {project: $project})
-                OPTIONAL MATCH (d)-[:CITES|SUPERSEDES]->(prior:Decision)
-                WITH count(d) as total, count(prior) as with_precedent
-                RETURN CASE WHEN total = 0 THEN 0.0
-                       ELSE with_precedent * 1.0 / total END as rate
+                f"""
+                MATCH (n:{label})
+                WHERE n.embedding IS NOT NULL
+                  AND (n.embedding_model IS NULL
+                       OR n.embedding_model <> $model
+                       OR n.embedding_dims <> $dims)
+                  AND NOT n.id IN $exclude_ids
+                RETURN {nodeProjection("n")} as n
+                LIMIT $limit
                 """,
-                project=project,
+                model=model,
+                dims=dims,
+                limit=limit,
+                exclude_ids=exclude_ids or [],
+            )
+            return [nodeProps(record["n"]) for record in result]
+
+    def setEmbeddings(self, label: str, rows: list[dict]):
+        """Write re-computed embeddings. rows: [{id, embedding}]."""
+        if EMBED_STORAGE == "compact":
+            rows = [{**row, "model": EMBEDDING_MODEL} for row in rows]
+            self._setCompactEmbeddings(label, rows)
+            return
+        with self.driver.session() as session:
+            session.run(
+                f"""
+                UNWIND $rows as row
+                MATCH (n:{label} {{id: row.id}})
+                SET n.embedding = row.embedding,
+                    n.embedding_model = $model,
+                    n.embedding_dims = size(row.embedding)
+                REMOVE n.embedding_q
+                """,
+                rows=rows,
+                model=EMBEDDING_MODEL,
             )
-            return result.single()["rate"]
 
-    def calculateGraphDensity(self, project: str) -> float:
-        """Calculate context graph density."""
+    def _setCompactEmbeddings(self, label: str, rows: list[dict]):
+        """Store float32 vectors plus 8-bit copies. rows: [{id, embedding, model}]."""
+        rows = [
+            {**row, "embedding_q": quantizeEmbedding(row["embedding"])} for row in rows
+        ]
+        with self.driver.session() as session:
+            session.run(
+                f"""
+                UNWIND $rows as row
+                MATCH (n:{label} {{id: row.id}})
+                CALL db.create.setNodeVectorProperty(n, 'embedding', row.embedding)
+                SET n.embedding_q = row.embedding_q,
+                    n.embedding_model = row.model,
+                    n.embedding_dims = size(row.embedding)
+                """,
+                rows=rows,
+            )
+
+    # === Compact Embedding Storage ===
+
+    def queryUncompactedEmbeddings(self, label: str, limit: int) -> list[dict]:
+        """Get a batch of nodes still storing full-precision embedding lists."""
         with self.driver.session() as session:
             result = session.run(
-                """
-                OPTIONAL MATCH (n {project: $project})
-                WITH count(n) as nodes
-                OPTIONAL MATCH ({project: $project})-[r]->({project: $project})
-                WITH nodes, count(r) as edges
-                RETURN CASE WHEN nodes = 0 THEN 0.0
-                       ELSE edges * 1.0 / nodes END as density
+                f"""
+                MATCH (n:{label})
+                WHERE n.embedding IS NOT NULL AND n.embedding_q IS NULL
+                  AND n.id IS NOT NULL
+                RETURN n.id as id, n.embedding as embedding,
+                       n.embedding_model as model
+                LIMIT $limit
                 """,
-                project=project,
+                limit=limit,
             )
-            record = result.single()
-            return record["density"] if record else 0.0
+            return [dict(record) for record in result]
+
+    def compactEmbeddings(self, label: str, batch_size: int = 500) -> int:
+        """Convert one batch of a label's embeddings to compact storage.
+
+        Returns the number of nodes converted (0 when the label is done).
+        """
+        rows = self.queryUncompactedEmbeddings(label, batch_size)
+        if rows:
+            self._setCompactEmbeddings(label, rows)
+        return len(rows)
 
-    def getAllMetrics(self, project: str) -> dict:
-        """Get all metrics for dashboard."""
+    def embeddingStorageStats(self) -> dict:
+        """Estimated embedding payload per label, plus total store size.
+
+        Full lists are 8 bytes per value; compact nodes store 4 bytes per
+        value for the index plus 1 byte per value for the 8-bit copy.
+        """
+        labels = {}
+        with self.driver.session() as session:
+            for _, label in VECTOR_INDEXES:
+                record = session.run(f"""
+                    MATCH (n:{label})
+                    WHERE n.embedding IS NOT NULL
+                    RETURN count(n) as nodes,
+                           count(n.embedding_q) as compact,
+                           sum(CASE WHEN n.embedding_q IS NULL
+                                    THEN size(n.embedding) * 8
+                                    ELSE size(n.embedding) * 4 + size(n.embedding_q)
+                               END) as bytes
+                    """).single()
+                labels[label] = dict(record)
+            try:
+                store = session.run(
+                    "CALL apoc.monitor.store() YIELD totalStoreSize "
+                    "RETURN totalStoreSize"
+                ).single()["totalStoreSize"]
+            except ClientError:
+                store = None  # APOC not installed
         return {
-            "cognitive_coefficient": self.calculateCoefficient(project),
-            "decision_reuse_rate": self.calculateDecisionReuseRate(project),
-            "graph_density": self.calculateGraphDensity(project),
-            "total_decisions": self._countNodes("Decision", project),
-            "total_corrections": self._countNodes("Correction", project),
-            "total_insights": self._countNodes("Insight", project),
-            "total_exceptions": self._countNodes("Exception", project),
-            "total_failed_approaches": self._countNodes("FailedApproach", project),
-            "total_project_facts": self._countNodes("ProjectFact", project),
-            "total_questions": self._countNodes("Question", project),
+            "labels": labels,
+            "embedding_bytes": sum(l["bytes"] for l in labels.values()),
+            "store_bytes": store,
         }
 
-    def _countNodes(self, label: str, project: str, status: str = None) -> int:
-        with self.driver.session() as session:
-            if status:
-                result = session.run(
-                    f"MATCH (n:{label} {{project: $project, status: $status}}) RETURN count(n) as count",
-                    project=project,
-                    status=status,
+
+class AsyncGraphClient(_GraphBase):
+    """GraphClient on the Neo4j async driver, for the MCP server and hooks.
+
+    Same read/write API as GraphClient, with coroutine methods, so requests
+    don't hold an event-loop thread while waiting on Neo4j. Schema and
+    embedding migration stay on GraphClient (CLI only).
+    """
+
+    def __init__(self):
+        super().__init__()
+        uri, config = _driverConfig()
+        self.driver = AsyncGraphDatabase.driver(uri, **config)
+
+    async def _drive(self, steps: Generator, runner=None):
+        """Run the queries of a step generator; see GraphClient._drive."""
+        if runner is None:
+            async with self.driver.session() as session:
+                return await self._drive(steps, session)
+        reply = None
+        while True:
+            try:
+                step = steps.send(reply)
+            except StopIteration as done:
+                return done.value
+            if isinstance(step, _Write):
+                reply = await runner.execute_write(
+                    lambda tx: self._drive(step.steps(), tx)
                 )
-            else:
-                result = session.run(
-                    f"MATCH (n:{label} {{project: $project}}) RETURN count(n) as count",
-                    project=project,
+                continue
+            result = await runner.run(step.text, **step.params)
+            reply = [record async for record in result]
+            if step.counters:
+                reply = reply, (await result.consume()).counters
+
+    async def close(self):
+        await self.driver.close()
+
+
+def nodeProjection(
+    var: str, include_vectors: bool = False, include_codes: bool = False
+) -> str:
+    """Cypher map projection of a node's properties.
+
+    Vector properties are projected as null (5.x has no key exclusion), which
+    keeps them off the wire; nodeProps() then drops the keys. include_codes
+    keeps the 8-bit embedding_q copy, for application-side scoring.
+    """
+    if include_vectors:
+        return f"{var} {{.*}}"
+    hidden = ("embedding",) if include_codes else VECTOR_PROPERTIES
+    nulls = ", ".join(f"{prop}: null" for prop in hidden)
+    return f"{var} {{.*, {nulls}}}"
+
+
+def nodeProps(projected) -> dict:
+    """Properties from nodeProjection(), without the nulled vector keys."""
+    return {
+        key: value
+        for key, value in projected.items()
+        if value is not None or key not in VECTOR_PROPERTIES
+    }
+
+
+def nodeRow(node_id: str, embedding: list | None, **props) -> dict:
+    """A storeBatch row: {id, embedding, props}."""
+    return {
+        "id": node_id,
+        "embedding": embedding or None,
+        "props": {**props, **embeddingMeta(embedding)},
+    }
+
+
+def fetchSize(k: int, in_project: int, total: int) -> int:
+    """Neighbours to fetch from a shared index so ~k belong to the project.
+
+    Capped at the index size, where the search becomes exhaustive, and at
+    VECTOR_MAX_FETCH.
+    """
+    if in_project <= 0 or total <= 0:
+        return k
+    fetch = math.ceil(k * total / in_project * VECTOR_OVERFETCH)
+    return max(k, min(fetch, total, VECTOR_MAX_FETCH))
+
+
+def cognitiveCoefficient(curated: int, reuse_rate: float) -> float:
+    return min(4.0, 1.0 + (curated * 0.02) + (reuse_rate * 1.0))
+
+
+def projectMetrics(stats: dict) -> dict:
+    """getAllMetrics() result from projectStats() counters."""
+    decisions = stats["decisions"]
+    nodes = sum(stats[key] for key in STAT_LABELS.values())
+    reuse_rate = stats["precedent_links"] / decisions if decisions else 0.0
+    metrics = {
+        "cognitive_coefficient": cognitiveCoefficient(stats["curated"], reuse_rate),
+        "decision_reuse_rate": reuse_rate,
+        "graph_density": stats["edges"] / nodes if nodes else 0.0,
+    }
+    for key in STAT_LABELS.values():
+        if key != "references":
+            metrics[f"total_{key}"] = stats[key]
+    return metrics
+
+
+def _driverConfig() -> tuple[str, dict]:
+    """URI and driver options shared by the sync and async drivers."""
+    uri = os.getenv("CCMEMORY_NEO4J_URI", "bolt://localhost:7687")
+    user = os.getenv("CCMEMORY_NEO4J_USER", "neo4j")
+    password = os.getenv("CCMEMORY_NEO4J_PASSWORD", "ccmemory")
+    return uri, {
+        "auth": (user, password),
+        "max_connection_pool_size": NEO4J_POOL_SIZE,
+        "connection_acquisition_timeout": NEO4J_ACQUIRE_TIMEOUT,
+    }
+
+
+def _vectorRows(rows: list[dict]) -> list[dict]:
+    """Rows whose vectors _storeVectors must re-store (compact mode only)."""
+    if EMBED_STORAGE != "compact":
+        return []
+    return [
+        {"id": r["id"], "embedding": r["embedding"]} for r in rows if r.get("embedding")
+    ]
+
+
+def _storeVectorsQuery(label: str) -> str:
+    return f"""
+        UNWIND $rows as row
+        MATCH (n:{label} {{id: row.id}})
+        CALL db.create.setNodeVectorProperty(n, 'embedding', row.embedding)
+    """
+
+
+def _dedupRows(label: str, rows: list[dict]) -> list[dict]:
+    """Drop rows too similar to an earlier row in the same batch.
+
+    The vector index can't see nodes created in the open transaction, so
+    this applies the store-time threshold within the batch, on the rows'
+    8-bit codes (quantized here unless compact storage already did). Index
+    scores are (1 + cosine) / 2, hence the conversion.
+    """
+    if label == "Decision":
+        threshold = DECISION_DUPLICATE_SCORE
+    elif label in DEDUP_INDEXES:
+        threshold = DEDUP_INDEXES[label][1]
+    else:
+        return rows
+    codes = [
+        row["props"].get("embedding_q")
+        or (quantizeEmbedding(row["embedding"]) if row["embedding"] else None)
+        for row in rows
+    ]
+    kept = []
+    for row, keep in zip(rows, distinctMask(codes, 2 * threshold - 1)):
+        if keep:
+            kept.append(row)
+        else:
+            logger.debug(f"Dropped in-batch duplicate {label} id={row['id'][:12]}")
+    return kept
+
+
+def _batchResult(record) -> dict:
+    """create* result dict from a node write record."""
+    if record["existing_id"]:
+        return {
+            "action": "skipped",
+            "existing_id": record["existing_id"],
+            "similarity": record["similarity"],
+        }
+    result = {"action": "created"}
+    if record.get("continued_id"):
+        result["continues_id"] = record["continued_id"]
+    if record.get("cited_ids"):
+        result["cited_ids"] = record["cited_ids"]
+    return result
+
+
+def _statsDeltas(nodes: dict, results: dict, edges: int, supersessions: int) -> dict:
+    """STATS_INCREMENT deltas for nodes and edges a write created."""
+    deltas = dict.fromkeys(STATS_KEYS, 0)
+    for label, rows in nodes.items():
+        for row in rows:
+            result = results[row["id"]]
+            if result["action"] == "created":
+                deltas[STAT_LABELS[label]] += 1
+                deltas["precedent_links"] += len(result.get("cited_ids", ()))
+    deltas["precedent_links"] += supersessions
+    deltas["supersessions"] = supersessions
+    deltas["edges"] = edges
+    return deltas
+
+
+def _logBatch(project: str, nodes: dict, results: dict, duration: int):
+    for label, rows in nodes.items():
+        for row in rows:
+            result = results[row["id"]]
+            if result["action"] == "skipped":
+                logger.info(
+                    f"Skipped duplicate {label} (score={result['similarity']:.3f})",
+                    extra={"cat": "tool"},
                 )
-            return result.single()["count"]
+                continue
+            links = []
+            if result.get("continues_id"):
+                links.append("continues 1")
+            if result.get("cited_ids"):
+                links.append(f"cites {len(result['cited_ids'])}")
+            link_str = f" ({', '.join(links)})" if links else ""
+            logger.info(
+                f"Created {label} id={row['id'][:12]}...{link_str} ({duration}ms)",
+                extra={
+                    "cat": "tool",
+                    "event": "node_created",
+                    "node_type": label,
+                    "project": project,
+                },
+            )
 
 
-# Singleton
+def _relationshipType(relationship_type: str) -> str:
+    rel_type = relationship_type.upper().replace(" ", "_")
+    if rel_type not in DECISION_RELATIONSHIPS:
+        logger.warning(f"Unknown relationship type: {rel_type}, using IMPACTS")
+        rel_type = "IMPACTS"
+    return rel_type
+
+
+def _relationshipRows(relationships: list[dict], results: dict) -> dict:
+    """Explicit edges of newly created decisions, grouped by type."""
+    by_type: dict[str, list[dict]] = {}
+    for rel in relationships:
+        if results.get(rel["decision_id"], {}).get("action") != "created":
+            continue
+        if not rel.get("embedding"):
+            continue
+        by_type.setdefault(_relationshipType(rel["type"]), []).append(
+            {
+                "decision_id": rel["decision_id"],
+                "reason": rel["reason"],
+                "embedding": rel["embedding"],
+            }
+        )
+    return by_type
+
+
+def _relationshipWriteQuery(rel_type: str) -> str:
+    """UNWIND statement linking each row's decision to its best prior match."""
+    return f"""
+        UNWIND $rows as row
+        CALL db.index.vector.queryNodes('decision_embedding', $fetch, row.embedding)
+        YIELD node, score
+        WHERE node.project = $project
+          AND node.id <> row.decision_id
+          AND score > 0.7
+        WITH row, node, score
+        ORDER BY score DESC
+        WITH row, head(collect({{node: node, score: score}})) as best
+        MATCH (d:Decision {{id: row.decision_id}})
+        WITH d, row, best.node as target, best.score as score
+        CREATE (d)-[:{rel_type} {{reason: row.reason, auto: false, similarity: score}}]->(target)
+    """
+
+
+def _relationshipCreateQuery(rel_type: str) -> str:
+    return f"""
+        MATCH (d:Decision {{id: $decision_id}})
+        MATCH (target:Decision {{id: $target_id}})
+        CREATE (d)-[:{rel_type} {{reason: $reason, auto: false, similarity: $score}}]->(target)
+    """
+
+
+def _labelCountsQuery(labels: list[str]) -> str:
+    return " UNION ALL ".join(f"""
+        CALL {{ MATCH (n:{label}) RETURN count(n) as total }}
+        CALL {{
+            MATCH (n:{label}) WHERE n.project = $project
+            RETURN count(n) as in_project
+        }}
+        RETURN '{label}' as label, in_project, total
+        """ for label in labels)
+
+
+def _vectorSearchQuery(
+    indexes: list[str], where: str, include_vectors: bool, include_codes: bool
+) -> str:
+    """One UNION branch per index, returning its n, fetched, floor and hits."""
+    return " UNION ALL ".join(f"""
+        CALL db.index.vector.queryNodes('{index}', $fetch[{n}], $embedding)
+        YIELD node, score
+        WITH node, score
+        ORDER BY score DESC
+        WITH count(*) as fetched, min(score) as floor,
+             collect(CASE
+                 WHEN node.project = $project AND score >= $min_score
+                      AND {where}
+                 THEN {{node: {nodeProjection("node", include_vectors, include_codes)},
+                       score: score}}
+             END) as hits
+        RETURN {n} as n, fetched, floor, hits[..$k] as hits
+        """ for n, index in enumerate(indexes))
+
+
+def _collectHits(
+    records,
+    pending: list[str],
+    fetch: dict[str, int],
+    k: int,
+    min_score: float,
+    results: dict,
+) -> list[str]:
+    """Move finished indexes' hits into results; return those to widen.
+
+    Widened indexes have their fetch size raised in place.
+    """
+    short = []
+    for record in records:
+        index = pending[record["n"]]
+        hits = record["hits"]
+        exhausted = record["fetched"] < fetch[index] or (
+            record["floor"] is not None and record["floor"] < min_score
+        )
+        if len(hits) >= k or exhausted or fetch[index] >= VECTOR_MAX_FETCH:
+            results[index] = [(nodeProps(hit["node"]), hit["score"]) for hit in hits]
+            continue
+        logger.debug(
+            f"Widening {index} search: "
+            f"{len(hits)}/{k} hits in {fetch[index]} neighbours"
+        )
+        fetch[index] = min(fetch[index] * 4, VECTOR_MAX_FETCH)
+        short.append(index)
+    return short
+
+
+def _distinctHits(
+    results: dict[str, list[tuple]], dims: int, include_vectors: bool
+) -> dict[str, list[tuple]]:
+    """Drop hits near-duplicating a better hit of any key, by embedding_q.
+
+    Codes of another dimension (a model mid-migration) are not compared.
+    The codes are stripped unless include_vectors is set.
+    """
+    ranked = sorted(
+        ((hit, key) for key, hits in results.items() for hit in hits),
+        key=lambda item: item[0][1],
+        reverse=True,
+    )
+    codes = [props.get("embedding_q") for (props, _), _ in ranked]
+    codes = [c if c and len(c) == dims else None for c in codes]
+    distinct = {key: [] for key in results}
+    for ((props, score), key), keep in zip(
+        ranked, distinctMask(codes, 2 * DISTINCT_SCORE - 1)
+    ):
+        if not keep:
+            continue
+        if not include_vectors:
+            props = {k: v for k, v in props.items() if k != "embedding_q"}
+        distinct[key].append((props, score))
+    return distinct
+
+
+def _precedentResults(records) -> dict[str, list[tuple]]:
+    results = {key: [] for key in PRECEDENT_CATEGORIES.values()}
+    for record in records:
+        results[PRECEDENT_CATEGORIES[record["label"]]] = [
+            (nodeProps(hit["node"]), hit["score"]) for hit in record["hits"]
+        ]
+    return results
+
+
+def _projectLinkQuery(label: str) -> str:
+    return f"""
+    MATCH (n:{label})
+    WHERE n.project IS NOT NULL AND n.project <> ''
+      AND NOT (n)-[:IN_PROJECT]->(:Project)
+    CALL {{
+        WITH n
+        MERGE (p:Project {{name: n.project}})
+        ON CREATE SET p.created_at = datetime()
+        CREATE (n)-[:IN_PROJECT]->(p)
+    }} IN TRANSACTIONS OF $batch_size ROWS
+    RETURN count(n) as linked
+    """
+
+
+def _clearChunksQuery(source_file: Optional[str]) -> str:
+    if source_file:
+        return (
+            "MATCH (ch:Chunk {project: $project, source_file: $source_file}) DELETE ch"
+        )
+    return "MATCH (ch:Chunk {project: $project}) DELETE ch"
+
+
+def _promoteQuery(branch: Optional[str]) -> str:
+    query = """
+        MATCH (d:Decision {project: $project, status: 'developmental'})
+        WHERE d.user_id = $user_id
+    """
+    if branch:
+        query += " AND d.branch = $branch"
+    return query + """
+        SET d.status = 'curated', d.promoted_at = datetime()
+        RETURN count(d) as promoted
+    """
+
+
+def _nodeWriteQuery(label: str) -> str:
+    """UNWIND statement creating `label` rows of {id, embedding, props}.
+
+    Rows whose id is already stored are skipped, as are rows of labels in
+    DEDUP_INDEXES matching a stored node of the project.
+    """
+    if label in DEDUP_INDEXES:
+        index, threshold = DEDUP_INDEXES[label]
+        find_dup = f"""
+        CALL {{
+            WITH row
+            WITH row WHERE row.embedding IS NOT NULL
+            CALL db.index.vector.queryNodes('{index}', $fetch, row.embedding)
+            YIELD node, score
+            WHERE node.project = $project AND score >= {threshold}
+            WITH node, score
+            ORDER BY score DESC
+            RETURN head(collect({{id: node.id, score: score}})) as dup
+        }}
+        """
+    else:
+        find_dup = "WITH row, null as dup"
+    return f"""
+        UNWIND $rows as row
+        {find_dup}
+        OPTIONAL MATCH (prior:{label} {{id: row.id}})
+        WITH row, CASE WHEN prior IS NULL THEN dup
+                       ELSE {{id: prior.id, score: 1.0}} END as dup
+        CALL {{
+            WITH row, dup
+            WITH row, dup WHERE dup IS NULL
+            CREATE (n:{label} {{id: row.id}})
+            SET n.timestamp = datetime(),
+                n.project = $project,
+                n.user_id = $user_id,
+                n.embedding = row.embedding
+            SET n += row.props
+            MERGE (p:Project {{name: $project}})
+            ON CREATE SET p.created_at = datetime()
+            CREATE (n)-[:IN_PROJECT]->(p)
+        }}
+        RETURN row.id as id, dup.id as existing_id, dup.score as similarity
+    """
+
+
+# Singletons
 _client = None
+_async_client = None
 
 
 def getClient() -> GraphClient:
@@ -1216,3 +2063,18 @@ def getClient() -> GraphClient:
     if _client is None:
         _client = GraphClient()
     return _client
+
+
+def getAsyncClient() -> AsyncGraphClient:
+    """Shared AsyncGraphClient; create and use it on one event loop."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncGraphClient()
+    return _async_client
+
+
+async def closeAsyncClient():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
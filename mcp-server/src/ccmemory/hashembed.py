@@ -0,0 +1,72 @@
+"""Deterministic in-process embeddings from hashed n-gram features.
+
+Each word and character trigram is hashed to a few signed slots of an N-dim
+vector (a sparse random projection of the bag of features), then the vector
+is L2-normalized. Texts sharing vocabulary get high cosine similarity, so the
+vector indexes, dedup thresholds and search paths behave sensibly without a
+model server. Output depends only on the text and dims, not on the process,
+which makes it suitable for tests, seeding and benchmarks.
+"""
+
+import hashlib
+import re
+from functools import lru_cache
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r"\w+")
+NGRAM = 3
+SLOTS_PER_FEATURE = 2
+
+
+@lru_cache(maxsize=65536)
+def _slots(feature: str, dims: int) -> tuple[tuple[int, float], ...]:
+    digest = hashlib.blake2b(feature.encode(), digest_size=8 * SLOTS_PER_FEATURE)
+    raw = digest.digest()
+    slots = []
+    for i in range(SLOTS_PER_FEATURE):
+        value = int.from_bytes(raw[i * 8 : (i + 1) * 8], "little")
+        slots.append((value % dims, 1.0 if value >> 63 else -1.0))
+    return tuple(slots)
+
+
+def _features(text: str) -> list[str]:
+    features = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        features.append(f"w:{word}")
+        padded = f"<{word}>"
+        features.extend(
+            f"c:{padded[i:i + NGRAM]}" for i in range(len(padded) - NGRAM + 1)
+        )
+    return features
+
+
+def hashEmbedding(text: str, dims: int) -> list:
+    """Embed text as a unit vector of hashed word and trigram features."""
+    vector = np.zeros(dims, dtype=np.float32)
+    for feature in _features(text):
+        for index, sign in _slots(feature, dims):
+            vector[index] += sign
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    else:
+        # No word characters; still return a valid non-zero vector
+        vector[_slots(text, dims)[0][0]] = 1.0
+    return vector.tolist()
+
+
+class HashBackend:
+    """Embedding backend that runs in-process with no network or model."""
+
+    name = "hash"
+    cacheable = False  # Cheaper to recompute than to look up
+
+    def __init__(self, dims: int):
+        self.dims = dims
+
+    def embed(self, texts: list[str]) -> list[list]:
+        return [hashEmbedding(text, self.dims) for text in texts]
+
+    async def embedAsync(self, texts: list[str]) -> list[list]:
+        return self.embed(texts)
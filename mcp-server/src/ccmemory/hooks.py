@@ -6,12 +6,15 @@ Per doc/clarifications/1-DAG-with-CROSS-REFS.md:
 - All nodes created directly with project + timestamp
 """
 
-import json
+import asyncio
+import hashlib
 import logging
+import time
 import uuid
 from datetime import datetime
 
-from .graph import getClient
+from .graph import getAsyncClient
+from .contextcache import getContextCache
 from .context import setCurrentProject, clearCurrentProject, getCurrentProject
 from .detection.detector import detectAll
 from .detection.schemas import (
@@ -26,30 +29,100 @@ from .detection.schemas import (
     Question,
     ReferenceData,
 )
-from .embeddings import getEmbedding
+from .embeddings import embeddingMeta, embeddingText, getEmbeddingsAsync
+from .jobs import getJobQueue
+from .spool import SPOOL_REPLAY_INTERVAL, getSpool
+from .timings import logTimings
+from .transcript import readTurn
 
 logger = logging.getLogger("ccmemory")
 
+# Writes deferred until after the hook response (see _runAfterResponse)
+_background: set[asyncio.Task] = set()
 
-def handleSessionStart(
+
+async def handleSessionStart(
     session_id: str, cwd: str, conversation_stems: list[str] | None = None
 ) -> dict:
     """Initialize context for a new CC session.
 
     Note: We don't create Session nodes anymore (per clarification).
     Just set in-memory context and return relevant context for injection.
+
+    The graph context comes from the project's snapshot cache (see
+    getSessionContext) and the Retrieval record is written after returning.
     """
+    start = time.time()
+    durations = {}
     project = cwd.rsplit("/", 1)[-1] if "/" in cwd else cwd
-    client = getClient()
+    client = getAsyncClient()
 
     # Set in-memory context for tools (they need to know current project)
     setCurrentProject(project)
 
-    # Query context to inject
-    facts = client.queryProjectFacts(project, limit=15)
-    recent = client.queryRecent(project, limit=15)
-    stale = client.queryStaleDecisions(project, days=30)
-    failed = client.queryFailedApproaches(project, limit=5)
+    snapshot = await getSessionContext(project, durations)
+    context_text = snapshot["context"]
+    retrieved_ids = snapshot["retrieved_ids"]
+
+    # Pending backfill (kept but simplified)
+    pending = _filterPendingBackfill(conversation_stems or [], client)
+    if pending:
+        context_text += "\n" + "\n".join(
+            [
+                "",
+                "## Pending History Import",
+                f"Found {len(pending)} conversation(s) not yet imported.",
+                "Use AskUserQuestion to offer importing.",
+            ]
+        )
+
+    durations["total"] = round((time.time() - start) * 1000, 2)
+    logTimings("session_start", durations)
+
+    # Record retrieval (telemetry only, not core)
+    if retrieved_ids:
+        _runAfterResponse(
+            _recordRetrieval(client, project, retrieved_ids, context_text)
+        )
+        logger.info(f"Retrieved {len(retrieved_ids)} items for project {project}")
+
+    return {
+        "context": context_text,
+        "project": project,
+        "pending_backfill": len(pending) if pending else 0,
+        "retrieved_count": len(retrieved_ids),
+    }
+
+
+async def getSessionContext(project: str, durations: dict | None = None) -> dict:
+    """Rendered graph context for a project: {context, retrieved_ids}.
+
+    Served from the project's snapshot until a write bumps its version,
+    otherwise rendered from the four context reads, run concurrently.
+    """
+    durations = {} if durations is None else durations
+    start = time.time()
+    cache = getContextCache()
+    version = cache.version(project)
+    snapshot = cache.get(project, version)
+    if snapshot is not None:
+        durations["cache_hit"] = round((time.time() - start) * 1000, 2)
+        return snapshot
+    snapshot = await _renderSessionContext(getAsyncClient(), project, durations)
+    cache.put(project, version, snapshot)
+    return snapshot
+
+
+async def _renderSessionContext(client, project: str, durations: dict) -> dict:
+    start = time.time()
+    facts, recent, stale, failed = await asyncio.gather(
+        _timed(durations, "facts", client.queryProjectFacts(project, limit=15)),
+        _timed(durations, "recent", client.queryRecent(project, limit=15)),
+        _timed(durations, "stale", client.queryStaleDecisions(project, days=30)),
+        _timed(durations, "failed", client.queryFailedApproaches(project, limit=5)),
+    )
+    durations["reads"] = int((time.time() - start) * 1000)
+    start = time.time()
 
     retrieved_ids = []
     context_parts = []
@@ -139,31 +212,49 @@ def handleSessionStart(
             "No prior context. Project facts, decisions, and corrections will be captured automatically."
         )
 
-    # Pending backfill (kept but simplified)
-    pending = _filterPendingBackfill(conversation_stems or [], client)
-    if pending:
-        context_parts.append("")
-        context_parts.append("## Pending History Import")
-        context_parts.append(f"Found {len(pending)} conversation(s) not yet imported.")
-        context_parts.append("Use AskUserQuestion to offer importing.")
+    durations["render"] = int((time.time() - start) * 1000)
+    return {"context": "\n".join(context_parts), "retrieved_ids": retrieved_ids}
 
-    context_text = "\n".join(context_parts)
 
-    # Record retrieval (telemetry only, not core)
-    if retrieved_ids:
-        client.recordRetrieval(
-            project=project,
-            retrieved_ids=retrieved_ids,
-            context_summary=context_text,
-        )
-        logger.info(f"Retrieved {len(retrieved_ids)} items for project {project}")
+async def _timed(durations: dict, stage: str, coro):
+    """Await coro, recording its duration in ms under durations[stage]."""
+    start = time.time()
+    result = await coro
+    durations[stage] = int((time.time() - start) * 1000)
+    return result
 
-    return {
-        "context": context_text,
-        "project": project,
-        "pending_backfill": len(pending) if pending else 0,
-        "retrieved_count": len(retrieved_ids),
-    }
+
+async def _recordRetrieval(
+    client, project: str, retrieved_ids: list[str], context_text: str
+):
+    start = time.time()
+    await client.recordRetrieval(
+        project=project,
+        retrieved_ids=retrieved_ids,
+        context_summary=context_text,
+    )
+    logTimings("session_start", {"retrieval": int((time.time() - start) * 1000)})
+
+
+def _runAfterResponse(coro):
+    """Run a write in the background, so the hook responds without waiting.
+
+    The task holds no request state; failures are logged, not raised.
+    """
+    task = asyncio.create_task(coro)
+    _background.add(task)
+    task.add_done_callback(_finishBackground)
+
+
+def _finishBackground(task: asyncio.Task):
+    _background.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.warning(f"Background write failed: {task.exception()}")
+
+
+async def flushBackground():
+    """Wait for deferred writes, e.g. before closing the graph client."""
+    await asyncio.gather(*_background, return_exceptions=True)
 
 
 def _filterPendingBackfill(session_stems: list[str], client) -> list[str]:
@@ -175,177 +266,215 @@ def _filterPendingBackfill(session_stems: list[str], client) -> list[str]:
     return session_stems[:20]  # Cap at 20
 
 
-def readTranscript(transcript_path: str) -> tuple[str, str, str]:
-    """Read the last user message and assistant response from transcript."""
-    try:
-        with open(transcript_path, "r") as f:
-            messages = [json.loads(line) for line in f if line.strip()]
-    except (FileNotFoundError, json.JSONDecodeError):
-        return "", "", ""
-
-    user_message = ""
-    assistant_response = ""
-    for msg in reversed(messages):
-        inner = msg.get("message", {})
-        role = inner.get("role") or msg.get("type")
-        if role == "user" and not user_message:
-            content = inner.get("content", "")
-            if isinstance(content, list):
-                content = " ".join(
-                    c.get("text", "") for c in content if isinstance(c, dict)
-                )
-            user_message = str(content)
-        elif role == "assistant" and not assistant_response:
-            content = inner.get("content", "")
-            if isinstance(content, list):
-                content = " ".join(
-                    c.get("text", "") for c in content if isinstance(c, dict)
-                )
-            assistant_response = str(content)
-        if user_message and assistant_response:
-            break
-
-    context = "\n".join(
-        f"{m.get('type', 'unknown')}: {str(m.get('message', {}).get('content', ''))[:200]}"
-        for m in messages[-10:-2]
-    )
-    return user_message, assistant_response, context
-
+# Detection fields carrying semantic content, matching EMBEDDING_FIELDS for
+# the stored node so re-embedding reproduces the same text
+DETECTION_FIELDS = {
+    DetectionType.Decision: ["description", "rationale"],
+    DetectionType.Correction: ["wrongBelief", "rightBelief"],
+    DetectionType.Exception: ["ruleBroken", "justification"],
+    DetectionType.Insight: ["summary", "implications"],
+    DetectionType.Question: ["question", "answer", "context"],
+    DetectionType.FailedApproach: ["approach", "outcome", "lesson"],
+    DetectionType.ProjectFact: ["fact", "context"],
+}
 
-def _storeDetection(client, detection: Detection, project: str) -> bool:
-    """Store a detection in the graph. Returns True if stored, False if skipped."""
-    det_id = f"{detection.type.value}-{uuid.uuid4().hex[:8]}"
 
-    embedding = getEmbedding(detection.data.model_dump_json())
+def detectionEmbeddingText(detection: Detection) -> str:
+    """Text to embed for a detection: its semantic fields, without schema noise."""
+    fields = DETECTION_FIELDS.get(detection.type, [])
+    return embeddingText(*(getattr(detection.data, f, None) for f in fields))
 
-    # Check for duplicate project facts
-    if detection.type == DetectionType.ProjectFact and project:
-        if client.projectFactExists(project, embedding, threshold=0.9):
-            return False
 
+def _embeddingTexts(detection: Detection) -> list[str]:
+    """Texts that storeDetections will embed for this detection."""
+    if detection.type == DetectionType.Reference:
+        return []
+    texts = [detectionEmbeddingText(detection)]
+    if detection.type == DetectionType.Decision:
+        texts += [
+            rel.description
+            for rel in getattr(detection.data, "relatedDecisions", None) or []
+            if rel.description
+        ]
+    return texts
+
+
+def _nodeId(prefix: str, seed: str | None) -> str:
+    """Random node id, or one derived from seed so replays rewrite the same id."""
+    if seed is None:
+        return f"{prefix}-{uuid.uuid4().hex[:8]}"
+    return f"{prefix}-{hashlib.sha256(seed.encode()).hexdigest()[:12]}"
+
+
+def _detectionRows(
+    detection: Detection, embedding: list | None, seed: str | None = None
+) -> tuple[str, list[dict]]:
+    """Graph label and AsyncGraphClient.storeBatch rows for a detection."""
     data = detection.data
+    det_id = _nodeId(detection.type.value, seed)
+    meta = {
+        "detection_confidence": detection.confidence,
+        "detection_method": "llm_extraction",
+    }
+    topics = getattr(data, "topics", None) or []
     match detection.type:
         case DetectionType.Decision:
             assert isinstance(data, Decision)
-            client.createDecision(
-                decision_id=det_id,
-                project=project,
-                description=data.description,
-                embedding=embedding,
-                topics=getattr(data, "topics", None) or [],
-                continues_decision=getattr(data, "continuesDecision", None),
-                rationale=data.rationale,
-                revisit_trigger=data.revisitTrigger,
-                detection_confidence=detection.confidence,
-                detection_method="llm_extraction",
-            )
-            for rel in getattr(data, "relatedDecisions", None) or []:
-                rel_embedding = getEmbedding(rel.description)
-                client.createDecisionRelationship(
-                    decision_id=det_id,
-                    project=project,
-                    target_description=rel.description,
-                    relationship_type=rel.relationshipType.value,
-                    reason=rel.reason,
-                    embedding=rel_embedding,
-                )
+            label = "Decision"
+            props = {
+                "description": data.description,
+                "topics": topics,
+                "rationale": data.rationale,
+                "revisit_trigger": data.revisitTrigger,
+            }
         case DetectionType.Correction:
             assert isinstance(data, Correction)
-            client.createCorrection(
-                correction_id=det_id,
-                project=project,
-                wrong_belief=data.wrongBelief,
-                right_belief=data.rightBelief,
-                embedding=embedding,
-                topics=getattr(data, "topics", None) or [],
-                severity=data.severity.value,
-                detection_confidence=detection.confidence,
-                detection_method="llm_extraction",
-            )
+            label = "Correction"
+            props = {
+                "wrong_belief": data.wrongBelief,
+                "right_belief": data.rightBelief,
+                "topics": topics,
+                "severity": data.severity.value,
+            }
         case DetectionType.Exception:
             assert isinstance(data, Exception_)
-            client.createException(
-                exception_id=det_id,
-                project=project,
-                rule_broken=data.ruleBroken,
-                justification=data.justification,
-                embedding=embedding,
-                topics=getattr(data, "topics", None) or [],
-                scope=data.scope.value,
-                detection_confidence=detection.confidence,
-                detection_method="llm_extraction",
-            )
+            label = "Exception"
+            props = {
+                "rule_broken": data.ruleBroken,
+                "justification": data.justification,
+                "topics": topics,
+                "scope": data.scope.value,
+            }
         case DetectionType.Insight:
             assert isinstance(data, Insight)
-            client.createInsight(
-                insight_id=det_id,
-                project=project,
-                category=data.category.value,
-                summary=data.summary,
-                embedding=embedding,
-                topics=getattr(data, "topics", None) or [],
-                implications=data.implications,
-                detection_confidence=detection.confidence,
-                detection_method="llm_extraction",
-            )
+            label = "Insight"
+            props = {
+                "category": data.category.value,
+                "summary": data.summary,
+                "topics": topics,
+                "implications": data.implications,
+            }
         case DetectionType.Question:
             assert isinstance(data, Question)
-            client.createQuestion(
-                question_id=det_id,
-                project=project,
-                question=data.question,
-                answer=data.answer,
-                embedding=embedding,
-                topics=getattr(data, "topics", None) or [],
-                context=data.context,
-                detection_confidence=detection.confidence,
-                detection_method="llm_extraction",
-            )
+            label = "Question"
+            props = {
+                "question": data.question,
+                "answer": data.answer,
+                "topics": topics,
+                "context": data.context,
+            }
         case DetectionType.FailedApproach:
             assert isinstance(data, FailedApproach)
-            client.createFailedApproach(
-                fa_id=det_id,
-                project=project,
-                approach=data.approach,
-                outcome=data.outcome,
-                lesson=data.lesson or "",
-                embedding=embedding,
-                topics=getattr(data, "topics", None) or [],
-                detection_confidence=detection.confidence,
-                detection_method="llm_extraction",
-            )
-        case DetectionType.Reference:
-            assert isinstance(data, ReferenceData)
-            for ref in data.references:
-                ref_id = f"ref-{uuid.uuid4().hex[:8]}"
-                client.createReference(
-                    ref_id=ref_id,
-                    project=project,
-                    ref_type=ref.type.value,
-                    uri=ref.uri,
-                    detection_confidence=detection.confidence,
-                    detection_method="llm_extraction",
-                )
+            label = "FailedApproach"
+            props = {
+                "approach": data.approach,
+                "outcome": data.outcome,
+                "lesson": data.lesson or "",
+                "topics": topics,
+            }
         case DetectionType.ProjectFact:
             assert isinstance(data, ProjectFact)
-            client.createProjectFact(
-                fact_id=det_id,
-                project=project,
-                category=data.category.value,
-                fact=data.fact,
-                embedding=embedding,
-                context=data.context,
-                detection_confidence=detection.confidence,
-                detection_method="llm_extraction",
-            )
-    return True
+            label = "ProjectFact"
+            props = {
+                "category": data.category.value,
+                "fact": data.fact,
+                "context": data.context,
+            }
+        case DetectionType.Reference:
+            assert isinstance(data, ReferenceData)
+            rows = [
+                {
+                    "id": _nodeId("ref", seed and f"{seed}:{n}"),
+                    "embedding": None,
+                    "props": {"type": ref.type.value, "uri": ref.uri, **meta},
+                }
+                for n, ref in enumerate(data.references)
+            ]
+            return "Reference", rows
+    row = {
+        "id": det_id,
+        "embedding": embedding,
+        "props": {**props, **meta, **embeddingMeta(embedding)},
+    }
+    if label == "Decision":
+        row["continues"] = bool(getattr(data, "continuesDecision", None))
+    return label, [row]
+
+
+async def storeDetections(
+    client, detections: list[Detection], project: str, source_id: str | None = None
+) -> list[Detection]:
+    """Embed and store a turn's detections in one batched graph write.
+
+    All texts go to the embedding backend in one batch, then every node and
+    edge is written in a single transaction (one UNWIND per label). With a
+    source_id (the turn's spool event) node ids derive from it, so storing
+    the turn again skips the nodes already written.
+
+    Returns the detections that were stored rather than skipped as duplicates.
+    """
+    texts = [t for d in detections for t in _embeddingTexts(d) if t]
+    try:
+        embeddings = dict(zip(texts, await getEmbeddingsAsync(texts)))
+    except (ValueError, RuntimeError) as e:
+        if source_id is not None:
+            raise  # Left in the spool for replay
+        logger.warning(
+            f"Embedding failed, not storing {len(detections)} detections: {e}"
+        )
+        return []
+
+    nodes: dict[str, list[dict]] = {}
+    relationships = []
+    owners = {}
+    for n, detection in enumerate(detections):
+        embedding = None
+        if detection.type != DetectionType.Reference:
+            embedding = embeddings.get(detectionEmbeddingText(detection))
+            if embedding is None:
+                continue  # No semantic text to store
+        seed = source_id and f"{source_id}:{n}"
+        label, rows = _detectionRows(detection, embedding, seed)
+        nodes.setdefault(label, []).extend(rows)
+        owners.update((row["id"], detection) for row in rows)
+        if detection.type == DetectionType.Decision:
+            relationships += [
+                {
+                    "decision_id": rows[0]["id"],
+                    "type": rel.relationshipType.value,
+                    "reason": rel.reason,
+                    "embedding": embeddings.get(rel.description),
+                }
+                for rel in getattr(detection.data, "relatedDecisions", None) or []
+                if rel.description
+            ]
+    if not nodes:
+        return []
+
+    results = await client.storeBatch(project, nodes, relationships)
+    stored = []
+    for node_id, detection in owners.items():
+        created = results.get(node_id, {}).get("action") == "created"
+        if created and not any(d is detection for d in stored):
+            stored.append(detection)
+    return stored
 
 
 async def handleMessageResponse(
     session_id: str, transcript_path: str, cwd: str
 ) -> dict:
-    """Handle stop hook - detect and store decisions/corrections/etc."""
-    user_message, claude_response, context = readTranscript(transcript_path)
+    """Handle stop hook - spool the turn and queue its detection.
+
+    The transcript is read now, pinning the turn that fired the hook. The
+    turn is written to the spool before the LLM detection and graph write
+    run as a background job (see jobs.py), and stays there until stored;
+    if the job queue is full it waits in the spool for replaySpool().
+    The session's cursor skips turns already spooled, so each turn is
+    detected once however often the hook fires for it.
+    """
+    turn = readTurn(transcript_path)
+    user_message = turn["user_message"]
+    claude_response = turn["assistant_response"]
     logger.debug(
         f"transcript_path={transcript_path}, user_message_len={len(user_message)}"
     )
@@ -353,11 +482,96 @@ async def handleMessageResponse(
         logger.debug("No user_message found, skipping detection")
         return {"detections": 0}
 
+    event = {
+        "project": cwd.rsplit("/", 1)[-1] if "/" in cwd else cwd,
+        "session_id": session_id,
+        "user_message": user_message,
+        "claude_response": claude_response,
+        "context": turn["context"],
+    }
+    event_id = hashlib.sha256(
+        f"{session_id}\0{user_message}\0{claude_response}".encode()
+    ).hexdigest()[:16]
+    if not getSpool().appendTurn(
+        session_id, turn["position"], event_id, "detection", event
+    ):
+        logger.info(f"Skipping already processed turn {event_id}")
+        return {"job_id": event_id, "status": "duplicate"}
     try:
-        detections = await detectAll(user_message, claude_response, context)
-    except RuntimeError as e:
-        logger.exception(f"Detection failed: {e}")
-        return {"detections": 0, "error": str(e)}
+        job = _submitDetection(event_id, event)
+    except asyncio.QueueFull:
+        return {"job_id": event_id, "status": "spooled"}
+    return {"job_id": job["id"], "status": job["status"]}
+
+
+def _submitDetection(event_id: str, event: dict) -> dict:
+    """Queue the detection job for a spooled turn; acked once stored.
+
+    The spool counts one failed attempt per job, once the queue's own
+    retries are used up.
+    """
+
+    async def run():
+        result = await processMessageResponse(
+            event["project"],
+            event["user_message"],
+            event["claude_response"],
+            event["context"],
+            source_id=event_id,
+        )
+        getSpool().ack(event_id)
+        return result
+
+    return getJobQueue().submit(
+        "detection",
+        run,
+        job_id=event_id,
+        on_failed=lambda e: getSpool().fail(event_id, str(e)),
+        project=event["project"],
+        session_id=event["session_id"],
+    )
+
+
+async def replaySpool(interval: float = SPOOL_REPLAY_INTERVAL):
+    """Re-queue spooled turns that are due, every interval, until cancelled."""
+    while True:
+        replaySpooled()
+        await asyncio.sleep(interval)
+
+
+def replaySpooled() -> int:
+    """Queue due spooled turns that have no job in flight; returns how many."""
+    spool = getSpool()
+    queue = getJobQueue()
+    replayed = 0
+    for event in spool.due():
+        job = queue.get(event["id"])
+        if job and job["status"] in ("queued", "running"):
+            continue
+        try:
+            _submitDetection(event["id"], event["payload"])
+        except asyncio.QueueFull:
+            break
+        replayed += 1
+    if replayed:
+        spool.replayed += replayed
+        logger.info(f"Replaying {replayed} spooled turns")
+    return replayed
+
+
+async def processMessageResponse(
+    project: str,
+    user_message: str,
+    claude_response: str,
+    context: str,
+    source_id: str | None = None,
+) -> dict:
+    """Detect and store a turn's decisions/corrections/etc (a detection job).
+
+    Detection and storage errors propagate so the job queue retries them;
+    telemetry errors don't.
+    """
+    detections = await detectAll(user_message, claude_response, context)
 
     if not detections:
         prompt_preview = (
@@ -369,34 +583,33 @@ async def handleMessageResponse(
         )
         return {"detections": 0}
 
-    client = getClient()
-    project = cwd.rsplit("/", 1)[-1] if "/" in cwd else cwd
-    stored = 0
-
-    for detection in detections:
-        try:
-            if _storeDetection(client, detection, project):
-                stored += 1
-        except (ValueError, RuntimeError, AssertionError):
-            continue
+    client = getAsyncClient()
+    stored = len(await storeDetections(client, detections, project, source_id))
 
-    client.recordTelemetry(
-        event_type="detections",
-        project=project,
-        data={"count": stored, "types": [d.type.value for d in detections]},
-    )
+    # Best-effort: the detections are stored, and a retry would call the
+    # LLM again for them
+    try:
+        await client.recordTelemetry(
+            event_type="detections",
+            project=project,
+            data={"count": stored, "types": [d.type.value for d in detections]},
+        )
+    except Exception as e:
+        logger.warning(f"Detection telemetry not recorded for {project}: {e}")
 
     return {"detections": stored}
 
 
-def handleSessionEnd(session_id: str, transcript_path: str | None, cwd: str) -> dict:
+async def handleSessionEnd(
+    session_id: str, transcript_path: str | None, cwd: str
+) -> dict:
     """Handle session end - just clear in-memory context."""
     project = cwd.rsplit("/", 1)[-1] if "/" in cwd else cwd
-    client = getClient()
+    client = getAsyncClient()
 
     clearCurrentProject()
 
-    client.recordTelemetry(
+    await client.recordTelemetry(
         event_type="session_end", project=project, data={"session_id": session_id}
     )
 
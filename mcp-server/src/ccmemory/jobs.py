@@ -0,0 +1,195 @@
+"""Bounded background job queue for work too slow for a hook request.
+
+The Stop hook enqueues a detection job and returns 202; a pool of worker
+tasks runs it (LLM detection, embedding, graph write) with retries. Jobs
+are kept in memory for the status endpoint: the queued and running ones
+plus the last JOB_HISTORY finished.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from .timings import recordTiming, timingStats
+
+logger = logging.getLogger("ccmemory.jobs")
+
+DETECTION_WORKERS = int(os.getenv("CCMEMORY_DETECTION_WORKERS", "2"))
+DETECTION_QUEUE_SIZE = int(os.getenv("CCMEMORY_DETECTION_QUEUE_SIZE", "100"))
+DETECTION_RETRIES = int(os.getenv("CCMEMORY_DETECTION_RETRIES", "2"))
+DETECTION_RETRY_DELAY = float(os.getenv("CCMEMORY_DETECTION_RETRY_DELAY", "2"))
+JOB_HISTORY = 1000
+DRAIN_TIMEOUT = 30.0
+
+
+class JobQueue:
+    def __init__(
+        self,
+        workers: int = DETECTION_WORKERS,
+        size: int = DETECTION_QUEUE_SIZE,
+        retries: int = DETECTION_RETRIES,
+        retry_delay: float = DETECTION_RETRY_DELAY,
+    ):
+        self.workers = workers
+        self.size = size
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.busy = 0
+        self.counts = dict.fromkeys(
+            ("submitted", "completed", "failed", "retried", "rejected"), 0
+        )
+        self._jobs: OrderedDict[str, dict] = OrderedDict()
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def submit(
+        self,
+        kind: str,
+        run: Callable[[], Awaitable[dict]],
+        job_id: str | None = None,
+        on_failed: Callable[[Exception], None] | None = None,
+        **info,
+    ) -> dict:
+        """Queue run() (called again on each retry) and return the job.
+
+        on_failed(error) is called once, after the last retry has failed.
+        Raises asyncio.QueueFull when DETECTION_QUEUE_SIZE jobs are waiting.
+        """
+        self._start()
+        job = {
+            "id": job_id or uuid.uuid4().hex[:16],
+            "kind": kind,
+            "status": "queued",
+            "attempts": 0,
+            "enqueued_at": time.time(),
+            **info,
+        }
+        try:
+            self._queue.put_nowait((job, run, on_failed))
+        except asyncio.QueueFull:
+            self.counts["rejected"] += 1
+            logger.warning(f"Job queue full ({self.size}), rejected {kind} job")
+            raise
+        self.counts["submitted"] += 1
+        self._jobs[job["id"]] = job
+        self._prune()
+        return dict(job)
+
+    def get(self, job_id: str) -> dict | None:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def stats(self) -> dict:
+        """Depth, throughput counters and wait/run latency (backpressure)."""
+        queued = [j for j in self._jobs.values() if j["status"] == "queued"]
+        oldest = min((j["enqueued_at"] for j in queued), default=None)
+        return {
+            "depth": self._queue.qsize() if self._queue else 0,
+            "capacity": self.size,
+            "workers": self.workers,
+            "busy": self.busy,
+            **self.counts,
+            "oldest_queued_s": round(time.time() - oldest, 1) if oldest else 0,
+            "wait_ms": timingStats("jobs.wait"),
+            "run_ms": timingStats("jobs.run"),
+        }
+
+    async def close(self, timeout: float = DRAIN_TIMEOUT):
+        """Let queued jobs finish (up to timeout), then stop the workers."""
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self._queue.qsize()} queued jobs at shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def _start(self):
+        """Create the queue and workers on the running loop, on first use."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.size)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def _work(self):
+        while True:
+            job, run, on_failed = await self._queue.get()
+            self.busy += 1
+            try:
+                await self._runJob(job, run, on_failed)
+            finally:
+                self.busy -= 1
+                self._queue.task_done()
+
+    async def _runJob(
+        self,
+        job: dict,
+        run: Callable[[], Awaitable[dict]],
+        on_failed: Callable[[Exception], None] | None,
+    ):
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        recordTiming("jobs.wait", int((job["started_at"] - job["enqueued_at"]) * 1000))
+        while True:
+            job["attempts"] += 1
+            try:
+                job["result"] = await run()
+                job["status"] = "done"
+                self.counts["completed"] += 1
+                break
+            except Exception as e:
+                job["error"] = str(e)
+                if job["attempts"] > self.retries:
+                    job["status"] = "failed"
+                    self.counts["failed"] += 1
+                    logger.warning(
+                        f"{job['kind']} job {job['id']} failed after "
+                        f"{job['attempts']} attempts: {e}"
+                    )
+                    if on_failed:
+                        try:
+                            on_failed(e)
+                        except Exception as callback_error:
+                            logger.warning(
+                                f"{job['kind']} job {job['id']} failure not "
+                                f"recorded: {callback_error}"
+                            )
+                    break
+                self.counts["retried"] += 1
+                delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+                logger.info(
+                    f"{job['kind']} job {job['id']} attempt {job['attempts']} "
+                    f"failed, retrying in {delay:.1f}s: {e}"
+                )
+                await asyncio.sleep(delay)
+        job["finished_at"] = time.time()
+        duration = int((job["finished_at"] - job["started_at"]) * 1000)
+        recordTiming("jobs.run", duration)
+        logger.debug(f"{job['kind']} job {job['id']} {job['status']} ({duration}ms)")
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond JOB_HISTORY."""
+        while len(self._jobs) > JOB_HISTORY:
+            oldest = next(iter(self._jobs.values()))
+            if oldest["status"] in ("queued", "running"):
+                break
+            self._jobs.popitem(last=False)
+
+
+# Singleton
+_queue = None
+
+
+def getJobQueue() -> JobQueue:
+    global _queue
+    if _queue is None:
+        _queue = JobQueue()
+    return _queue
@@ -0,0 +1,103 @@
+"""Startup warm-up and readiness state for the HTTP server.
+
+/health only says the process is up. Readiness additionally requires that the
+embedding model has answered a trial request with the expected dimension,
+Neo4j accepts connections, and an LLM provider is configured. The warm-up runs
+in the background at startup so liveness is reported immediately.
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+import httpx
+
+from .embeddings import EMBEDDING_DIMS, EMBEDDING_MODEL, getBackend
+
+logger = logging.getLogger("ccmemory.readiness")
+
+WARMUP_TIMEOUT = float(os.getenv("CCMEMORY_WARMUP_TIMEOUT", "120"))
+WARMUP_RETRY_DELAY = 2.0
+
+COMPONENTS = ("embedding", "neo4j", "llm")
+
+_status: dict[str, dict] = {
+    name: {"ready": False, "error": "not checked"} for name in COMPONENTS
+}
+
+
+async def _retry(name: str, check, timeout: float | None = None) -> dict:
+    """Run check until it succeeds or timeout (default WARMUP_TIMEOUT) elapses."""
+    timeout = WARMUP_TIMEOUT if timeout is None else timeout
+    start = time.time()
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            details = await check()
+            duration = int((time.time() - start) * 1000)
+            logger.info(f"{name} ready after {attempts} attempt(s) ({duration}ms)")
+            return {"ready": True, "ms": duration, **details}
+        except (RuntimeError, ValueError, OSError) as e:
+            duration = int((time.time() - start) * 1000)
+            _status[name] = {"ready": False, "ms": duration, "error": str(e)}
+            if time.time() - start + WARMUP_RETRY_DELAY > timeout:
+                logger.warning(f"{name} not ready after {duration}ms: {e}")
+                return _status[name]
+            logger.debug(f"{name} not ready yet ({e}), retrying")
+            await asyncio.sleep(WARMUP_RETRY_DELAY)
+
+
+async def _checkEmbedding() -> dict:
+    # Goes straight to the backend: a cache hit wouldn't load the model
+    try:
+        [embedding] = await getBackend().embedAsync(["ccmemory warm-up"])
+    except httpx.HTTPError as e:
+        raise RuntimeError(f"Embedding backend unavailable: {e}") from e
+    if len(embedding) != EMBEDDING_DIMS:
+        raise ValueError(
+            f"{EMBEDDING_MODEL} returned {len(embedding)} dims, "
+            f"expected {EMBEDDING_DIMS}"
+        )
+    return {"model": EMBEDDING_MODEL, "dims": len(embedding)}
+
+
+async def _checkNeo4j() -> dict:
+    from neo4j.exceptions import DriverError, Neo4jError
+
+    from .graph import getAsyncClient
+
+    try:
+        await getAsyncClient().driver.verify_connectivity()
+    except (DriverError, Neo4jError) as e:
+        raise RuntimeError(f"Neo4j unavailable: {e}") from e
+    return {}
+
+
+async def _checkLlm() -> dict:
+    from .llmprovider import getLlmClient
+
+    return {"provider": getLlmClient().provider.value}
+
+
+async def warmUp():
+    """Check every component, retrying slow starters such as model loading."""
+    start = time.time()
+    results = await asyncio.gather(
+        _retry("embedding", _checkEmbedding),
+        _retry("neo4j", _checkNeo4j),
+        # API keys come from the environment, so retrying can't help
+        _retry("llm", _checkLlm, timeout=0),
+    )
+    _status.update(zip(COMPONENTS, results))
+    duration = int((time.time() - start) * 1000)
+    logger.info(f"Warm-up finished (ready={isReady()}, {duration}ms)")
+
+
+def isReady() -> bool:
+    return all(_status[name]["ready"] for name in COMPONENTS)
+
+
+def getReadiness() -> dict:
+    return {"ready": isReady(), "components": dict(_status)}
@@ -1,8 +1,10 @@
 import argparse
+import asyncio
 import json
 import logging
 import os
 import time
+from contextlib import asynccontextmanager
 from logging.handlers import RotatingFileHandler
 from mcp.server.fastmcp import FastMCP
 from starlette.applications import Starlette
@@ -78,7 +80,7 @@ async def hookSessionStart(request: Request) -> JSONResponse:
     logger.info(f"<- POST /hooks/session-start (project={project})")
     logger.debug(f"session_id={session_id}")
     try:
-        result = hooks.handleSessionStart(
+        result = await hooks.handleSessionStart(
             session_id=session_id,
             cwd=data.get("cwd", ""),
             conversation_stems=data.get("conversation_stems"),
@@ -108,9 +110,11 @@ async def hookMessageResponse(request: Request) -> JSONResponse:
             cwd=data.get("cwd", ""),
         )
         duration = int((time.time() - start) * 1000)
-        detections = result.get("detections", 0)
-        logger.info(f"-> 200 (detections={detections}, {duration}ms)")
-        return JSONResponse(result)
+        if "job_id" not in result:
+            logger.info(f"-> 200 (nothing to detect, {duration}ms)")
+            return JSONResponse(result)
+        logger.info(f"-> 202 (job={result['job_id']} {result['status']}, {duration}ms)")
+        return JSONResponse(result, status_code=202)
     except (ValueError, KeyError) as e:
         logger.warning(f"-> 400: {e}")
         return JSONResponse({"error": str(e)}, status_code=400)
@@ -126,7 +130,7 @@ async def hookSessionEnd(request: Request) -> JSONResponse:
     session_id = data.get("session_id", "")
     logger.info(f"<- POST /hooks/session-end (project={project})")
     try:
-        result = hooks.handleSessionEnd(
+        result = await hooks.handleSessionEnd(
             session_id=session_id,
             transcript_path=data.get("transcript_path"),
             cwd=data.get("cwd", ""),
@@ -146,6 +150,68 @@ async def healthCheck(request: Request) -> JSONResponse:
     return JSONResponse({"status": "ok"})
 
 
+async def readinessCheck(request: Request) -> JSONResponse:
+    from .readiness import getReadiness
+
+    readiness = getReadiness()
+    return JSONResponse(readiness, status_code=200 if readiness["ready"] else 503)
+
+
+async def embeddingStats(request: Request) -> JSONResponse:
+    from .embeddings import getCacheStats
+
+    return JSONResponse(getCacheStats())
+
+
+async def jobStats(request: Request) -> JSONResponse:
+    from .detection.prefilter import prefilterStats
+    from .jobs import getJobQueue
+    from .spool import getSpool
+
+    return JSONResponse(
+        {
+            **getJobQueue().stats(),
+            "spool": getSpool().stats(),
+            "prefilter": prefilterStats(),
+        }
+    )
+
+
+async def jobStatus(request: Request) -> JSONResponse:
+    from .jobs import getJobQueue
+    from .spool import getSpool
+
+    job_id = request.path_params["job_id"]
+    job = getJobQueue().get(job_id) or getSpool().get(job_id)
+    if job is None:
+        return JSONResponse({"error": "unknown job"}, status_code=404)
+    return JSONResponse(job)
+
+
+async def sessionContext(request: Request) -> JSONResponse:
+    project = request.query_params.get("project", "")
+    if not project:
+        return JSONResponse({"error": "project required"}, status_code=400)
+    snapshot = await hooks.getSessionContext(project)
+    return JSONResponse(
+        {
+            "context": snapshot["context"],
+            "retrieved_count": len(snapshot["retrieved_ids"]),
+        }
+    )
+
+
+async def invalidateSessionContext(request: Request) -> JSONResponse:
+    """Drop a project's context snapshot after a write by another process."""
+    from .contextcache import getContextCache
+
+    project = request.query_params.get("project", "")
+    if not project:
+        return JSONResponse({"error": "project required"}, status_code=400)
+    getContextCache().bump(project)
+    return JSONResponse({"status": "ok"})
+
+
 async def bulkImport(request: Request) -> JSONResponse:
     from .backfill import backfillConversationContent
 
@@ -228,19 +294,66 @@ def main():
         mcp.run()
 
 
+async def migrateProjectLinks(warmup: asyncio.Task):
+    """Link nodes from before the :Project registry once Neo4j is up."""
+    from .graph import getAsyncClient
+    from .readiness import getReadiness
+
+    await warmup
+    if not getReadiness()["components"]["neo4j"]["ready"]:
+        return
+    start = time.time()
+    try:
+        linked = await getAsyncClient().migrateProjectLinks()
+    except Exception as e:
+        logger.warning(f"Linking nodes to :Project failed: {e}")
+        return
+    if linked:
+        duration = int((time.time() - start) * 1000)
+        logger.info(f"Linked {linked} older nodes to :Project ({duration}ms)")
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    from . import embeddings, graph
+    from .jobs import getJobQueue
+    from .readiness import warmUp
+
+    warmup = asyncio.create_task(warmUp())
+    replay = asyncio.create_task(hooks.replaySpool())
+    migrate = asyncio.create_task(migrateProjectLinks(warmup))
+    yield
+    startup = [warmup, replay, migrate]
+    for task in startup:
+        task.cancel()
+    # Let them unwind before the queue and clients they use are closed
+    await asyncio.gather(*startup, return_exceptions=True)
+    await getJobQueue().close()
+    await hooks.flushBackground()
+    await embeddings.closeAsyncClient()
+    await graph.closeAsyncClient()
+
+
 def createApp():
     hook_routes = [
         Route("/health", healthCheck, methods=["GET"]),
+        Route("/ready", readinessCheck, methods=["GET"]),
+        Route("/api/embedding-stats", embeddingStats, methods=["GET"]),
         Route("/hooks/session-start", hookSessionStart, methods=["POST"]),
         Route("/hooks/message-response", hookMessageResponse, methods=["POST"]),
         Route("/hooks/session-end", hookSessionEnd, methods=["POST"]),
+        Route("/api/session-context", sessionContext, methods=["GET"]),
+        Route("/api/session-context", invalidateSessionContext, methods=["DELETE"]),
+        Route("/api/jobs", jobStats, methods=["GET"]),
+        Route("/api/jobs/{job_id}", jobStatus, methods=["GET"]),
         Route("/api/bulk-import", bulkImport, methods=["POST"]),
     ]
     return Starlette(
         routes=[
             *hook_routes,
             Mount("/", app=mcp.sse_app()),
-        ]
+        ],
+        lifespan=lifespan,
     )
 
 
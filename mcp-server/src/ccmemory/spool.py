@@ -0,0 +1,239 @@
+"""Durable spool of hook events awaiting processing.
+
+Each Stop-hook turn is written here (SQLite, synchronous=FULL) before its
+detection job is queued, and deleted once the job has stored it. Events
+whose job failed, or that were pending when the server stopped, are
+replayed with backoff once Neo4j and the LLM are reachable again. After
+SPOOL_MAX_ATTEMPTS failures an event is marked dead: kept for inspection
+and counted in stats(), but no longer replayed. Event ids are derived
+from the turn's content, so a re-fired hook or a replay of a partly
+stored turn never writes it twice.
+
+A per-session cursor (the position and id of the last turn spooled) is
+kept alongside, so a turn delivered again after it was processed, or an
+older turn delivered late, is skipped before reaching the LLM.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("ccmemory.spool")
+
+SPOOL_PATH = os.getenv("CCMEMORY_SPOOL", "instance/spool.db")
+SPOOL_REPLAY_INTERVAL = float(os.getenv("CCMEMORY_SPOOL_REPLAY_INTERVAL", "30"))
+SPOOL_MAX_BACKOFF = 3600.0
+SPOOL_MAX_ATTEMPTS = int(os.getenv("CCMEMORY_SPOOL_MAX_ATTEMPTS", "10"))
+CURSOR_TTL = 30 * 86400  # Forget sessions idle this long
+
+
+class Spool:
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.acked = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+        if path:
+            spool_dir = os.path.dirname(path)
+            if spool_dir and not os.path.exists(spool_dir):
+                os.makedirs(spool_dir, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path or ":memory:", timeout=10.0, check_same_thread=False
+        )
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                last_error TEXT,
+                dead INTEGER NOT NULL DEFAULT 0
+            )
+            """)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(events)")]
+        if "dead" not in columns:  # Spools from before dead-lettering
+            self._conn.execute(
+                "ALTER TABLE events ADD COLUMN dead INTEGER NOT NULL DEFAULT 0"
+            )
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cursors (
+                session_id TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                event_id TEXT NOT NULL,
+                updated REAL NOT NULL
+            )
+            """)
+        self._conn.commit()
+
+    def append(self, event_id: str, kind: str, payload: dict) -> bool:
+        """Persist an event; False if it is already spooled."""
+        with self._lock:
+            inserted = self._insert(event_id, kind, payload)
+            self._conn.commit()
+            return inserted
+
+    def appendTurn(
+        self, session_id: str, position: int, event_id: str, kind: str, payload: dict
+    ) -> bool:
+        """Persist a session's turn unless its cursor is at or past the turn.
+
+        position orders a session's turns; event_id identifies the content,
+        so a turn at the cursor whose content changed is spooled again. The
+        event and cursor are written in one transaction.
+        """
+        if not session_id:
+            return self.append(event_id, kind, payload)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT position, event_id FROM cursors WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row and (row[0] > position or tuple(row) == (position, event_id)):
+                return False
+            if row is None:
+                self._conn.execute(
+                    "DELETE FROM cursors WHERE updated < ?", (now - CURSOR_TTL,)
+                )
+            self._insert(event_id, kind, payload)
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO cursors (session_id, position, event_id, updated)
+                VALUES (?, ?, ?, ?)
+                """,
+                (session_id, position, event_id, now),
+            )
+            self._conn.commit()
+            return True
+
+    def _insert(self, event_id: str, kind: str, payload: dict) -> bool:
+        now = time.time()
+        cursor = self._conn.execute(
+            """
+            INSERT OR IGNORE INTO events (id, kind, payload, created, next_attempt)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (event_id, kind, json.dumps(payload), now, now),
+        )
+        return cursor.rowcount == 1
+
+    def ack(self, event_id: str):
+        """Drop an event once it has been processed."""
+        with self._lock:
+            self._conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+            self._conn.commit()
+            self.acked += 1
+
+    def fail(self, event_id: str, error: str):
+        """Record a failed attempt and push the event's next replay back.
+
+        The SPOOL_MAX_ATTEMPTS-th failure marks the event dead instead.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM events WHERE id = ?", (event_id,)
+            ).fetchone()
+            if row is None:
+                return
+            attempts = row[0] + 1
+            dead = attempts >= SPOOL_MAX_ATTEMPTS
+            backoff = min(SPOOL_REPLAY_INTERVAL * 2 ** row[0], SPOOL_MAX_BACKOFF)
+            self._conn.execute(
+                """
+                UPDATE events
+                SET attempts = ?, next_attempt = ?, last_error = ?, dead = ?
+                WHERE id = ?
+                """,
+                (attempts, time.time() + backoff, error[:500], int(dead), event_id),
+            )
+            self._conn.commit()
+        if dead:
+            logger.warning(
+                f"Spooled event {event_id} dead after {attempts} attempts: {error}"
+            )
+
+    def due(self, limit: int = 100) -> list[dict]:
+        """Oldest events whose next replay is due: {id, kind, payload}."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT id, kind, payload FROM events
+                WHERE dead = 0 AND next_attempt <= ?
+                ORDER BY created
+                LIMIT ?
+                """,
+                (time.time(), limit),
+            ).fetchall()
+        return [
+            {"id": row[0], "kind": row[1], "payload": json.loads(row[2])}
+            for row in rows
+        ]
+
+    def get(self, event_id: str) -> dict | None:
+        """An event's spool state, without its payload."""
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT kind, created, attempts, last_error, dead
+                FROM events WHERE id = ?
+                """,
+                (event_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": event_id,
+            "kind": row[0],
+            "status": "dead" if row[4] else "spooled",
+            "enqueued_at": row[1],
+            "attempts": row[2],
+            "error": row[3],
+        }
+
+    def stats(self) -> dict:
+        """Depth and age of the spool (how far processing has fallen behind)."""
+        with self._lock:
+            depth, oldest, failing, dead = self._conn.execute("""
+                SELECT count(CASE WHEN dead = 0 THEN 1 END),
+                       min(CASE WHEN dead = 0 THEN created END),
+                       count(CASE WHEN dead = 0 THEN last_error END),
+                       count(CASE WHEN dead = 1 THEN 1 END)
+                FROM events
+                """).fetchone()
+        return {
+            "path": self.path,
+            "depth": depth,
+            "oldest_age_s": round(time.time() - oldest, 1) if oldest else 0,
+            "failing": failing,
+            "dead": dead,
+            "acked": self.acked,
+            "replayed": self.replayed,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton
+_spool = None
+
+
+def getSpool() -> Spool:
+    """Shared spool; memory-only (not durable) if the path is unset or unusable."""
+    global _spool
+    if _spool is None:
+        try:
+            _spool = Spool(SPOOL_PATH)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Spool not durable ({SPOOL_PATH}): {e}")
+            _spool = Spool()
+    return _spool
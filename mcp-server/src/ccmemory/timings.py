@@ -0,0 +1,56 @@
+"""Rolling per-stage latency percentiles for hot request paths.
+
+Each stage keeps its last TIMING_WINDOW durations in memory (per process),
+so p50/p99 reflect recent traffic without a metrics backend.
+"""
+
+import logging
+from collections import deque
+
+logger = logging.getLogger("ccmemory.timings")
+
+TIMING_WINDOW = 1000
+
+_samples: dict[str, deque] = {}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile (pct in 0..1) of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def recordTiming(stage: str, duration_ms: float):
+    """Add a stage's duration to its rolling window."""
+    _samples.setdefault(stage, deque(maxlen=TIMING_WINDOW)).append(duration_ms)
+
+
+def timingStats(stage: str) -> dict:
+    """{count, p50, p99} in ms over the stage's window (empty if unseen)."""
+    samples = list(_samples.get(stage, ()))
+    if not samples:
+        return {}
+    return {
+        "count": len(samples),
+        "p50": percentile(samples, 0.5),
+        "p99": percentile(samples, 0.99),
+    }
+
+
+def logTimings(name: str, durations: dict[str, int]):
+    """Record one request's stage durations and log them with p50/p99.
+
+    Stages are recorded as "<name>.<stage>".
+    """
+    parts = []
+    for stage, duration in durations.items():
+        recordTiming(f"{name}.{stage}", duration)
+        stats = timingStats(f"{name}.{stage}")
+        parts.append(
+            f"{stage}={duration}ms (p50={stats['p50']}ms, p99={stats['p99']}ms)"
+        )
+    logger.info(f"{name}: {', '.join(parts)}")
+
+
+def resetTimings():
+    _samples.clear()
@@ -4,8 +4,8 @@ from typing import Optional
 
 from mcp.server.fastmcp import FastMCP
 
-from ..graph import getClient
-from ..embeddings import getEmbedding
+from ..graph import getAsyncClient, nodeProjection, nodeProps
+from ..embeddings import getEmbeddingAsync
 from ..reranker import rerank
 from ..context import getCurrentProject
 from .logging import logTool
@@ -31,9 +31,11 @@ def registerQueryTools(mcp: FastMCP):
             limit: Maximum number of items to return
             include_team: Whether to include curated team decisions
         """
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
-        results = client.queryRecent(project, limit=limit, include_team=include_team)
+        results = await client.queryRecent(
+            project, limit=limit, include_team=include_team
+        )
 
         formatted = []
         for item in results:
@@ -61,9 +63,9 @@ def registerQueryTools(mcp: FastMCP):
             limit: Maximum results per category
             include_team: Whether to include curated team decisions
         """
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
-        results = client.searchPrecedent(
+        results = await client.searchPrecedent(
             query, project, limit=limit, include_team=include_team
         )
 
@@ -83,13 +85,17 @@ def registerQueryTools(mcp: FastMCP):
             limit: Maximum results to return
             include_team: Whether to include curated team decisions
         """
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
 
-        embedding = getEmbedding(query)
+        embedding = await getEmbeddingAsync(query)
         raw_limit = min(limit * 2, 20)
-        results = client.searchSemantic(
-            embedding, project, limit=raw_limit, include_team=include_team
+        results = await client.searchSemantic(
+            embedding,
+            project,
+            limit=raw_limit,
+            include_team=include_team,
+            distinct=True,
         )
 
         candidates = []
@@ -121,14 +127,14 @@ def registerQueryTools(mcp: FastMCP):
             topic: Topic to query (e.g., "auth", "database", "deployment")
             limit: Maximum results
         """
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
 
         # Combine full-text and semantic search
-        text_results = client.searchPrecedent(topic, project, limit=limit)
+        text_results = await client.searchPrecedent(topic, project, limit=limit)
 
-        embedding = getEmbedding(topic)
-        semantic_results = client.searchSemantic(embedding, project, limit=limit)
+        embedding = await getEmbeddingAsync(topic)
+        semantic_results = await client.searchSemantic(embedding, project, limit=limit)
 
         return {
             "project": project,
@@ -148,42 +154,42 @@ def registerQueryTools(mcp: FastMCP):
         Args:
             decision_id: ID of the decision to trace
         """
-        client = getClient()
+        client = getAsyncClient()
         driver = client.driver
 
-        with driver.session() as session:
-            result = session.run(
-                """
-                MATCH (d:Decision {id: $decision_id})
+        async with driver.session() as session:
+            result = await session.run(
+                f"""
+                MATCH (d:Decision {{id: $decision_id}})
                 OPTIONAL MATCH (d)-[:CITES]->(cited:Decision)
                 OPTIONAL MATCH (d)-[:SUPERSEDES]->(superseded:Decision)
                 OPTIONAL MATCH (superseding:Decision)-[:SUPERSEDES]->(d)
                 OPTIONAL MATCH (d)-[:DEPENDS_ON]->(depends:Decision)
                 OPTIONAL MATCH (d)-[:CONSTRAINS]->(constrains:Decision)
                 OPTIONAL MATCH (d)-[:CONFLICTS_WITH]->(conflicts:Decision)
-                RETURN d,
-                       collect(DISTINCT cited) as cited,
-                       collect(DISTINCT superseded) as superseded,
-                       collect(DISTINCT superseding) as superseding,
-                       collect(DISTINCT depends) as depends_on,
-                       collect(DISTINCT constrains) as constrains,
-                       collect(DISTINCT conflicts) as conflicts_with
+                RETURN {nodeProjection("d")} as d,
+                       collect(DISTINCT {nodeProjection("cited")}) as cited,
+                       collect(DISTINCT {nodeProjection("superseded")}) as superseded,
+                       collect(DISTINCT {nodeProjection("superseding")}) as superseding,
+                       collect(DISTINCT {nodeProjection("depends")}) as depends_on,
+                       collect(DISTINCT {nodeProjection("constrains")}) as constrains,
+                       collect(DISTINCT {nodeProjection("conflicts")}) as conflicts_with
                 """,
                 decision_id=decision_id,
             )
-            record = result.single()
+            record = await result.single()
 
             if not record:
                 return {"error": f"Decision {decision_id} not found"}
 
             return {
-                "decision": dict(record["d"]) if record["d"] else None,
-                "cites": [dict(n) for n in record["cited"] if n],
-                "supersedes": [dict(n) for n in record["superseded"] if n],
-                "superseded_by": [dict(n) for n in record["superseding"] if n],
-                "depends_on": [dict(n) for n in record["depends_on"] if n],
-                "constrains": [dict(n) for n in record["constrains"] if n],
-                "conflicts_with": [dict(n) for n in record["conflicts_with"] if n],
+                "decision": nodeProps(record["d"]),
+                "cites": [nodeProps(n) for n in record["cited"]],
+                "supersedes": [nodeProps(n) for n in record["superseded"]],
+                "superseded_by": [nodeProps(n) for n in record["superseding"]],
+                "depends_on": [nodeProps(n) for n in record["depends_on"]],
+                "constrains": [nodeProps(n) for n in record["constrains"]],
+                "conflicts_with": [nodeProps(n) for n in record["conflicts_with"]],
             }
 
     @mcp.tool()
@@ -194,9 +200,9 @@ def registerQueryTools(mcp: FastMCP):
         Args:
             days: Consider decisions older than this many days as stale
         """
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
-        results = client.queryStaleDecisions(project, days=days)
+        results = await client.queryStaleDecisions(project, days=days)
 
         return {"project": project, "threshold_days": days, "stale_decisions": results}
 
@@ -208,9 +214,9 @@ def registerQueryTools(mcp: FastMCP):
         Args:
             limit: Maximum results
         """
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
-        results = client.queryFailedApproaches(project, limit=limit)
+        results = await client.queryFailedApproaches(project, limit=limit)
 
         return {"project": project, "failed_approaches": results}
 
@@ -222,9 +228,9 @@ def registerQueryTools(mcp: FastMCP):
         Args:
             branch: Only promote decisions from this branch (optional)
         """
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
-        client.promoteDecisions(project, branch=branch)
+        await client.promoteDecisions(project, branch=branch)
 
         return {"project": project, "branch": branch, "status": "promoted"}
 
@@ -232,9 +238,9 @@ def registerQueryTools(mcp: FastMCP):
     @logTool
     async def getMetrics() -> dict:
         """Get all context graph metrics for the current project."""
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
-        return client.getAllMetrics(project)
+        return await client.getAllMetrics(project)
 
     @mcp.tool()
     @logTool
@@ -244,9 +250,9 @@ def registerQueryTools(mcp: FastMCP):
         Args:
             limit: Maximum results
         """
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
-        results = client.queryOpenQuestions(project, limit=limit)
+        results = await client.queryOpenQuestions(project, limit=limit)
         return {"project": project, "open_questions": results}
 
     @mcp.tool()
@@ -256,12 +262,12 @@ def registerQueryTools(mcp: FastMCP):
 
         Returns exception clusters, supersession chains, and correction hotspots.
         """
-        client = getClient()
+        client = getAsyncClient()
         project = _getProject()
 
         return {
             "project": project,
-            "exception_clusters": client.queryExceptionClusters(project),
-            "supersession_chains": client.querySupersessionChains(project),
-            "correction_hotspots": client.queryCorrectionHotspots(project),
+            "exception_clusters": await client.queryExceptionClusters(project),
+            "supersession_chains": await client.querySupersessionChains(project),
+            "correction_hotspots": await client.queryCorrectionHotspots(project),
         }
@@ -10,8 +10,8 @@ from typing import Optional
 
 from mcp.server.fastmcp import FastMCP
 
-from ..graph import getClient
-from ..embeddings import getEmbedding
+from ..graph import getAsyncClient
+from ..embeddings import embeddingText, getEmbeddingAsync
 from ..context import getCurrentProject
 from .logging import logTool
 
@@ -60,11 +60,11 @@ def registerRecordTools(mcp: FastMCP):
         if not project:
             return _projectError()
 
-        client = getClient()
+        client = getAsyncClient()
         decision_id = f"decision-{uuid.uuid4().hex[:8]}"
 
-        text_for_embedding = f"{description} {rationale or ''}"
-        embedding = getEmbedding(text_for_embedding)
+        text_for_embedding = embeddingText(description, rationale)
+        embedding = await getEmbeddingAsync(text_for_embedding)
 
         kwargs = {
             "detection_method": "explicit_command",
@@ -79,7 +79,7 @@ def registerRecordTools(mcp: FastMCP):
         if sets_precedent:
             kwargs["sets_precedent"] = sets_precedent
 
-        result = client.createDecision(
+        result = await client.createDecision(
             decision_id=decision_id,
             project=project,
             description=description,
@@ -110,13 +110,13 @@ def registerRecordTools(mcp: FastMCP):
         if not project:
             return _projectError()
 
-        client = getClient()
+        client = getAsyncClient()
         correction_id = f"correction-{uuid.uuid4().hex[:8]}"
 
-        text_for_embedding = f"Wrong: {wrong_belief} Correct: {right_belief}"
-        embedding = getEmbedding(text_for_embedding)
+        text_for_embedding = embeddingText(wrong_belief, right_belief)
+        embedding = await getEmbeddingAsync(text_for_embedding)
 
-        client.createCorrection(
+        await client.createCorrection(
             correction_id=correction_id,
             project=project,
             wrong_belief=wrong_belief,
@@ -150,13 +150,13 @@ def registerRecordTools(mcp: FastMCP):
         if not project:
             return _projectError()
 
-        client = getClient()
+        client = getAsyncClient()
         exception_id = f"exception-{uuid.uuid4().hex[:8]}"
 
-        text_for_embedding = f"Exception to: {rule_broken} Because: {justification}"
-        embedding = getEmbedding(text_for_embedding)
+        text_for_embedding = embeddingText(rule_broken, justification)
+        embedding = await getEmbeddingAsync(text_for_embedding)
 
-        client.createException(
+        await client.createException(
             exception_id=exception_id,
             project=project,
             rule_broken=rule_broken,
@@ -192,11 +192,11 @@ def registerRecordTools(mcp: FastMCP):
         if not project:
             return _projectError()
 
-        client = getClient()
+        client = getAsyncClient()
         insight_id = f"insight-{uuid.uuid4().hex[:8]}"
 
-        text_for_embedding = f"{summary} {detail or ''} {implications or ''}"
-        embedding = getEmbedding(text_for_embedding)
+        text_for_embedding = embeddingText(summary, detail, implications)
+        embedding = await getEmbeddingAsync(text_for_embedding)
 
         kwargs = {
             "detection_method": "explicit_command",
@@ -207,7 +207,7 @@ def registerRecordTools(mcp: FastMCP):
         if implications:
             kwargs["implications"] = implications
 
-        client.createInsight(
+        await client.createInsight(
             insight_id=insight_id,
             project=project,
             category=category,
@@ -239,7 +239,7 @@ def registerRecordTools(mcp: FastMCP):
         if not project:
             return _projectError()
 
-        client = getClient()
+        client = getAsyncClient()
         question_id = f"question-{uuid.uuid4().hex[:8]}"
 
         kwargs = {
@@ -249,7 +249,7 @@ def registerRecordTools(mcp: FastMCP):
         if context:
             kwargs["context"] = context
 
-        client.createQuestion(
+        await client.createQuestion(
             question_id=question_id,
             project=project,
             question=question,
@@ -280,13 +280,13 @@ def registerRecordTools(mcp: FastMCP):
         if not project:
             return _projectError()
 
-        client = getClient()
+        client = getAsyncClient()
         fa_id = f"failed-{uuid.uuid4().hex[:8]}"
 
-        text_for_embedding = f"{approach} {outcome} {lesson}"
-        embedding = getEmbedding(text_for_embedding)
+        text_for_embedding = embeddingText(approach, outcome, lesson)
+        embedding = await getEmbeddingAsync(text_for_embedding)
 
-        client.createFailedApproach(
+        await client.createFailedApproach(
             fa_id=fa_id,
             project=project,
             approach=approach,
@@ -320,7 +320,7 @@ def registerRecordTools(mcp: FastMCP):
         if not project:
             return _projectError()
 
-        client = getClient()
+        client = getAsyncClient()
         ref_id = f"ref-{uuid.uuid4().hex[:8]}"
 
         kwargs = {
@@ -332,7 +332,7 @@ def registerRecordTools(mcp: FastMCP):
         if context:
             kwargs["context"] = context
 
-        client.createReference(
+        await client.createReference(
             ref_id=ref_id,
             project=project,
             ref_type=ref_type,
@@ -11,8 +11,8 @@ import httpx
 from bs4 import BeautifulSoup
 from mcp.server.fastmcp import FastMCP
 
-from ..graph import getClient
-from ..embeddings import getEmbedding
+from ..graph import getAsyncClient
+from ..embeddings import getEmbeddingAsync, getEmbeddingsAsync
 
 REFERENCE_DIR = ".ccmemory/reference"
 
@@ -104,28 +104,28 @@ Cached: {timestamp}
     return {"file": str(filepath), "pages": len(text_parts)}
 
 
-def _indexAll(project_root: str) -> int:
+async def _indexAll(project_root: str) -> int:
     """Index all markdown files in reference tree."""
     ref_path = _getReferencePath(project_root)
     if not ref_path.exists():
         return 0
 
-    client = getClient()
+    client = getAsyncClient()
     project = os.path.basename(project_root)
 
-    client.clearChunks(project)
+    await client.clearChunks(project)
 
     count = 0
     for md_file in ref_path.rglob("*.md"):
-        count += _indexFile(md_file, project_root, client)
+        count += await _indexFile(md_file, project_root, client)
 
     return count
 
 
-def _indexFile(filepath: Path, project_root: str, client=None) -> int:
+async def _indexFile(filepath: Path, project_root: str, client=None) -> int:
     """Index a single markdown file into chunks."""
     if client is None:
-        client = getClient()
+        client = getAsyncClient()
 
     project = os.path.basename(project_root)
     relative_path = str(filepath.relative_to(project_root))
@@ -143,12 +143,13 @@ def _indexFile(filepath: Path, project_root: str, client=None) -> int:
         elif part.strip():
             chunks.append({"section": current_section, "content": part.strip()[:2000]})
 
-    for i, chunk in enumerate(chunks):
-        chunk_id = f"{relative_path}#{i}"
-        text_for_embedding = f"{chunk['section']}: {chunk['content'][:500]}"
-        embedding = getEmbedding(text_for_embedding)
+    embeddings = await getEmbeddingsAsync(
+        [f"{chunk['section']}: {chunk['content'][:500]}" for chunk in chunks]
+    )
 
-        client.indexChunk(
+    for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+        chunk_id = f"{relative_path}#{i}"
+        await client.indexChunk(
             chunk_id=chunk_id,
             project=project,
             source_file=relative_path,
@@ -201,7 +202,7 @@ def registerReferenceTools(mcp: FastMCP):
         Note: This tool requires running locally (not in Docker container).
         """
         project_root = os.getcwd()
-        count = _indexAll(project_root)
+        count = await _indexAll(project_root)
         return {"indexed_chunks": count}
 
     @mcp.tool()
@@ -217,9 +218,9 @@ def registerReferenceTools(mcp: FastMCP):
         if not project:
             return {"error": "No active session. Start a Claude Code session first."}
 
-        embedding = getEmbedding(query)
-        client = getClient()
-        results = client.searchReference(embedding, project, limit=limit)
+        embedding = await getEmbeddingAsync(query)
+        client = getAsyncClient()
+        results = await client.searchReference(embedding, project, limit=limit)
 
         return {
             "results": [
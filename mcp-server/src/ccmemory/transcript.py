@@ -0,0 +1,188 @@
+"""Tail reads of Claude Code session transcripts (JSONL).
+
+A Stop hook only needs the last user/assistant pair and the few messages
+before them, so the first read of a transcript walks it backwards from EOF
+in READ_BLOCK chunks and stops once those are found. The byte offset
+reached is cached per transcript, so later turns of the session parse
+only the lines appended since. An unterminated last line is still being
+written and is left for the next read.
+
+A turn's position is the byte offset of its user message line, which
+only grows over a session (see Spool.appendTurn).
+"""
+
+import json
+import logging
+import os
+from collections import OrderedDict, deque
+
+logger = logging.getLogger("ccmemory.transcript")
+
+READ_BLOCK = 64 * 1024
+TAIL_MESSAGES = 10  # Last pair plus eight messages of context
+TRANSCRIPT_CACHE_SIZE = 256  # Sessions
+
+
+class _Tail:
+    """What has been read of one transcript, up to offset."""
+
+    def __init__(self, inode: int, offset: int):
+        self.inode = inode
+        self.offset = offset
+        self.messages: deque[dict] = deque(maxlen=TAIL_MESSAGES)
+        self.user_message = ""
+        self.user_position = -1
+        self.assistant_response = ""
+
+
+_tails: OrderedDict[str, _Tail] = OrderedDict()
+
+
+def readTranscript(transcript_path: str) -> tuple[str, str, str]:
+    """Read the last user message and assistant response from transcript.
+
+    Returns (user_message, assistant_response, context), context being the
+    eight messages before the last two.
+    """
+    turn = readTurn(transcript_path)
+    return turn["user_message"], turn["assistant_response"], turn["context"]
+
+
+def readTurn(transcript_path: str) -> dict:
+    """The transcript's last turn: readTranscript() fields plus its position."""
+    try:
+        with open(transcript_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            tail = _tails.pop(transcript_path, None)
+            if tail is None or tail.inode != stat.st_ino or stat.st_size < tail.offset:
+                tail = _readTail(f, stat.st_ino, stat.st_size)
+            else:
+                _readAppended(f, tail, stat.st_size)
+    except (FileNotFoundError, IsADirectoryError):
+        return {
+            "user_message": "",
+            "assistant_response": "",
+            "context": "",
+            "position": -1,
+        }
+
+    _tails[transcript_path] = tail
+    while len(_tails) > TRANSCRIPT_CACHE_SIZE:
+        _tails.popitem(last=False)
+
+    context = "\n".join(
+        f"{m.get('type', 'unknown')}: {str(m.get('message', {}).get('content', ''))[:200]}"
+        for m in list(tail.messages)[:-2]
+    )
+    return {
+        "user_message": tail.user_message,
+        "assistant_response": tail.assistant_response,
+        "context": context,
+        "position": tail.user_position,
+    }
+
+
+def resetTranscripts():
+    _tails.clear()
+
+
+def _readTail(f, inode: int, size: int) -> _Tail:
+    """Walk back from the last complete line until the tail is found."""
+    tail = _Tail(inode, _completeEnd(f, size))
+    newest_first = []
+    for position, line in _reverseLines(f, tail.offset):
+        message = _parseLine(line)
+        if message is None:
+            continue
+        if len(newest_first) < TAIL_MESSAGES:
+            newest_first.append(message)
+        role, text = _roleText(message)
+        if role == "user" and not tail.user_message:
+            tail.user_message = text
+            tail.user_position = position
+        elif role == "assistant" and not tail.assistant_response:
+            tail.assistant_response = text
+        if (
+            len(newest_first) == TAIL_MESSAGES
+            and tail.user_message
+            and tail.assistant_response
+        ):
+            break
+    tail.messages.extend(reversed(newest_first))
+    return tail
+
+
+def _readAppended(f, tail: _Tail, size: int):
+    """Parse the complete lines written since tail.offset."""
+    f.seek(tail.offset)
+    data = f.read(size - tail.offset)
+    end = data.rfind(b"\n") + 1
+    position = tail.offset
+    for line in data[:end].split(b"\n")[:-1]:
+        message = _parseLine(line)
+        if message is not None:
+            tail.messages.append(message)
+            role, text = _roleText(message)
+            if role == "user" and text:
+                tail.user_message = text
+                tail.user_position = position
+            elif role == "assistant" and text:
+                tail.assistant_response = text
+        position += len(line) + 1
+    tail.offset += end
+
+
+def _completeEnd(f, size: int) -> int:
+    """Offset just past the last newline (0 if there is none)."""
+    pos = size
+    while pos > 0:
+        start = max(0, pos - READ_BLOCK)
+        f.seek(start)
+        newline = f.read(pos - start).rfind(b"\n")
+        if newline >= 0:
+            return start + newline + 1
+        pos = start
+    return 0
+
+
+def _reverseLines(f, end: int):
+    """Yield (offset, line) for the lines before end, last first.
+
+    Reads READ_BLOCK at a time.
+    """
+    pos = end
+    partial = b""
+    while pos > 0:
+        start = max(0, pos - READ_BLOCK)
+        f.seek(start)
+        lines = (f.read(pos - start) + partial).split(b"\n")
+        partial = lines.pop(0)  # May continue in the previous block
+        offset = start + len(partial) + 1
+        offsets = []
+        for line in lines:
+            offsets.append(offset)
+            offset += len(line) + 1
+        yield from reversed(list(zip(offsets, lines)))
+        pos = start
+    yield 0, partial
+
+
+def _parseLine(line: bytes) -> dict | None:
+    if not line.strip():
+        return None
+    try:
+        message = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        logger.debug(f"Skipping unparseable transcript line ({len(line)} bytes)")
+        return None
+    return message if isinstance(message, dict) else None
+
+
+def _roleText(message: dict) -> tuple[str, str]:
+    """A message's role and its text content."""
+    inner = message.get("message", {})
+    role = inner.get("role") or message.get("type")
+    content = inner.get("content", "")
+    if isinstance(content, list):
+        content = " ".join(c.get("text", "") for c in content if isinstance(c, dict))
+    return role, str(content)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""Benchmark project-scoped vector search against global top-k then filter.
+
+Fills Neo4j with synthetic Insights spread over a growing number of projects
+and, at each size, compares recall@k (against exact in-project top-k computed
+with numpy) and latency of:
+
+  global   CALL queryNodes(index, k) ... WHERE node.project = $project
+  scoped   GraphClient._vectorSearch (share-sized over-fetch, widening)
+
+Uses the hash embedding backend, so no Ollama is needed. Bench nodes live in
+projects named bench-<run>-<n> and are deleted afterwards unless --keep.
+
+    python scripts/bench_vector_search.py --projects 1,10,50,200 --per-project 50
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'mcp-server', 'src'))
+
+os.environ.setdefault("CCMEMORY_EMBED_BACKEND", "hash")
+
+from ccmemory.embeddings import getEmbeddings
+from ccmemory.graph import getClient
+
+INDEX = "insight_embedding"
+WORDS = (
+    "cache index query retry backoff token session graph vector schema "
+    "migration deploy rollback queue worker batch stream latency timeout "
+    "auth webhook config logging metric alert shard replica lock commit"
+).split()
+
+
+def randomText(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12)))
+
+
+def addProject(client, project: str, count: int, rng: random.Random) -> np.ndarray:
+    texts = [randomText(rng) for _ in range(count)]
+    embeddings = getEmbeddings(texts)
+    rows = [
+        {
+            "id": f"bench-{uuid.uuid4().hex[:12]}",
+            "embedding": embedding,
+            "props": {"category": "pattern", "summary": text},
+        }
+        for text, embedding in zip(texts, embeddings)
+    ]
+    # Bypass dedup: random texts over a small vocabulary can look alike
+    with client.driver.session() as session:
+        session.run(
+            """
+            UNWIND $rows as row
+            CREATE (n:Insight {id: row.id})
+            SET n.project = $project, n.timestamp = datetime(),
+                n.user_id = $user_id, n.embedding = row.embedding
+            SET n += row.props
+            """,
+            rows=rows,
+            project=project,
+            user_id=client.user_id,
+        ).consume()
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def globalSearch(session, embedding, project, k):
+    result = session.run(
+        f"""
+        CALL db.index.vector.queryNodes('{INDEX}', $k, $embedding)
+        YIELD node, score
+        WHERE node.project = $project
+        RETURN node.summary as summary, score
+        """,
+        embedding=embedding,
+        project=project,
+        k=k,
+    )
+    return [r["score"] for r in result]
+
+
+def scopedSearch(client, embedding, project, k):
+    return [score for _, score in client._vectorSearch(INDEX, embedding, project, k)]
+
+
+def exactScores(vectors: np.ndarray, embedding, k: int) -> list[float]:
+    cosines = vectors @ np.asarray(embedding, dtype=np.float32)
+    return sorted(((1 + cosines) / 2).tolist(), reverse=True)[:k]
+
+
+def recall(found: list[float], exact: list[float]) -> float:
+    """Share of the exact top-k reached, by score (ties make ids ambiguous)."""
+    if not exact:
+        return 1.0
+    cutoff = exact[-1] - 1e-6
+    return min(len([s for s in found if s >= cutoff]), len(exact)) / len(exact)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", default="1,10,50,200", help="Project counts to test")
+    parser.add_argument("--per-project", type=int, default=50, help="Insights per project")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per project count")
+    parser.add_argument("-k", type=int, default=5, help="Neighbours per query")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep", action="store_true", help="Keep bench nodes afterwards")
+    args = parser.parse_args()
+
+    client = getClient()
+    client.ensureVectorIndexes(len(getEmbeddings(["dims"])[0]))
+    rng = random.Random(args.seed)
+    run = uuid.uuid4().hex[:6]
+    vectors: dict[str, np.ndarray] = {}
+
+    print(f"{'projects':>8} {'nodes':>7} {'method':>7} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    try:
+        for target in sorted(int(n) for n in args.projects.split(",")):
+            while len(vectors) < target:
+                project = f"bench-{run}-{len(vectors)}"
+                vectors[project] = addProject(client, project, args.per_project, rng)
+            # Let the index catch up with the writes before timing
+            time.sleep(1.0)
+            client._vector_counts.clear()
+
+            stats = {"global": ([], []), "scoped": ([], [])}
+            with client.driver.session() as session:
+                for _ in range(args.queries):
+                    project = rng.choice(list(vectors))
+                    [embedding] = getEmbeddings([randomText(rng)])
+                    exact = exactScores(vectors[project], embedding, args.k)
+                    for method, search in (
+                        ("global", lambda: globalSearch(session, embedding, project, args.k)),
+                        ("scoped", lambda: scopedSearch(client, embedding, project, args.k)),
+                    ):
+                        start = time.perf_counter()
+                        found = search()
+                        stats[method][1].append((time.perf_counter() - start) * 1000)
+                        stats[method][0].append(recall(found, exact))
+
+            nodes = target * args.per_project
+            for method, (recalls, latencies) in stats.items():
+                print(
+                    f"{target:>8} {nodes:>7} {method:>7} {statistics.mean(recalls):>9.3f} "
+                    f"{percentile(latencies, 0.5):>8.1f} {percentile(latencies, 0.99):>8.1f}"
+                )
+    finally:
+        if not args.keep:
+            with client.driver.session() as session:
+                session.run(
+                    "MATCH (n:Insight) WHERE n.project STARTS WITH $prefix DETACH DELETE n",
+                    prefix=f"bench-{run}-",
+                ).consume()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
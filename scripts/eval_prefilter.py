@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""Evaluate the detection pre-filter over labeled exchanges.
+
+Reads JSONL samples ({"user_message", "claude_response", "memorable"}),
+scores them with the pre-filter and prints, per threshold, the recall of
+memorable exchanges, the share of trivial ones still sent to the LLM and
+the resulting cut in LLM calls at --base-rate (the share of real turns
+that hold something to detect; the samples are deliberately balanced).
+The bundled samples are the ones the default weights were tuned on, so
+pass --samples with held-out labeled transcripts for a real recall figure.
+
+With --train, fits the linear model on a random split of the samples,
+reports on the held-out rest and writes the weights for
+CCMEMORY_PREFILTER_MODEL. Needs no Neo4j or LLM provider.
+
+    python scripts/eval_prefilter.py --thresholds 0.1,0.25,0.5
+    python scripts/eval_prefilter.py --train instance/prefilter.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'mcp-server', 'src'))
+
+from ccmemory.detection.prefilter import (
+    SUGGESTED_THRESHOLD,
+    evaluatePrefilter,
+    getPrefilterModel,
+    trainPrefilter,
+)
+
+SAMPLES = os.path.join(os.path.dirname(__file__), "prefilter_samples.jsonl")
+
+
+def loadSamples(path: str) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def report(samples: list[dict], thresholds: list[float], model: dict, base_rate: float):
+    print(f"{'threshold':>9} {'recall':>7} {'precision':>9} {'trivial':>8} {'missed':>6} {'calls cut':>9}")
+    for row in evaluatePrefilter(samples, thresholds, model):
+        sent = base_rate * row["recall"] + (1 - base_rate) * row["trivial_passed"]
+        cut = f"{1 / sent:.1f}x" if sent else "all"
+        print(
+            f"{row['threshold']:>9.2f} {row['recall']:>7.3f} {row['precision']:>9.3f} "
+            f"{row['trivial_passed']:>8.3f} {row['missed']:>6} {cut:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", default=SAMPLES, help="Labeled JSONL samples")
+    parser.add_argument(
+        "--thresholds",
+        default=f"0.1,0.2,{SUGGESTED_THRESHOLD},0.4,0.5",
+        help="Thresholds to report",
+    )
+    parser.add_argument("--base-rate", type=float, default=0.1, help="Share of real turns that are memorable")
+    parser.add_argument("--train", metavar="OUT", help="Fit weights and write them to OUT")
+    parser.add_argument("--holdout", type=float, default=0.3, help="Share of samples held out when training")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    samples = loadSamples(args.samples)
+    thresholds = sorted({float(t) for t in args.thresholds.split(",")})
+    model = getPrefilterModel()
+    if args.train:
+        random.Random(args.seed).shuffle(samples)
+        split = int(len(samples) * (1 - args.holdout))
+        samples, held_out = samples[:split], samples[split:]
+        print(f"Current weights on {len(held_out)} held-out samples:")
+        report(held_out, thresholds, model, args.base_rate)
+        model = trainPrefilter(samples)
+        print(f"\nTrained on {len(samples)} samples, held-out:")
+        report(held_out, thresholds, model, args.base_rate)
+        with open(args.train, "w") as f:
+            json.dump(model, f, indent=2)
+        print(f"\nWrote {args.train}")
+        return
+
+    memorable = sum(s["memorable"] for s in samples)
+    print(f"{len(samples)} samples, {memorable} memorable")
+    report(samples, thresholds, model, args.base_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,15 +8,18 @@ from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'mcp-server', 'src'))
 
+# Deterministic in-process embeddings, so seeding needs no Ollama
+os.environ.setdefault("CCMEMORY_EMBED_BACKEND", "hash")
+
 from ccmemory.graph import getClient
-from ccmemory.embeddings import EMBEDDING_DIMS
+from ccmemory.embeddings import getEmbedding
 
 PROJECT = "ccmemory"
 
 
-def zero_embedding():
-    """Return zero embedding for testing without Ollama."""
-    return [0.0] * EMBEDDING_DIMS
+def embed(*parts):
+    """Embed the record's text with the configured backend."""
+    return getEmbedding(" ".join(p for p in parts if p))
 
 
 def seed():
@@ -85,7 +88,7 @@ def seed():
             decision_id=str(uuid.uuid4()),
             session_id=d["session_id"],
             description=d["description"],
-            embedding=zero_embedding(),
+            embedding=embed(d["description"], d.get("rationale")),
             rationale=d.get("rationale"),
             options_considered=d.get("options_considered"),
             revisit_trigger=d.get("revisit_trigger"),
@@ -125,7 +128,7 @@ def seed():
             session_id=c["session_id"],
             wrong_belief=c["wrong_belief"],
             right_belief=c["right_belief"],
-            embedding=zero_embedding(),
+            embedding=embed(c["wrong_belief"], c["right_belief"]),
             severity=c.get("severity", "medium"),
             topic=c.get("topic"),
         )
@@ -159,7 +162,7 @@ def seed():
             session_id=i["session_id"],
             category=i.get("topic", "general"),
             summary=i["summary"],
-            embedding=zero_embedding(),
+            embedding=embed(i["summary"]),
             details=i.get("details"),
         )
         print(f"Created insight: {i['summary'][:50]}...")
@@ -209,7 +212,7 @@ def seed():
             session_id=e["session_id"],
             rule_broken=e["rule"],
             justification=e["exception"] + ": " + e.get("rationale", ""),
-            embedding=zero_embedding(),
+            embedding=embed(e["rule"], e["exception"]),
         )
         print(f"Created exception: {e['exception'][:40]}...")
 
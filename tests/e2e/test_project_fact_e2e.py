@@ -5,8 +5,8 @@ import uuid
 import pytest
 from datetime import datetime
 
-from ccmemory.graph import GraphClient
-from ccmemory.hooks import handleSessionStart, handleMessageResponse
+from ccmemory.graph import GraphClient, closeAsyncClient
+from ccmemory.hooks import flushBackground, handleSessionStart, handleMessageResponse
 from ccmemory.embeddings import getEmbedding
 
 
@@ -21,18 +21,26 @@ def client():
     client.close()
 
 
+@pytest.fixture(autouse=True)
+async def async_client():
+    # handleSessionStart uses the shared AsyncGraphClient, bound to this loop
+    yield
+    await flushBackground()
+    await closeAsyncClient()
+
+
 @pytest.fixture
 def test_project():
     return f"e2e-project-{uuid.uuid4().hex[:8]}"
 
 
 @pytest.mark.e2e
-def test_project_fact_full_flow(client, test_project, tmp_path):
+async def test_project_fact_full_flow(client, test_project, tmp_path):
     session_id_1 = f"e2e-session-{uuid.uuid4().hex[:8]}"
     cwd = f"/fake/path/{test_project}"
 
     # Step 1: Start first session
-    result1 = handleSessionStart(session_id_1, cwd)
+    result1 = await handleSessionStart(session_id_1, cwd)
     assert result1["project"] == test_project
     assert "No prior context" in result1["context"]
 
@@ -57,7 +65,7 @@ def test_project_fact_full_flow(client, test_project, tmp_path):
 
     # Step 4: Start a NEW session - fact should be surfaced
     session_id_2 = f"e2e-session-{uuid.uuid4().hex[:8]}"
-    result2 = handleSessionStart(session_id_2, cwd)
+    result2 = await handleSessionStart(session_id_2, cwd)
 
     assert "## Project Conventions" in result2["context"]
     assert "Uses pytest for testing" in result2["context"]
@@ -65,11 +73,11 @@ def test_project_fact_full_flow(client, test_project, tmp_path):
 
 
 @pytest.mark.e2e
-def test_project_fact_deduplication(client, test_project):
+async def test_project_fact_deduplication(client, test_project):
     session_id = f"e2e-session-{uuid.uuid4().hex[:8]}"
     cwd = f"/fake/path/{test_project}"
 
-    handleSessionStart(session_id, cwd)
+    await handleSessionStart(session_id, cwd)
 
     # Create first fact
     fact1_id = f"projectfact-{uuid.uuid4().hex[:8]}"
@@ -304,3 +304,218 @@ def test_metrics_include_project_facts(client, test_project, test_session_id):
 
     metrics = client.getAllMetrics(test_project)
     assert "total_project_facts" in metrics
+
+
+@pytest.mark.integration
+def test_create_decision_dedups_and_links_in_one_statement(client, test_project):
+    """Test one ANN lookup drives dedup, CONTINUES and CITES."""
+    from ccmemory.hashembed import hashEmbedding
+    from ccmemory.embeddings import EMBEDDING_DIMS
+
+    def embed(text):
+        return hashEmbedding(text, EMBEDDING_DIMS)
+
+    first = f"decision-{uuid.uuid4().hex[:8]}"
+    text = "Cache embeddings in SQLite keyed by model and text hash"
+    assert client.createDecision(
+        decision_id=first, project=test_project, description=text,
+        embedding=embed(text), trace_id="trace-1",
+    ) == {"action": "created"}
+
+    dup = client.createDecision(
+        decision_id=f"decision-{uuid.uuid4().hex[:8]}", project=test_project,
+        description=text, embedding=embed(text),
+    )
+    assert dup["action"] == "skipped"
+    assert dup["existing_id"] == first
+
+    second = f"decision-{uuid.uuid4().hex[:8]}"
+    follow_up = "Cache embeddings in SQLite keyed by model and text hash with LRU eviction"
+    result = client.createDecision(
+        decision_id=second, project=test_project, description=follow_up,
+        embedding=embed(follow_up), continues_decision=text,
+    )
+    assert result["action"] == "created"
+    assert result["continues_id"] == first
+    assert result["cited_ids"] == [first]
+
+    with client.driver.session() as session:
+        record = session.run(
+            "MATCH (d:Decision {id: $id}) RETURN d.trace_id as trace_id", id=second
+        ).single()
+        assert record["trace_id"] == "trace-1"
+
+
+@pytest.mark.integration
+def test_project_scoped_search_sees_past_other_projects(client, test_project):
+    """Test in-project matches are found when other projects crowd the index."""
+    from ccmemory.hashembed import hashEmbedding
+    from ccmemory.embeddings import EMBEDDING_DIMS
+
+    text = "Retry failed webhook deliveries with exponential backoff"
+    embedding = hashEmbedding(text, EMBEDDING_DIMS)
+    crowd = f"{test_project}-crowd"
+    for i in range(20):
+        client.createInsight(
+            insight_id=f"insight-{uuid.uuid4().hex[:8]}", project=f"{crowd}-{i}",
+            category="pattern", summary=text, embedding=embedding,
+        )
+    client.createInsight(
+        insight_id=f"insight-{uuid.uuid4().hex[:8]}", project=test_project,
+        category="pattern", summary=text, embedding=embedding,
+    )
+
+    results = client.searchSemantic(embedding, test_project, limit=1, include_team=False)
+    assert [node["project"] for node, _ in results["insights"]] == [test_project]
+    assert client._isDuplicate("insight_embedding", test_project, embedding) is not None
+
+    with client.driver.session() as session:
+        session.run("MATCH (i:Insight) WHERE i.project STARTS WITH $crowd DETACH DELETE i", crowd=crowd)
+
+
+@pytest.mark.integration
+def test_search_precedent_groups_one_query_by_category(client, test_project):
+    """Test the multi-label full-text search keeps per-category grouping."""
+    from ccmemory.graph import PRECEDENT_CATEGORIES
+
+    word = f"zebra{uuid.uuid4().hex[:6]}"
+    client.createDecision(
+        decision_id=f"decision-{uuid.uuid4().hex[:8]}", project=test_project,
+        description=f"Adopt {word} for queueing", embedding=[],
+    )
+    client.createCorrection(
+        correction_id=f"correction-{uuid.uuid4().hex[:8]}", project=test_project,
+        wrong_belief=f"{word} is synchronous", right_belief=f"{word} is async",
+        embedding=[],
+    )
+
+    results = client.searchPrecedent(word, test_project, include_team=False)
+    assert set(results) == set(PRECEDENT_CATEGORIES.values())
+    assert len(results["decisions"]) == 1
+    assert len(results["corrections"]) == 1
+    assert results["insights"] == []
+
+
+@pytest.fixture
+async def async_client():
+    """Create an async graph client for testing."""
+    from ccmemory.graph import AsyncGraphClient
+
+    os.environ.setdefault("CCMEMORY_NEO4J_URI", "bolt://localhost:7687")
+    os.environ.setdefault("CCMEMORY_NEO4J_PASSWORD", "ccmemory")
+    os.environ.setdefault("CCMEMORY_USER_ID", "test@example.com")
+
+    client = AsyncGraphClient()
+    yield client
+    await client.close()
+
+
+@pytest.mark.integration
+async def test_async_client_matches_sync(client, async_client, test_project):
+    """Test AsyncGraphClient writes and reads the same nodes as GraphClient."""
+    from ccmemory.embeddings import EMBEDDING_DIMS
+    from ccmemory.hashembed import hashEmbedding
+
+    embedding = hashEmbedding("Pool Neo4j connections per process", EMBEDDING_DIMS)
+    result = await async_client.createDecision(
+        decision_id=f"decision-{uuid.uuid4().hex[:8]}", project=test_project,
+        description="Pool Neo4j connections per process", embedding=embedding,
+    )
+    assert result["action"] == "created"
+
+    duplicate = await async_client.createDecision(
+        decision_id=f"decision-{uuid.uuid4().hex[:8]}", project=test_project,
+        description="Pool Neo4j connections per process", embedding=embedding,
+    )
+    assert duplicate["action"] == "skipped"
+
+    recent = await async_client.queryRecent(test_project, include_team=False)
+    assert recent == client.queryRecent(test_project, include_team=False)
+    semantic = await async_client.searchSemantic(embedding, test_project, limit=1)
+    assert semantic["decisions"][0][0]["description"] == "Pool Neo4j connections per process"
+    assert await async_client.getAllMetrics(test_project) == client.getAllMetrics(test_project)
+
+
+@pytest.mark.integration
+def test_project_stats_counters_match_recount(client, test_project, monkeypatch):
+    """Test incremental ProjectStats counters agree with a full recount."""
+    from ccmemory import graph
+    from ccmemory.embeddings import EMBEDDING_DIMS
+    from ccmemory.hashembed import hashEmbedding
+
+    monkeypatch.setattr(graph, "PROJECT_STATS", True)
+    assert client.projectStats(test_project)["decisions"] == 0
+
+    for text in ("Use Neo4j for the graph", "Use Neo4j for the graph with APOC"):
+        client.createDecision(
+            decision_id=f"decision-{uuid.uuid4().hex[:8]}", project=test_project,
+            description=text, embedding=hashEmbedding(text, EMBEDDING_DIMS),
+        )
+    client.createInsight(
+        insight_id=f"insight-{uuid.uuid4().hex[:8]}", project=test_project,
+        category="pattern", summary="Graphs beat tables for precedent",
+        embedding=hashEmbedding("Graphs beat tables", EMBEDDING_DIMS),
+    )
+    client.promoteDecisions(test_project)
+
+    stats = client.projectStats(test_project)
+    assert stats == client.projectStats(test_project, refresh=True)
+    assert stats["decisions"] == 2
+    assert stats["curated"] == 2
+    assert stats["insights"] == 1
+
+
+@pytest.mark.integration
+def test_writes_link_nodes_to_project(client, test_project):
+    """Test created nodes hang off one indexed :Project node."""
+    from ccmemory.embeddings import EMBEDDING_DIMS
+    from ccmemory.hashembed import hashEmbedding
+
+    for text in ("Index the project registry", "Record telemetry per project"):
+        client.createDecision(
+            decision_id=f"decision-{uuid.uuid4().hex[:8]}", project=test_project,
+            description=text, embedding=hashEmbedding(text, EMBEDDING_DIMS),
+        )
+    client.recordTelemetry("test_event", test_project, {})
+
+    [record] = client._run(
+        """
+        MATCH (p:Project {name: $project})<-[:IN_PROJECT]-(n)
+        RETURN collect(labels(n)[0]) as labels
+        """,
+        project=test_project,
+    )
+    assert sorted(record["labels"]) == ["Decision", "Decision", "TelemetryEvent"]
+
+
+@pytest.mark.integration
+def test_migrate_project_links_once(client, test_project):
+    """Test nodes written before the registry are linked, then the run is marked."""
+    client._run("MATCH (m:Migration {name: 'project_links'}) DELETE m")
+    client._run(
+        "CREATE (:Insight {id: $id, project: $project, summary: 'Legacy node'})",
+        id=f"insight-{uuid.uuid4().hex[:8]}", project=test_project,
+    )
+
+    assert client.migrateProjectLinks() >= 1
+    [record] = client._run(
+        "MATCH (:Project {name: $project})<-[:IN_PROJECT]-(n:Insight) RETURN count(n) as n",
+        project=test_project,
+    )
+    assert record["n"] == 1
+    assert client.migrateProjectLinks() == 0
+
+
+@pytest.mark.integration
+def test_rewriting_a_node_id_is_skipped(client, test_project):
+    """Test a replayed write of an already stored id is skipped, not duplicated."""
+    from ccmemory.embeddings import EMBEDDING_DIMS
+    from ccmemory.hashembed import hashEmbedding
+
+    insight_id = f"insight-{uuid.uuid4().hex[:8]}"
+    for summary in ("Spool hook turns to disk", "Replay spooled turns on recovery"):
+        result = client.createInsight(
+            insight_id=insight_id, project=test_project, category="pattern",
+            summary=summary, embedding=hashEmbedding(summary, EMBEDDING_DIMS),
+        )
+    assert result == {"action": "skipped", "existing_id": insight_id, "similarity": 1.0}
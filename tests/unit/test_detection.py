@@ -119,3 +119,70 @@ def test_detection_project_fact():
     assert detection.type == DetectionType.ProjectFact
     assert isinstance(detection.data, ProjectFact)
     assert detection.data.fact == "Uses uv for Python"
+
+
+def prefilterSamples() -> list[dict]:
+    import json
+    import os
+
+    path = os.path.join(
+        os.path.dirname(__file__), "..", "..", "scripts", "prefilter_samples.jsonl"
+    )
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.mark.unit
+def test_prefilter_scores_trivial_exchanges_low():
+    from ccmemory.detection.prefilter import SUGGESTED_THRESHOLD, prefilterScore
+
+    for message in [
+        "sounds good, thanks!",
+        "run the tests",
+        'Traceback (most recent call last):\n  File "jobs.py", line 137\n'
+        "    raise RuntimeError\nRuntimeError: LLM timeout",
+    ]:
+        assert prefilterScore(message) < SUGGESTED_THRESHOLD
+    assert prefilterScore("We use pytest here, not unittest.") > 0.5
+
+
+@pytest.mark.unit
+def test_prefilter_recall_on_labeled_samples():
+    from ccmemory.detection.prefilter import (
+        SUGGESTED_THRESHOLD,
+        evaluatePrefilter,
+        trainPrefilter,
+    )
+
+    samples = prefilterSamples()
+    [row] = evaluatePrefilter(samples, [SUGGESTED_THRESHOLD])
+    assert row["recall"] == 1.0
+    assert row["trivial_passed"] < 0.2
+
+    model = trainPrefilter(samples)
+    assert model["weights"]["ack"] < 0 < model["weights"]["rule"]
+    [trained] = evaluatePrefilter(samples, [0.5], model)
+    assert trained["recall"] >= 0.95
+
+
+@pytest.mark.unit
+async def test_prefiltered_exchange_skips_llm(monkeypatch):
+    from ccmemory.detection import detector, prefilter
+
+    monkeypatch.setattr(prefilter, "PREFILTER_THRESHOLD", 0.25)
+
+    def unexpected():
+        raise AssertionError("LLM called for a trivial exchange")
+
+    monkeypatch.setattr(detector, "getLlmClient", unexpected)
+    detections = await detector.detectAll(
+        "ok, see https://example.com/docs", "I updated the docs link.", ""
+    )
+    assert [d.type for d in detections] == [DetectionType.Reference]
+
+
+@pytest.mark.unit
+def test_prefilter_is_off_by_default():
+    from ccmemory.detection.prefilter import passesPrefilter
+
+    assert passesPrefilter("ok")
@@ -16,3 +16,431 @@ def test_clear_cache():
     """Test cache clearing doesn't raise."""
     from ccmemory.embeddings import clearCache
     clearCache()
+
+
+class _FakeResponse:
+    def __init__(self, status_code, payload=None, text=""):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = text
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.mark.unit
+def test_get_embeddings_batches_and_preserves_order(monkeypatch):
+    """Test batch embedding splits into micro-batches and keeps input order."""
+    from ccmemory import embeddings
+
+    calls = []
+
+    def fakePost(url, json, timeout):
+        calls.append(json["input"])
+        return _FakeResponse(200, {"embeddings": [[float(len(t))] for t in json["input"]]})
+
+    embeddings.clearCache()
+    monkeypatch.setattr(embeddings, "getCache", lambda: None)
+    monkeypatch.setattr(embeddings, "_batch_supported", None)
+    monkeypatch.setattr(embeddings, "BATCH_SIZE", 2)
+    monkeypatch.setattr(embeddings.httpx, "post", fakePost)
+
+    result = embeddings.getEmbeddings(["a", "bbb", "cc", "a", "dddd"])
+    assert result == [[1.0], [3.0], [2.0], [1.0], [4.0]]
+    assert calls == [["a", "bbb"], ["cc", "dddd"]]
+    embeddings.clearCache()
+
+
+@pytest.mark.unit
+def test_get_embeddings_falls_back_to_legacy_endpoint(monkeypatch):
+    """Test per-item fallback when /api/embed is not available."""
+    from ccmemory import embeddings
+
+    urls = []
+
+    def fakePost(url, json, timeout):
+        urls.append(url.rsplit("/", 1)[-1])
+        if url.endswith("/api/embed"):
+            return _FakeResponse(404, text="404 page not found")
+        return _FakeResponse(200, {"embedding": [float(len(json["prompt"]))]})
+
+    embeddings.clearCache()
+    monkeypatch.setattr(embeddings, "getCache", lambda: None)
+    monkeypatch.setattr(embeddings, "_batch_supported", None)
+    monkeypatch.setattr(embeddings.httpx, "post", fakePost)
+
+    assert embeddings.getEmbeddings(["xy", "xyz"]) == [[2.0], [3.0]]
+    assert urls == ["embed", "embeddings", "embeddings"]
+    embeddings.clearCache()
+
+
+@pytest.mark.unit
+def test_disk_cache_roundtrip(tmp_path):
+    """Test vectors survive a reopen and hit/miss counters are tracked."""
+    from ccmemory.embedcache import EmbeddingCache, cacheKey
+
+    path = str(tmp_path / "embeddings.db")
+    key = cacheKey("all-minilm", "hello")
+    assert key != cacheKey("nomic-embed-text", "hello")
+
+    cache = EmbeddingCache(path, max_bytes=1024 * 1024)
+    assert cache.get(key) is None
+    cache.put(key, "all-minilm", [0.5, -1.0, 2.0])
+    cache.close()
+
+    cache = EmbeddingCache(path, max_bytes=1024 * 1024)
+    assert cache.get(key).tolist() == [0.5, -1.0, 2.0]
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["entries"] == 1
+    assert stats["bytes"] == 12
+    cache.close()
+
+
+@pytest.mark.unit
+def test_disk_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    """Test the size cap evicts the oldest entries first."""
+    from ccmemory import embedcache
+
+    monkeypatch.setattr(embedcache, "EVICT_CHECK_INTERVAL", 1)
+    monkeypatch.setattr(embedcache, "LRU_TOUCH_INTERVAL", 0)
+    cache = embedcache.EmbeddingCache(str(tmp_path / "e.db"), max_bytes=40)
+    for i in range(5):
+        cache.put(f"k{i}", "m", [float(i)] * 2)  # 8 bytes each
+    cache.get("k0")
+    cache.put("k5", "m", [5.0] * 2)
+
+    assert cache.stats()["bytes"] <= 40
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
+    cache.close()
+
+
+@pytest.mark.unit
+def test_disk_cache_hits_skip_recent_lru_touch(tmp_path):
+    """Test a hit on a recently used entry reads without writing."""
+    from ccmemory.embedcache import EmbeddingCache
+
+    cache = EmbeddingCache(str(tmp_path / "e.db"), max_bytes=1024)
+    cache.put("k0", "m", [1.0, 2.0])
+    writes = cache._conn.total_changes
+    for _ in range(10):
+        assert cache.get("k0") is not None
+    assert cache._conn.total_changes == writes
+    assert cache.stats()["hits"] == 10
+    cache.close()
+
+
+@pytest.mark.unit
+def test_default_disk_cache_path_ignores_cwd(tmp_path, monkeypatch):
+    """Test the CLI finds the server's cache from any project directory."""
+    import os
+
+    from ccmemory import embedcache
+
+    monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+    monkeypatch.chdir(tmp_path)
+    path = embedcache._defaultCachePath()
+    assert os.path.isabs(path)
+    assert path == os.path.expanduser("~/.cache/ccmemory/embeddings.db")
+    monkeypatch.chdir(tmp_path.parent)
+    assert embedcache._defaultCachePath() == path
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert embedcache._defaultCachePath() == str(tmp_path / "ccmemory" / "embeddings.db")
+
+
+@pytest.mark.unit
+def test_memory_cache_byte_budget():
+    """Test the in-process LRU stays within its byte budget and reports frees."""
+    from ccmemory.embedcache import MemoryCache
+
+    cache = MemoryCache(max_bytes=3 * 768 * 4)
+    for i in range(3):
+        cache.put(f"k{i}", [float(i)] * 768)
+    assert cache.bytes == 3 * 768 * 4
+    cache.get("k0")
+    cache.put("k3", [3.0] * 768)
+
+    assert len(cache) == 3
+    assert "k1" not in cache
+    assert cache.get("k0").dtype.name == "float32"
+    assert cache.clear() == 3 * 768 * 4
+    assert cache.bytes == 0
+
+
+@pytest.mark.unit
+async def test_get_embeddings_async_uses_pooled_client(monkeypatch):
+    """Test the async path batches through the shared client without blocking."""
+    import asyncio
+    import json
+
+    import httpx
+
+    from ccmemory import embeddings
+
+    requests = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append(body["input"])
+        return httpx.Response(200, json={"embeddings": [[1.0] for _ in body["input"]]})
+
+    embeddings.clearCache()
+    monkeypatch.setattr(embeddings, "getCache", lambda: None)
+    monkeypatch.setattr(embeddings, "_batch_supported", None)
+    monkeypatch.setattr(
+        embeddings,
+        "_async_client",
+        httpx.AsyncClient(base_url="http://ollama", transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(embeddings, "_async_semaphore", asyncio.Semaphore(2))
+    monkeypatch.setattr(embeddings, "_async_loop", asyncio.get_running_loop())
+
+    result = await embeddings.getEmbeddingsAsync(["one", "two", "one"])
+    assert result == [[1.0], [1.0], [1.0]]
+    assert requests == [["one", "two"]]
+    assert await embeddings.getEmbeddingAsync("two") == [1.0]
+    assert len(requests) == 1
+
+    await embeddings.closeAsyncClient()
+    embeddings.clearCache()
+
+
+@pytest.mark.unit
+async def test_concurrent_identical_requests_are_coalesced(monkeypatch):
+    """Test concurrent callers for the same text share one Ollama request."""
+    import asyncio
+    import json
+
+    import httpx
+
+    from ccmemory import embeddings
+
+    requests = []
+
+    async def handler(request):
+        requests.append(json.loads(request.content)["input"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"embeddings": [[2.0]]})
+
+    embeddings.clearCache()
+    monkeypatch.setattr(embeddings, "getCache", lambda: None)
+    monkeypatch.setattr(embeddings, "_batch_supported", None)
+    monkeypatch.setattr(embeddings, "_coalesced", 0)
+    monkeypatch.setattr(
+        embeddings,
+        "_async_client",
+        httpx.AsyncClient(base_url="http://ollama", transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(embeddings, "_async_semaphore", asyncio.Semaphore(4))
+    monkeypatch.setattr(embeddings, "_async_loop", asyncio.get_running_loop())
+
+    results = await asyncio.gather(
+        *(embeddings.getEmbeddingAsync("same query") for _ in range(3))
+    )
+    assert results == [[2.0], [2.0], [2.0]]
+    assert requests == [["same query"]]
+    assert embeddings.getCacheStats()["coalesced"] == 2
+    assert embeddings.getCacheStats()["inflight"] == 0
+
+    await embeddings.closeAsyncClient()
+    embeddings.clearCache()
+
+
+@pytest.mark.unit
+async def test_cancelled_owner_does_not_cancel_coalesced_callers(monkeypatch):
+    """Test a caller waiting on a cancelled request's text fetches it itself."""
+    import asyncio
+    import json
+
+    import httpx
+
+    from ccmemory import embeddings
+
+    requests = []
+
+    async def handler(request):
+        requests.append(json.loads(request.content)["input"])
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"embeddings": [[3.0]]})
+
+    embeddings.clearCache()
+    monkeypatch.setattr(embeddings, "getCache", lambda: None)
+    monkeypatch.setattr(embeddings, "_batch_supported", None)
+    monkeypatch.setattr(
+        embeddings,
+        "_async_client",
+        httpx.AsyncClient(base_url="http://ollama", transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(embeddings, "_async_semaphore", asyncio.Semaphore(4))
+    monkeypatch.setattr(embeddings, "_async_loop", asyncio.get_running_loop())
+
+    owner = asyncio.create_task(embeddings.getEmbeddingAsync("shared text"))
+    await asyncio.sleep(0.01)
+    waiter = asyncio.create_task(embeddings.getEmbeddingAsync("shared text"))
+    await asyncio.sleep(0.01)
+    owner.cancel()
+
+    assert await waiter == [3.0]
+    assert owner.cancelled()
+    assert len(requests) == 2
+    assert embeddings.getCacheStats()["inflight"] == 0
+
+    await embeddings.closeAsyncClient()
+    embeddings.clearCache()
+
+
+@pytest.mark.unit
+async def test_async_disk_cache_io_runs_off_the_event_loop(monkeypatch, tmp_path):
+    """Test the async path reads and writes the disk cache in one batch each, in a thread."""
+    import asyncio
+    import json
+    import threading
+
+    import httpx
+
+    from ccmemory import embeddings
+    from ccmemory.embedcache import EmbeddingCache, cacheKey
+
+    calls = []
+
+    class RecordingCache(EmbeddingCache):
+        def getMany(self, keys):
+            calls.append(("get", len(keys), threading.get_ident()))
+            return super().getMany(keys)
+
+        def putMany(self, model, items):
+            items = list(items)
+            calls.append(("put", len(items), threading.get_ident()))
+            super().putMany(model, items)
+
+    def handler(request):
+        return httpx.Response(
+            200, json={"embeddings": [[4.0] for _ in json.loads(request.content)["input"]]}
+        )
+
+    disk = RecordingCache(str(tmp_path / "e.db"), max_bytes=1024 * 1024)
+    disk.put(cacheKey(embeddings.EMBEDDING_MODEL, "stored"), "m", [5.0])
+    calls.clear()
+    embeddings.clearCache()
+    monkeypatch.setattr(embeddings, "getCache", lambda: disk)
+    monkeypatch.setattr(embeddings, "_batch_supported", None)
+    monkeypatch.setattr(
+        embeddings,
+        "_async_client",
+        httpx.AsyncClient(base_url="http://ollama", transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(embeddings, "_async_semaphore", asyncio.Semaphore(4))
+    monkeypatch.setattr(embeddings, "_async_loop", asyncio.get_running_loop())
+
+    result = await embeddings.getEmbeddingsAsync(["stored", "new one", "new two"])
+    assert result == [[5.0], [4.0], [4.0]]
+    loop_thread = threading.get_ident()
+    assert [(op, n) for op, n, _ in calls] == [("get", 3), ("put", 2)]
+    assert all(thread != loop_thread for _, _, thread in calls)
+    assert disk.stats()["entries"] == 3
+
+    await embeddings.closeAsyncClient()
+    embeddings.clearCache()
+    disk.close()
+
+
+@pytest.mark.unit
+def test_node_embedding_text_and_meta():
+    from ccmemory.embeddings import EMBEDDING_MODEL, embeddingMeta, nodeEmbeddingText
+
+    assert (
+        nodeEmbeddingText("Decision", {"description": "Use Neo4j", "rationale": None})
+        == "Use Neo4j"
+    )
+    assert nodeEmbeddingText("Chunk", {"section": "Intro", "content": "x" * 600}) == (
+        "Intro: " + "x" * 500
+    )
+    assert nodeEmbeddingText("Insight", {}) == ""
+    assert embeddingMeta([0.1, 0.2]) == {
+        "embedding_model": EMBEDDING_MODEL,
+        "embedding_dims": 2,
+    }
+    assert embeddingMeta([]) == {}
+
+
+@pytest.mark.unit
+def test_long_text_is_chunked_and_mean_pooled(monkeypatch):
+    """Test texts over the model context are embedded in pieces, not clipped."""
+    from ccmemory import embeddings
+
+    def fakePost(url, json, timeout):
+        return _FakeResponse(
+            200, {"embeddings": [[1.0, 0.0] if "alpha" in t else [0.0, 1.0] for t in json["input"]]}
+        )
+
+    embeddings.clearCache()
+    monkeypatch.setattr(embeddings, "getCache", lambda: None)
+    monkeypatch.setattr(embeddings, "_batch_supported", None)
+    monkeypatch.setattr(embeddings, "MAX_TOKENS", 4)
+    monkeypatch.setattr(embeddings.httpx, "post", fakePost)
+
+    text = "alpha alpha alpha alpha beta beta beta beta"
+    assert embeddings.chunkText(text) == ["alpha alpha alpha alpha", "beta beta beta beta"]
+    [pooled, short] = embeddings.getEmbeddings([text, "beta"])
+    assert pooled == pytest.approx([2**-0.5, 2**-0.5])
+    assert short == [0.0, 1.0]
+    embeddings.clearCache()
+
+
+@pytest.mark.unit
+def test_detection_embedding_text_uses_semantic_fields():
+    """Test detections embed their content fields, not the JSON dump."""
+    from ccmemory.detection.schemas import Correction, Detection, DetectionType
+    from ccmemory.hooks import detectionEmbeddingText
+
+    detection = Detection(
+        type=DetectionType.Correction,
+        confidence=0.9,
+        data=Correction(confidence=0.9, wrongBelief="uses MySQL", rightBelief="uses Postgres"),
+    )
+    assert detectionEmbeddingText(detection) == "uses MySQL uses Postgres"
+
+
+@pytest.mark.unit
+def test_hash_backend_is_deterministic_and_similarity_preserving(monkeypatch):
+    """Test the offline backend gives stable unit vectors that track overlap."""
+    import numpy as np
+
+    from ccmemory import embeddings
+    from ccmemory.hashembed import HashBackend, hashEmbedding
+
+    monkeypatch.setattr(embeddings, "_backend", HashBackend(384))
+    monkeypatch.setattr(embeddings, "getCache", lambda: None)
+
+    a, b, c = embeddings.getEmbeddings(
+        ["Use uv for package management", "Uses uv as package manager", "Deploy with Docker"]
+    )
+    assert a == hashEmbedding("Use uv for package management", 384)
+    assert len(a) == 384
+    assert np.linalg.norm(a) == pytest.approx(1.0, abs=1e-5)
+    assert np.dot(a, b) > np.dot(a, c)
+    assert len(embeddings._embedding_cache) == 0
+
+
+@pytest.mark.unit
+def test_quantized_embedding_preserves_similarity():
+    """Test the 8-bit copy scores close to full precision."""
+    import numpy as np
+
+    from ccmemory.embeddings import dequantizeEmbedding, quantizeEmbedding, similarity
+
+    rng = np.random.default_rng(0)
+    a = rng.normal(size=384).tolist()
+    b = (np.asarray(a) + rng.normal(scale=0.5, size=384)).tolist()
+
+    qa, qb = quantizeEmbedding(a), quantizeEmbedding(b)
+    assert len(qa) == 384
+    assert all(1 <= code <= 255 for code in qa)
+    expected = similarity(a, b)
+    assert similarity(dequantizeEmbedding(qa), dequantizeEmbedding(qb)) == pytest.approx(expected, abs=0.01)
+    assert similarity(dequantizeEmbedding(qa), b) == pytest.approx(expected, abs=0.01)
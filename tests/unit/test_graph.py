@@ -0,0 +1,222 @@
+"""Unit tests for graph client helpers that need no database."""
+
+import pytest
+
+
+@pytest.mark.unit
+def test_fetch_size_scales_with_project_share():
+    """Test the ANN fetch grows as the project's share of the index shrinks."""
+    from ccmemory.graph import VECTOR_MAX_FETCH, VECTOR_OVERFETCH, fetchSize
+
+    assert fetchSize(5, 5, 12) == 12  # Capped at the index size
+    assert fetchSize(5, 1000, 1000) == int(5 * VECTOR_OVERFETCH)
+    assert fetchSize(5, 100, 10000) == int(5 * 100 * VECTOR_OVERFETCH)
+    assert fetchSize(5, 1, 10**6) == VECTOR_MAX_FETCH
+
+
+@pytest.mark.unit
+def test_fetch_size_for_empty_project():
+    """Test a project with no nodes yet just asks for k."""
+    from ccmemory.graph import fetchSize
+
+    assert fetchSize(3, 0, 500) == 3
+    assert fetchSize(3, 0, 0) == 3
+
+
+@pytest.mark.unit
+def test_node_projection_leaves_out_vectors():
+    """Test read projections null the vector fields and nodeProps drops them."""
+    from ccmemory.graph import nodeProjection, nodeProps
+
+    assert nodeProjection("d") == "d {.*, embedding: null, embedding_q: null}"
+    assert nodeProjection("d", include_vectors=True) == "d {.*}"
+    projected = {"id": "d-1", "description": "x", "embedding": None, "embedding_q": None}
+    assert nodeProps(projected) == {"id": "d-1", "description": "x"}
+    assert nodeProps({"id": "d-1", "embedding": [0.1]}) == {"id": "d-1", "embedding": [0.1]}
+
+
+@pytest.mark.unit
+def test_stats_deltas_count_created_nodes_and_links():
+    """Test incremental deltas skip duplicates and count cited precedents."""
+    from ccmemory.graph import _statsDeltas
+
+    nodes = {
+        "Decision": [{"id": "d-1"}, {"id": "d-2"}],
+        "Insight": [{"id": "i-1"}],
+    }
+    results = {
+        "d-1": {"action": "created", "cited_ids": ["d-0", "d-00"]},
+        "d-2": {"action": "skipped", "existing_id": "d-0", "similarity": 0.99},
+        "i-1": {"action": "created"},
+    }
+    deltas = _statsDeltas(nodes, results, edges=4, supersessions=1)
+    assert deltas["decisions"] == 1
+    assert deltas["insights"] == 1
+    assert deltas["precedent_links"] == 3
+    assert deltas["supersessions"] == 1
+    assert deltas["edges"] == 4
+    assert deltas["corrections"] == 0
+
+
+@pytest.mark.unit
+def test_project_metrics_from_stats():
+    """Test metrics derive from counters, including an empty project."""
+    from ccmemory.graph import STATS_KEYS, projectMetrics
+
+    stats = dict.fromkeys(STATS_KEYS, 0)
+    assert projectMetrics(stats)["cognitive_coefficient"] == 1.0
+    assert projectMetrics(stats)["graph_density"] == 0.0
+
+    stats.update(decisions=10, curated=5, precedent_links=4, insights=5, edges=6)
+    metrics = projectMetrics(stats)
+    assert metrics["decision_reuse_rate"] == 0.4
+    assert metrics["graph_density"] == 0.4
+    assert metrics["cognitive_coefficient"] == 1.0 + 5 * 0.02 + 0.4
+    assert metrics["total_decisions"] == 10
+    assert "total_references" not in metrics
+
+
+@pytest.mark.unit
+def test_in_batch_duplicates_dropped_by_codes():
+    """Test _dedupRows compares rows by their 8-bit codes."""
+    from ccmemory.graph import _dedupRows, nodeRow
+
+    rows = [
+        nodeRow("i-1", [1.0, 0.0, 0.0], summary="a"),
+        nodeRow("i-2", [0.99, 0.05, 0.0], summary="a again"),
+        nodeRow("i-3", [0.0, 1.0, 0.0], summary="b"),
+        nodeRow("i-4", None, summary="no embedding"),
+    ]
+    kept = _dedupRows("Insight", rows)
+    assert [row["id"] for row in kept] == ["i-1", "i-3", "i-4"]
+    assert _dedupRows("Reference", rows) == rows
+
+
+@pytest.mark.unit
+def test_distinct_hits_drop_near_duplicates_across_categories():
+    """Test searchSemantic(distinct=True) keeps the better of two near-duplicates."""
+    from ccmemory.embeddings import quantizeEmbedding
+    from ccmemory.graph import _distinctHits
+
+    def hit(node_id, vector, score):
+        return ({"id": node_id, "embedding_q": quantizeEmbedding(vector)}, score)
+
+    results = {
+        "decisions": [hit("d-1", [1.0, 0.0, 0.0], 0.9), hit("d-2", [0.0, 1.0, 0.0], 0.7)],
+        "insights": [hit("i-1", [0.99, 0.05, 0.0], 0.95), ({"id": "i-2"}, 0.6)],
+    }
+    distinct = _distinctHits(results, 3, include_vectors=False)
+    assert [props["id"] for props, _ in distinct["decisions"]] == ["d-2"]
+    assert [props["id"] for props, _ in distinct["insights"]] == ["i-1", "i-2"]
+    assert "embedding_q" not in distinct["insights"][0][0]
+
+
+@pytest.mark.unit
+def test_cli_writes_invalidate_server_context(monkeypatch):
+    from ccmemory import contextcache, graph
+
+    monkeypatch.setattr(contextcache, "_cache", contextcache.ContextCache())
+    sent = []
+    monkeypatch.setattr(graph, "invalidateServer", sent.append)
+
+    client = graph.GraphClient()  # The driver connects lazily
+    client.invalidateContext("proj")  # As storeBatch and promoteDecisions do
+    assert contextcache.getContextCache().version("proj") == 1
+    assert sent == []
+    client.close()
+    assert sent == ["proj"]
+
+
+class FakeResult:
+    def __init__(self, records):
+        self.records = records
+
+    def __iter__(self):
+        return iter(self.records)
+
+    async def __aiter__(self):
+        for record in self.records:
+            yield record
+
+
+class FakeSession:
+    """Replays canned records for each query run, logging the queries."""
+
+    def __init__(self, replies, queries):
+        self.replies = replies
+        self.queries = queries
+
+    def run(self, query, **params):
+        self.queries.append(query)
+        return FakeResult(self.replies.pop(0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakeAsyncSession(FakeSession):
+    async def run(self, query, **params):
+        return super().run(query, **params)
+
+
+@pytest.mark.unit
+async def test_sync_and_async_clients_run_the_same_steps():
+    from types import SimpleNamespace
+
+    from ccmemory import graph
+
+    def replies():
+        linked = [[{"linked": 1}] for _ in graph.PROJECT_LABELS]
+        return [[{"done": False}], *linked, []]
+
+    sync_queries, async_queries = [], []
+    client = graph.GraphClient()
+    session = FakeSession(replies(), sync_queries)
+    client.driver = SimpleNamespace(session=lambda: session)
+    async_client = graph.AsyncGraphClient()
+    async_session = FakeAsyncSession(replies(), async_queries)
+    async_client.driver = SimpleNamespace(session=lambda: async_session)
+
+    total = len(graph.PROJECT_LABELS)
+    assert client.migrateProjectLinks() == total
+    assert await async_client.migrateProjectLinks() == total
+    assert sync_queries == async_queries
+    assert len(sync_queries) == total + 2
+
+
+@pytest.mark.unit
+def test_reembed_aborts_when_model_dims_differ(monkeypatch):
+    """Test reembed stops before writing vectors its stale query would re-find."""
+    from click.testing import CliRunner
+
+    from ccmemory import cli, embeddings, graph
+
+    calls = []
+
+    class Client:
+        def countStaleEmbeddings(self, model, dims):
+            return {"Decision": 2}
+
+        def ensureVectorIndexes(self, dims, recreate=False):
+            calls.append("ensureVectorIndexes")
+
+        def close(self):
+            calls.append("close")
+
+    monkeypatch.setattr(graph, "getClient", Client)
+    monkeypatch.setattr(
+        embeddings, "getEmbeddings", lambda texts: [[0.1] * 3 for _ in texts]
+    )
+    result = CliRunner().invoke(cli.main, ["reembed"])
+    assert result.exit_code == 1
+    assert "returns 3-dim vectors" in result.output
+    assert calls == ["close"]
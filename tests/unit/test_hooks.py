@@ -0,0 +1,257 @@
+"""Unit tests for hook handlers against an in-memory graph client."""
+
+import asyncio
+
+import pytest
+
+
+class FakeClient:
+    """Answers the session-start reads after a delay and records writes."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.reads = 0
+        self.retrievals = []
+
+    async def _read(self, result):
+        self.in_flight += 1
+        self.reads += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return result
+
+    async def queryProjectFacts(self, project, limit):
+        return await self._read([{"id": "pf-1", "category": "tool", "fact": "Uses uv"}])
+
+    async def queryRecent(self, project, limit):
+        return await self._read([])
+
+    async def queryStaleDecisions(self, project, days):
+        return await self._read([])
+
+    async def queryFailedApproaches(self, project, limit):
+        return await self._read([])
+
+    async def recordRetrieval(self, project, retrieved_ids, context_summary):
+        await asyncio.sleep(self.delay)
+        self.retrievals.append(retrieved_ids)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from ccmemory import contextcache, hooks, jobs, spool
+    from ccmemory.timings import resetTimings
+    from ccmemory.transcript import resetTranscripts
+
+    client = FakeClient()
+    monkeypatch.setattr(hooks, "getAsyncClient", lambda: client)
+    monkeypatch.setattr(contextcache, "_cache", contextcache.ContextCache())
+    monkeypatch.setattr(spool, "_spool", spool.Spool())
+    monkeypatch.setattr(
+        jobs, "_queue", jobs.JobQueue(workers=1, size=10, retries=0, retry_delay=0)
+    )
+    yield client
+    resetTimings()
+    resetTranscripts()
+
+
+@pytest.mark.unit
+async def test_session_start_reads_concurrently(client):
+    from ccmemory.hooks import flushBackground, handleSessionStart
+    from ccmemory.timings import timingStats
+
+    result = await handleSessionStart("s-1", "/work/proj")
+    assert client.max_in_flight == 4
+    assert "Uses uv" in result["context"]
+    assert timingStats("session_start.reads")["count"] == 1
+
+    # Retrieval is written after the response, not before
+    assert client.retrievals == []
+    await flushBackground()
+    assert client.retrievals == [["pf-1"]]
+    assert timingStats("session_start.retrieval")["count"] == 1
+
+
+@pytest.mark.unit
+async def test_session_start_serves_snapshot_until_write(client):
+    from ccmemory.contextcache import getContextCache
+    from ccmemory.hooks import handleSessionStart
+    from ccmemory.timings import timingStats
+
+    first = await handleSessionStart("s-1", "/work/proj")
+    second = await handleSessionStart("s-2", "/work/proj", ["conv-1"])
+    assert client.reads == 4
+    assert second["context"].startswith(first["context"])
+    assert "## Pending History Import" in second["context"]
+    assert timingStats("session_start.cache_hit")["p99"] < 1
+
+    getContextCache().bump("proj")
+    await handleSessionStart("s-3", "/work/proj")
+    assert client.reads == 8
+
+
+@pytest.mark.unit
+def test_context_cache_disk_tier_shares_versions(tmp_path):
+    from ccmemory.contextcache import ContextCache
+
+    path = str(tmp_path / "context.db")
+    server, cli = ContextCache(path), ContextCache(path)
+    server.put("proj", server.version("proj"), {"context": "ctx", "retrieved_ids": []})
+    assert cli.get("proj", cli.version("proj")) == {
+        "context": "ctx",
+        "retrieved_ids": [],
+    }
+
+    cli.bump("proj")
+    assert server.get("proj", server.version("proj")) is None
+    server.close()
+    cli.close()
+
+
+@pytest.mark.unit
+def test_timing_percentiles():
+    from ccmemory.timings import recordTiming, resetTimings, timingStats
+
+    for duration in range(1, 101):
+        recordTiming("stage", duration)
+    assert timingStats("stage") == {"count": 100, "p50": 51, "p99": 100}
+    assert timingStats("unseen") == {}
+    resetTimings()
+
+
+def writeTranscript(path, user_message: str) -> str:
+    import json
+
+    with open(path, "a") as f:
+        f.writelines(
+            json.dumps({"type": role, "message": {"role": role, "content": text}})
+            + "\n"
+            for role, text in [("user", user_message), ("assistant", "Ok")]
+        )
+    return str(path)
+
+
+@pytest.mark.unit
+async def test_message_response_queues_detection(client, monkeypatch, tmp_path):
+    from ccmemory import hooks
+    from ccmemory.jobs import getJobQueue
+    from ccmemory.spool import getSpool
+
+    detected = asyncio.Event()
+
+    async def detectAll(user_message, claude_response, context):
+        await detected.wait()
+        return []
+
+    monkeypatch.setattr(hooks, "detectAll", detectAll)
+    transcript = writeTranscript(tmp_path / "session.jsonl", "Use uv for installs")
+
+    result = await hooks.handleMessageResponse("s-1", transcript, "/work/proj")
+    assert getJobQueue().get(result["job_id"])["status"] in ("queued", "running")
+    assert getSpool().stats()["depth"] == 1
+    again = await hooks.handleMessageResponse("s-1", transcript, "/work/proj")
+    assert again == {"job_id": result["job_id"], "status": "duplicate"}
+
+    detected.set()
+    await getJobQueue().close()
+    job = getJobQueue().get(result["job_id"])
+    assert (job["status"], job["project"], job["result"]) == (
+        "done",
+        "proj",
+        {"detections": 0},
+    )
+    assert getSpool().stats()["depth"] == 0
+
+
+@pytest.mark.unit
+async def test_failed_turn_stays_spooled_for_replay(client, monkeypatch, tmp_path):
+    from ccmemory import hooks, jobs, spool
+    from ccmemory.jobs import getJobQueue
+    from ccmemory.spool import getSpool
+
+    monkeypatch.setattr(spool, "SPOOL_REPLAY_INTERVAL", 0)  # No backoff
+    monkeypatch.setattr(
+        jobs, "_queue", jobs.JobQueue(workers=1, size=10, retries=2, retry_delay=0)
+    )
+
+    async def unavailable(user_message, claude_response, context):
+        raise RuntimeError("LLM provider unavailable")
+
+    async def recovered(user_message, claude_response, context):
+        return []
+
+    monkeypatch.setattr(hooks, "detectAll", unavailable)
+    transcript = writeTranscript(tmp_path / "session.jsonl", "Use uv for installs")
+    result = await hooks.handleMessageResponse("s-1", transcript, "/work/proj")
+    await getJobQueue().close()
+    job = getJobQueue().get(result["job_id"])
+    assert (job["status"], job["attempts"]) == ("failed", 3)
+    assert getSpool().get(result["job_id"])["attempts"] == 1  # One per job
+
+    monkeypatch.setattr(hooks, "detectAll", recovered)
+    assert hooks.replaySpooled() == 1
+    await getJobQueue().close()
+    assert getJobQueue().get(result["job_id"])["status"] == "done"
+    assert getSpool().get(result["job_id"]) is None
+
+
+@pytest.mark.unit
+async def test_processed_turn_is_not_detected_again(client, monkeypatch, tmp_path):
+    from ccmemory import hooks, transcript
+    from ccmemory.jobs import getJobQueue
+
+    calls = []
+
+    async def detectAll(user_message, claude_response, context):
+        calls.append(user_message)
+        return []
+
+    monkeypatch.setattr(hooks, "detectAll", detectAll)
+    path = writeTranscript(tmp_path / "session.jsonl", "Use uv for installs")
+    first = await hooks.handleMessageResponse("s-1", path, "/work/proj")
+    await getJobQueue().close()
+
+    transcript.resetTranscripts()  # As after a server restart
+    again = await hooks.handleMessageResponse("s-1", path, "/work/proj")
+    assert again == {"job_id": first["job_id"], "status": "duplicate"}
+
+    writeTranscript(tmp_path / "session.jsonl", "Pin ruff to 0.6")
+    await hooks.handleMessageResponse("s-1", path, "/work/proj")
+    await getJobQueue().close()
+    assert calls == ["Use uv for installs", "Pin ruff to 0.6"]
+
+
+@pytest.mark.unit
+async def test_telemetry_failure_does_not_retry_detection(
+    client, monkeypatch, tmp_path
+):
+    from ccmemory import hooks
+    from ccmemory.detection.schemas import Decision, Detection, DetectionType
+    from ccmemory.jobs import getJobQueue
+
+    calls = []
+
+    async def detectAll(user_message, claude_response, context):
+        calls.append(user_message)
+        data = Decision(confidence=0.9, description="Use uv for installs")
+        return [Detection(type=DetectionType.Decision, confidence=0.9, data=data)]
+
+    async def storeDetections(client, detections, project, source_id=None):
+        return ["decision-1"]
+
+    async def recordTelemetry(event_type, project, data):
+        raise RuntimeError("Neo4j unavailable")
+
+    monkeypatch.setattr(hooks, "detectAll", detectAll)
+    monkeypatch.setattr(hooks, "storeDetections", storeDetections)
+    monkeypatch.setattr(client, "recordTelemetry", recordTelemetry, raising=False)
+    path = writeTranscript(tmp_path / "session.jsonl", "Use uv for installs")
+    result = await hooks.handleMessageResponse("s-1", path, "/work/proj")
+    await getJobQueue().close()
+
+    job = getJobQueue().get(result["job_id"])
+    assert (job["status"], job["result"]) == ("done", {"detections": 1})
+    assert len(calls) == 1
@@ -0,0 +1,72 @@
+"""Unit tests for the background job queue."""
+
+import asyncio
+
+import pytest
+
+
+@pytest.mark.unit
+async def test_job_retries_until_success():
+    from ccmemory.jobs import JobQueue
+
+    queue = JobQueue(workers=1, size=10, retries=2, retry_delay=0)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("LLM timeout")
+        return {"detections": 2}
+
+    job = queue.submit("detection", flaky, project="proj")
+    assert job["status"] == "queued"
+    await queue.close()
+
+    done = queue.get(job["id"])
+    assert done["status"] == "done"
+    assert done["attempts"] == 3
+    assert done["result"] == {"detections": 2}
+    assert queue.stats()["retried"] == 2
+
+
+@pytest.mark.unit
+async def test_job_fails_after_retries():
+    from ccmemory.jobs import JobQueue
+
+    queue = JobQueue(workers=1, size=10, retries=1, retry_delay=0)
+
+    async def broken():
+        raise RuntimeError("Neo4j unavailable")
+
+    job = queue.submit("detection", broken)
+    await queue.close()
+
+    failed = queue.get(job["id"])
+    assert failed["status"] == "failed"
+    assert failed["attempts"] == 2
+    assert failed["error"] == "Neo4j unavailable"
+    assert queue.stats()["failed"] == 1
+
+
+@pytest.mark.unit
+async def test_full_queue_rejects_jobs():
+    from ccmemory.jobs import JobQueue
+
+    queue = JobQueue(workers=1, size=1, retries=0, retry_delay=0)
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+        return {}
+
+    queue.submit("detection", blocked)
+    await asyncio.sleep(0)  # Worker takes the first job
+    queue.submit("detection", blocked)
+    with pytest.raises(asyncio.QueueFull):
+        queue.submit("detection", blocked)
+
+    stats = queue.stats()
+    assert (stats["depth"], stats["busy"], stats["rejected"]) == (1, 1, 1)
+    release.set()
+    await queue.close()
+    assert queue.stats()["completed"] == 2
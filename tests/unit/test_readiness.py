@@ -0,0 +1,39 @@
+"""Unit tests for startup warm-up and readiness."""
+
+import pytest
+
+
+@pytest.fixture
+def readiness(monkeypatch):
+    from ccmemory import readiness
+    from ccmemory.hashembed import HashBackend
+
+    async def ok():
+        return {}
+
+    monkeypatch.setattr(readiness, "_status", {})
+    monkeypatch.setattr(readiness, "getBackend", lambda: HashBackend(readiness.EMBEDDING_DIMS))
+    monkeypatch.setattr(readiness, "_checkNeo4j", ok)
+    monkeypatch.setattr(readiness, "_checkLlm", ok)
+    return readiness
+
+
+@pytest.mark.unit
+async def test_warm_up_reports_ready_with_timings(readiness):
+    await readiness.warmUp()
+    result = readiness.getReadiness()
+    assert result["ready"] is True
+    assert result["components"]["embedding"]["dims"] == readiness.EMBEDDING_DIMS
+    assert all("ms" in c for c in result["components"].values())
+
+
+@pytest.mark.unit
+async def test_warm_up_rejects_wrong_embedding_dimension(readiness, monkeypatch):
+    from ccmemory.hashembed import HashBackend
+
+    monkeypatch.setattr(readiness, "getBackend", lambda: HashBackend(7))
+    monkeypatch.setattr(readiness, "WARMUP_TIMEOUT", 0)
+    await readiness.warmUp()
+    result = readiness.getReadiness()
+    assert result["ready"] is False
+    assert "returned 7 dims" in result["components"]["embedding"]["error"]
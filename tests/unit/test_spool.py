@@ -0,0 +1,72 @@
+"""Unit tests for the hook event spool."""
+
+import pytest
+
+
+@pytest.mark.unit
+def test_spool_is_idempotent_and_durable(tmp_path):
+    from ccmemory.spool import Spool
+
+    path = str(tmp_path / "spool.db")
+    spool = Spool(path)
+    assert spool.append("turn-1", "detection", {"user_message": "Use uv"})
+    assert not spool.append("turn-1", "detection", {"user_message": "Use uv"})
+    spool.close()
+
+    reopened = Spool(path)
+    assert reopened.due() == [
+        {"id": "turn-1", "kind": "detection", "payload": {"user_message": "Use uv"}}
+    ]
+    reopened.ack("turn-1")
+    assert reopened.stats()["depth"] == 0
+    reopened.close()
+
+
+@pytest.mark.unit
+def test_failed_event_waits_for_backoff():
+    from ccmemory.spool import Spool
+
+    spool = Spool()
+    spool.append("turn-1", "detection", {})
+    spool.append("turn-2", "detection", {})
+    spool.fail("turn-1", "Neo4j unavailable")
+
+    assert [event["id"] for event in spool.due()] == ["turn-2"]
+    assert spool.get("turn-1")["attempts"] == 1
+    assert spool.get("turn-1")["error"] == "Neo4j unavailable"
+    stats = spool.stats()
+    assert (stats["depth"], stats["failing"]) == (2, 1)
+
+
+@pytest.mark.unit
+def test_session_cursor_skips_processed_turns():
+    from ccmemory.spool import Spool
+
+    spool = Spool()
+    assert spool.appendTurn("s-1", 100, "turn-1", "detection", {})
+    spool.ack("turn-1")
+    assert not spool.appendTurn("s-1", 100, "turn-1", "detection", {})
+    assert not spool.appendTurn("s-1", 40, "turn-0", "detection", {})  # Late
+    assert spool.appendTurn("s-1", 100, "turn-1b", "detection", {})  # Edited
+    assert spool.appendTurn("s-1", 250, "turn-2", "detection", {})
+    assert spool.appendTurn("s-2", 40, "turn-0", "detection", {})
+    assert [event["id"] for event in spool.due()] == ["turn-1b", "turn-2", "turn-0"]
+
+
+@pytest.mark.unit
+def test_event_is_dead_after_max_attempts(monkeypatch):
+    from ccmemory import spool as module
+
+    monkeypatch.setattr(module, "SPOOL_REPLAY_INTERVAL", 0)  # No backoff
+    monkeypatch.setattr(module, "SPOOL_MAX_ATTEMPTS", 3)
+    spool = module.Spool()
+    spool.append("turn-1", "detection", {})
+    for _ in range(3):
+        assert [event["id"] for event in spool.due()] == ["turn-1"]
+        spool.fail("turn-1", "Payload too large")
+
+    assert spool.due() == []
+    assert spool.get("turn-1")["status"] == "dead"
+    assert not spool.append("turn-1", "detection", {})  # Not revived
+    stats = spool.stats()
+    assert (stats["depth"], stats["dead"]) == (0, 1)
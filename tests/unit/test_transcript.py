@@ -0,0 +1,125 @@
+"""Unit tests for tail reads of session transcripts."""
+
+import json
+
+import pytest
+
+
+def fullRead(path: str) -> tuple[str, str, str]:
+    """Reference: parse every line and search back for the last pair."""
+    with open(path) as f:
+        messages = [json.loads(line) for line in f if line.strip()]
+    user_message = assistant_response = ""
+    for msg in reversed(messages):
+        role = msg["message"]["role"]
+        content = msg["message"]["content"]
+        if isinstance(content, list):
+            content = " ".join(c.get("text", "") for c in content)
+        if role == "user" and not user_message:
+            user_message = content
+        elif role == "assistant" and not assistant_response:
+            assistant_response = content
+    context = "\n".join(
+        f"{m['type']}: {str(m['message']['content'])[:200]}" for m in messages[-10:-2]
+    )
+    return user_message, assistant_response, context
+
+
+def appendTurn(path, n: int, tool_calls: int = 0):
+    lines = [{"type": "user", "message": {"role": "user", "content": f"Question {n}"}}]
+    for call in range(tool_calls):
+        lines.append(
+            {
+                "type": "assistant",
+                "message": {"role": "assistant", "content": [{"type": "tool_use"}]},
+            }
+        )
+        lines.append(
+            {
+                "type": "user",
+                "message": {"role": "user", "content": [{"type": "tool_result"}]},
+            }
+        )
+    lines.append(
+        {
+            "type": "assistant",
+            "message": {"role": "assistant", "content": [{"text": f"Answer {n}"}]},
+        }
+    )
+    with open(path, "a") as f:
+        f.writelines(json.dumps(line) + "\n" for line in lines)
+
+
+@pytest.fixture
+def transcript(tmp_path, monkeypatch):
+    from ccmemory import transcript
+
+    monkeypatch.setattr(transcript, "READ_BLOCK", 64)  # Lines span blocks
+    yield str(tmp_path / "session.jsonl")
+    transcript.resetTranscripts()
+
+
+@pytest.mark.unit
+def test_tail_read_matches_full_parse(transcript):
+    from ccmemory.transcript import readTranscript
+
+    for n in range(30):
+        appendTurn(transcript, n, tool_calls=n % 4)
+    assert readTranscript(transcript) == fullRead(transcript)
+    assert readTranscript(transcript)[:2] == ("Question 29", "Answer 29")
+
+
+@pytest.mark.unit
+def test_later_turns_parse_only_appended_lines(transcript, monkeypatch):
+    from ccmemory import transcript as module
+
+    appendTurn(transcript, 0)
+    module.readTranscript(transcript)
+    parsed = []
+    parseLine = module._parseLine
+    monkeypatch.setattr(
+        module, "_parseLine", lambda line: parsed.append(line) or parseLine(line)
+    )
+
+    for n in range(1, 5):
+        appendTurn(transcript, n, tool_calls=2)
+        assert module.readTranscript(transcript) == fullRead(transcript)
+    assert len(parsed) == 4 * 6  # Each turn's lines, once
+
+
+@pytest.mark.unit
+def test_turn_position_is_user_line_offset(transcript):
+    from ccmemory import transcript as module
+
+    positions = []
+    for n in range(6):
+        with open(transcript, "ab") as f:
+            expected = f.tell()
+        appendTurn(transcript, n, tool_calls=n % 3)
+        turn = module.readTurn(transcript)
+        assert turn["position"] == expected
+        positions.append(turn["position"])
+        module.resetTranscripts()  # Cold tail read agrees
+        assert module.readTurn(transcript)["position"] == expected
+    assert positions == sorted(set(positions))
+
+
+@pytest.mark.unit
+def test_unterminated_line_waits_for_next_read(transcript):
+    from ccmemory.transcript import readTranscript
+
+    appendTurn(transcript, 0)
+    with open(transcript, "a") as f:
+        f.write('{"type": "user", "message": {"role": "user", "content": "Quest')
+    assert readTranscript(transcript)[0] == "Question 0"
+
+    with open(transcript, "a") as f:
+        f.write('ion 1"}}\n')
+    assert readTranscript(transcript)[0] == "Question 1"
+
+
+@pytest.mark.unit
+def test_missing_transcript():
+    from ccmemory.transcript import readTranscript
+
+    assert readTranscript("/nonexistent/session.jsonl") == ("", "", "")